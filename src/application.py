@@ -22,24 +22,16 @@ from gi.repository import Gtk, Gio, GLib, Gdk, Notify, TotemPlParser
 from pickle import dump
 from gettext import gettext as _
 from threading import Thread
-
-
-try:
-    from lollypop.lastfm import LastFM
-except Exception as e:
-    print(e)
-    print(_("    - Scrobbler disabled\n"
-            "    - Auto cover download disabled\n"
-            "    - Artist informations disabled"))
-    print("$ sudo pip3 install pylast")
-    LastFM = None
+from sys import argv
 
 from lollypop.utils import is_gnome, is_unity, get_network_available
-from lollypop.define import Type, DataPath
+from lollypop.utils import debug
+from lollypop.define import Type, DataPath, TaskPriority
 from lollypop.window import Window
 from lollypop.database import Database
 from lollypop.player import Player
 from lollypop.art import Art
+from lollypop.cache_manager import CacheManager
 from lollypop.sqlcursor import SqlCursor
 from lollypop.settings import Settings, SettingsDialog
 from lollypop.database_albums import AlbumsDatabase
@@ -48,6 +40,9 @@ from lollypop.database_genres import GenresDatabase
 from lollypop.database_tracks import TracksDatabase
 from lollypop.playlists import Playlists
 from lollypop.objects import Album, Track
+from lollypop.snapshot import LibrarySnapshot
+from lollypop.profiler import StartupProfiler
+from lollypop.executor import TaskExecutor
 from lollypop.collectionscanner import CollectionScanner
 from lollypop.lio import Lio
 
@@ -65,6 +60,8 @@ class Application(Gtk.Application):
             Create application
             @param version as str
         """
+        # Options are parsed after startup, see register() below
+        self.__profiler = StartupProfiler("--profile-startup" in argv)
         Gtk.Application.__init__(
                             self,
                             application_id="org.gnome.Lollypop",
@@ -90,6 +87,7 @@ class Application(Gtk.Application):
         self.window = None
         self.notify = None
         self.lastfm = None
+        self.charts = None
         self.debug = False
         self.__externals_count = 0
         self.__init_proxy()
@@ -119,8 +117,13 @@ class Application(Gtk.Application):
                              GLib.OptionArg.NONE,
                              "Lollypop version",
                              None)
+        self.add_main_option("profile-startup", b"P", GLib.OptionFlags.NONE,
+                             GLib.OptionArg.NONE,
+                             "Print startup timeline",
+                             None)
         self.connect("command-line", self.__on_command_line)
         self.connect("activate", self.__on_activate)
+        self.__profiler.mark("application")
         self.register(None)
         if self.get_is_remote():
             Gdk.notify_startup_complete()
@@ -131,6 +134,9 @@ class Application(Gtk.Application):
             Init main application
         """
         self.settings = Settings.new()
+        self.executor = TaskExecutor(
+                    self.settings.get_value("executor-workers").get_int32())
+        self.__profiler.mark("settings")
         # Mount enclosing volume as soon as possible
         uris = self.settings.get_music_uris()
         try:
@@ -157,6 +163,7 @@ class Application(Gtk.Application):
         styleContext = Gtk.StyleContext()
         styleContext.add_provider_for_screen(screen, cssProvider,
                                              Gtk.STYLE_PROVIDER_PRIORITY_USER)
+        self.__profiler.mark("css")
         self.db = Database()
         self.playlists = Playlists()
         # We store cursors for main thread
@@ -166,22 +173,23 @@ class Application(Gtk.Application):
         self.artists = ArtistsDatabase()
         self.genres = GenresDatabase()
         self.tracks = TracksDatabase()
+        self.__profiler.mark("databases")
         self.player = Player()
+        self.__profiler.mark("player")
         self.scanner = CollectionScanner()
+        self.__profiler.mark("scanner")
+        # Before any view, so views reload fresh rows
+        self.scanner.connect("album-updated", self.__on_album_updated)
+        self.scanner.connect("scan-finished", self.__on_scan_finished)
+        self.scanner.connect("artist-updated", self.__on_library_updated)
+        self.scanner.connect("genre-updated", self.__on_library_updated)
+        self.caches = CacheManager()
         self.art = Art()
         self.art.update_art_size()
         if self.settings.get_value("artist-artwork"):
             GLib.timeout_add(5000, self.art.cache_artists_info)
-        if LastFM is not None:
-            self.lastfm = LastFM()
-        if not self.settings.get_value("disable-mpris"):
-            # Ubuntu > 16.04
-            if Gtk.get_minor_version() > 18:
-                from lollypop.mpris import MPRIS
-            # Ubuntu <= 16.04, Debian Jessie, ElementaryOS
-            else:
-                from lollypop.mpris_legacy import MPRIS
-            MPRIS(self)
+        self.__profiler.mark("art")
+        # Needed by db upgrade
         if not self.settings.get_value("disable-notifications"):
             from lollypop.notification import NotificationManager
             self.notify = NotificationManager()
@@ -198,6 +206,10 @@ class Application(Gtk.Application):
         self.add_action(self.settings.create_action("shuffle"))
 
         self.db.upgrade()
+        self.__profiler.mark("database upgrade")
+        # After upgrade, snapshot depends on db version
+        self.snapshot = LibrarySnapshot()
+        self.__profiler.mark("snapshot")
 
     def do_startup(self):
         """
@@ -213,29 +225,25 @@ class Application(Gtk.Application):
             if is_gnome() or is_unity():
                 self.set_app_menu(menu)
             self.window = Window()
+            self.__profiler.mark("window")
             # If not GNOME/Unity add menu to toolbar
             if not is_gnome() and not is_unity():
                 self.window.setup_menu(menu)
             self.window.connect("delete-event", self.__hide_on_delete)
+            if self.__profiler.enabled:
+                self.__draw_id = self.window.connect("draw",
+                                                     self.__on_first_draw)
             self.window.init_list_one()
             self.window.show()
+            self.__profiler.mark("window shown")
             self.player.restore_state()
+            self.__profiler.mark("player state")
             # We add to mainloop as we want to run
             # after player::restore_state() signals
             GLib.idle_add(self.window.toolbar.set_mark)
-            self.charts = None
-            if self.settings.get_value("show-charts"):
-                if GLib.find_program_in_path("youtube-dl") is not None:
-                    from lollypop.charts import Charts
-                    self.charts = Charts()
-                    if get_network_available():
-                        self.charts.start()
-                else:
-                    self.settings.set_value("network-search",
-                                            GLib.Variant("b", False))
-            t = Thread(target=self.__preload_portal)
-            t.daemon = True
-            t.start()
+            # Not needed for first frame, redraw has an higher priority
+            GLib.idle_add(self.__init_deferred,
+                          priority=GLib.PRIORITY_LOW)
 
     def quit(self, vacuum=False):
         """
@@ -244,6 +252,8 @@ class Application(Gtk.Application):
         """
         # First save state
         self.__save_state()
+        self.art.flush_album_cache()
+        self.caches.save()
         # Then vacuum db
         if vacuum:
             self.__vacuum()
@@ -353,6 +363,58 @@ class Application(Gtk.Application):
         except Exception as e:
             print("Application::__vacuum(): ", e)
 
+    def __init_deferred(self):
+        """
+            Init subsystems not needed to show main window
+        """
+        try:
+            from lollypop.lastfm import LastFM
+        except Exception as e:
+            print(e)
+            print(_("    - Scrobbler disabled\n"
+                    "    - Auto cover download disabled\n"
+                    "    - Artist informations disabled"))
+            print("$ sudo pip3 install pylast")
+            LastFM = None
+        if LastFM is not None:
+            self.lastfm = LastFM()
+        self.__profiler.mark("lastfm")
+        if not self.settings.get_value("disable-mpris"):
+            # Ubuntu > 16.04
+            if Gtk.get_minor_version() > 18:
+                from lollypop.mpris import MPRIS
+            # Ubuntu <= 16.04, Debian Jessie, ElementaryOS
+            else:
+                from lollypop.mpris_legacy import MPRIS
+            MPRIS(self)
+        self.__profiler.mark("mpris")
+        if self.settings.get_value("show-charts"):
+            if GLib.find_program_in_path("youtube-dl") is not None:
+                from lollypop.charts import Charts
+                self.charts = Charts()
+                if get_network_available():
+                    self.charts.start()
+            else:
+                self.settings.set_value("network-search",
+                                        GLib.Variant("b", False))
+        self.__profiler.mark("charts")
+        self.executor.submit(self.art.migrate_album_cache,
+                             priority=TaskPriority.BACKGROUND)
+        self.caches.start()
+        t = Thread(target=self.__preload_portal)
+        t.daemon = True
+        t.start()
+        self.__profiler.report()
+
+    def __on_first_draw(self, window, cr):
+        """
+            Mark first frame
+            @param window as Gtk.Window
+            @param cr as cairo.Context
+        """
+        window.disconnect(self.__draw_id)
+        self.__profiler.mark("first frame")
+
     def __preload_portal(self):
         """
             Preload lollypop portal
@@ -382,6 +444,45 @@ class Application(Gtk.Application):
         except Exception as e:
             print("Application::__init_proxy()", e)
 
+    def __on_album_updated(self, scanner, album_id, added):
+        """
+            Invalidate cached rows
+            @param scanner as CollectionScanner
+            @param album_id as int
+            @param added as bool
+        """
+        Album.CACHE.remove(album_id)
+        # Tracks cache album fields
+        Track.CACHE.clear()
+        self.snapshot.invalidate()
+
+    def __on_library_updated(self, scanner, object_id, added):
+        """
+            Invalidate library snapshot
+            @param scanner as CollectionScanner
+            @param object_id as int
+            @param added as bool
+        """
+        self.snapshot.invalidate()
+
+    def __on_scan_finished(self, scanner):
+        """
+            Invalidate cached rows
+            @param scanner as CollectionScanner
+        """
+        Album.CACHE.clear()
+        Track.CACHE.clear()
+        debug("Application::__on_scan_finished(): albums %s/%s,"
+              " tracks %s/%s hits/misses" % (Album.CACHE.hits,
+                                             Album.CACHE.misses,
+                                             Track.CACHE.hits,
+                                             Track.CACHE.misses))
+        debug("Application::__on_scan_finished(): executor queue %s,"
+              " latency %.1f/%.1f ms avg/max" % (self.executor.queue_depth,
+                                                 *self.executor.latency))
+        self.executor.submit(self.snapshot.save,
+                             priority=TaskPriority.BACKGROUND)
+
     def __on_command_line(self, app, app_cmd_line):
         """
             Handle command line
@@ -489,10 +590,9 @@ class Application(Gtk.Application):
             @param param as GLib.Variant
         """
         if self.window:
-            t = Thread(target=self.art.clean_all_cache)
-            t.daemon = True
-            t.start()
-            self.window.update_db()
+            self.executor.submit(self.art.clean_all_cache,
+                                 priority=TaskPriority.BACKGROUND)
+            self.window.update_db(True)
 
     def __set_network(self, action, param):
         """
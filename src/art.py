@@ -22,11 +22,12 @@ class Art(AlbumArt, RadioArt, Downloader):
         Global artwork manager
     """
 
-    def __init__(self):
+    def __init__(self, read_only=False):
         """
             Create cache path
+            @param read_only as bool, covers stores written by lollypop
         """
-        AlbumArt.__init__(self)
+        AlbumArt.__init__(self, read_only)
         RadioArt.__init__(self)
         Downloader.__init__(self)
         self._create_cache()
@@ -39,5 +40,7 @@ class Art(AlbumArt, RadioArt, Downloader):
         try:
             rmtree(self._CACHE_PATH)
             self._create_cache()
+            self._clean_store()
+            self._clean_surface_cache()
         except Exception as e:
             print("Art::clean_all_cache(): ", e)
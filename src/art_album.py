@@ -10,34 +10,109 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import GLib, Gdk, GdkPixbuf, Gio, Gst
+from gi.repository import GLib, Gdk, GdkPixbuf, Gio
 
-from threading import Thread
+from threading import Thread, Lock, local
+from collections import OrderedDict
+from hashlib import sha1
 import re
 
 from lollypop.art_base import BaseArt
-from lollypop.tagreader import TagReader
-from lollypop.define import Lp, ArtSize
+from lollypop.tagreader import TagReader, Discoverer
+from lollypop.define import Lp, ArtSize, TaskPriority
 from lollypop.objects import Album
-from lollypop.utils import escape, is_readonly
+from lollypop.utils import escape, is_readonly, debug, cache_hit, cache_miss
+from lollypop.blobstore import BlobStore
 from lollypop.lio import Lio
 
 
+class ArtworkRequest:
+    """
+        A caller waiting for an album artwork
+    """
+
+    def __init__(self, key, callback):
+        """
+            Init request
+            @param key as (album id as int, size as int, scale as int)
+            @param callback as function
+        """
+        self.key = key
+        self.callback = callback
+
+
+class ArtworkLoading:
+    """
+        An album artwork being loaded for one or more requests
+    """
+
+    def __init__(self, album, priority):
+        """
+            Init loading
+            @param album as Album
+            @param priority as TaskPriority
+        """
+        self.album = album
+        self.priority = priority
+        self.requests = []
+        self.task = None
+        # Identify last submitted task
+        self.serial = 0
+
+
 class AlbumArt(BaseArt, TagReader):
     """
          Manager album artwork
     """
 
     _MIMES = ("jpeg", "jpg", "png", "gif")
+    # Memory used by decoded surfaces
+    _SURFACES_MAX_SIZE = 64 * 1024 * 1024
 
-    def __init__(self):
+    def __init__(self, read_only=False):
         """
             Init radio art
+            @param read_only as bool, covers stores written by lollypop
         """
         BaseArt.__init__(self)
         TagReader.__init__(self)
         self.__favorite = Lp().settings.get_value(
                                                 "favorite-cover").get_string()
+        self.__lock = Lock()
+        # Decoded surfaces, least recently used first
+        self.__surfaces = OrderedDict()
+        self.__surfaces_size = 0
+        self.__pending = {}
+        self.__serial = 0
+        self.__flush_id = None
+        # Discoverer is not safe for concurrent use
+        self.__discoverers = local()
+        self._create_cache()
+        self.__store = BlobStore(self._CACHE_PATH, self._COVERS_STORE,
+                                 self.__get_store_max_size(), read_only)
+        Lp().settings.connect("changed::cover-cache-size",
+                              self.__on_cover_cache_size_changed)
+        # Artworks from tags, keyed by content hash
+        self.__embedded = BlobStore(self._CACHE_PATH, self._EMBEDDED_STORE,
+                                    self.__get_embedded_max_size(),
+                                    read_only)
+        Lp().settings.connect("changed::embedded-cache-size",
+                              self.__on_embedded_cache_size_changed)
+
+    def get_info(self, uri):
+        """
+            Return information for file at uri, with a discoverer
+            for current thread
+            @param uri as str
+            @Exception GLib.Error
+            @return GstPbutils.DiscovererInfo
+            @thread safe
+        """
+        discoverer = getattr(self.__discoverers, "discoverer", None)
+        if discoverer is None:
+            discoverer = Discoverer()
+            self.__discoverers.discoverer = discoverer
+        return discoverer.get_info(uri)
 
     def get_album_cache_path(self, album, size):
         """
@@ -49,20 +124,32 @@ class AlbumArt(BaseArt, TagReader):
         filename = ""
         try:
             filename = self.get_album_cache_name(album)
+            # Export artwork from store for others
             cache_path_jpg = "%s/%s_%s.jpg" % (self._CACHE_PATH,
                                                filename,
                                                size)
             f = Lio.File.new_for_path(cache_path_jpg)
             if f.query_exists():
                 return cache_path_jpg
-            else:
-                self.get_album_artwork(album, size, 1)
-                if f.query_exists():
-                    return cache_path_jpg
-                else:
-                    return self._get_default_icon_path(
-                                           size,
-                                           "folder-music-symbolic")
+            data = self.__store.get(filename, size)
+            if data is None:
+                pixbuf = self.__get_album_pixbuf(album, size, 1)
+                data = self.__store.get(filename, size)
+                # Read only store, export rendered artwork
+                if data is None and pixbuf is not None:
+                    quality = str(Lp().settings.get_value(
+                                            "cover-quality").get_int32())
+                    (status, data) = pixbuf.save_to_bufferv("jpeg",
+                                                            ["quality"],
+                                                            [quality])
+                    if not status:
+                        data = None
+            if data is None:
+                return self._get_default_icon_path(size,
+                                                   "folder-music-symbolic")
+            f.replace_contents(data, None, False,
+                               Gio.FileCreateFlags.REPLACE_DESTINATION, None)
+            return cache_path_jpg
         except Exception as e:
             print("Art::get_album_cache_path(): %s" % e, ascii(filename))
             return None
@@ -147,78 +234,72 @@ class AlbumArt(BaseArt, TagReader):
             @param scale factor as int
             @return cairo surface
         """
-        size *= scale
-        filename = self.get_album_cache_name(album)
-        cache_path_jpg = "%s/%s_%s.jpg" % (self._CACHE_PATH, filename, size)
-        pixbuf = None
+        key = (album.id, size, scale)
+        surface = self.__get_surface(key)
+        if surface is None:
+            pixbuf = self.__get_album_pixbuf(album, size, scale)
+            surface = self.__surface_from_pixbuf(key, pixbuf)
+        return surface
 
-        try:
-            # Look in cache
-            f = Lio.File.new_for_path(cache_path_jpg)
-            if f.query_exists():
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(cache_path_jpg,
-                                                                size,
-                                                                size)
-            else:
-                # Use favorite folder artwork
-                if pixbuf is None:
-                    uri = self.get_album_artwork_uri(album)
-                    data = None
-                    if uri is not None:
-                        f = Lio.File.new_for_uri(uri)
-                        (status, data, tag) = f.load_contents(None)
-                        ratio = self._respect_ratio(uri)
-                        stream = Gio.MemoryInputStream.new_from_data(data,
-                                                                     None)
-                        pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(
-                                                                       stream,
-                                                                       size,
-                                                                       size,
-                                                                       ratio,
-                                                                       None)
-                        stream.close()
-                # Use tags artwork
-                if pixbuf is None and album.tracks:
-                    try:
-                        pixbuf = self.pixbuf_from_tags(
-                                    album.tracks[0].uri, size)
-                    except Exception as e:
-                        print("AlbumArt::get_album_artwork()", e)
-
-                # Use folder artwork
-                if pixbuf is None and album.uri != "":
-                    uri = self.get_first_album_artwork(album)
-                    # Look in album folder
-                    if uri is not None:
-                        f = Lio.File.new_for_uri(uri)
-                        (status, data, tag) = f.load_contents(None)
-                        ratio = self._respect_ratio(uri)
-                        stream = Gio.MemoryInputStream.new_from_data(data,
-                                                                     None)
-                        pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(
-                                                                       stream,
-                                                                       size,
-                                                                       size,
-                                                                       ratio,
-                                                                       None)
-                        stream.close()
-                # Use default artwork
-                if pixbuf is None:
-                    self.cache_album_art(album.id)
-                    return self.get_default_icon("folder-music-symbolic",
-                                                 size,
-                                                 scale)
-                else:
-                    pixbuf.savev(cache_path_jpg, "jpeg", ["quality"],
-                                 [str(Lp().settings.get_value(
-                                                "cover-quality").get_int32())])
-            surface = Gdk.cairo_surface_create_from_pixbuf(pixbuf, scale, None)
-            del pixbuf
-            return surface
+    def load_album_artwork(self, album, size, scale, callback,
+                           priority=TaskPriority.UI):
+        """
+            Load album artwork in background, callback(surface) is then
+            run in main loop. Requests for same artwork are merged
+            @param album as Album
+            @param pixbuf size as int
+            @param scale factor as int
+            @param callback as function
+            @param priority as TaskPriority
+            @return request as ArtworkRequest, None if callback already run
+        """
+        key = (album.id, size, scale)
+        surface = self.__get_surface(key)
+        if surface is not None:
+            callback(surface)
+            return None
+        request = ArtworkRequest(key, callback)
+        with self.__lock:
+            pending = self.__pending.get(key)
+            if pending is None:
+                pending = ArtworkLoading(album, priority)
+                self.__pending[key] = pending
+                self.__submit(key)
+            # Run merged request in higher priority lane
+            elif priority < pending.priority:
+                pending.task.cancel()
+                pending.priority = priority
+                self.__submit(key)
+            pending.requests.append(request)
+        return request
 
-        except Exception as e:
-            print("AlbumArt::get_album_artwork()", e)
-            return self.get_default_icon("folder-music-symbolic", size, scale)
+    def prerender_album_artwork(self, album, size, scale):
+        """
+            Render album artwork in cache if missing, surface is not
+            kept in memory
+            @param album as Album
+            @param pixbuf size as int
+            @param scale factor as int
+            @thread safe
+        """
+        filename = self.get_album_cache_name(album)
+        if not self.__store.exists(filename, size * scale):
+            self.__get_album_pixbuf(album, size, scale)
+
+    def cancel_album_artwork(self, request):
+        """
+            Cancel artwork request, loading is stopped if nobody else
+            is waiting for this artwork
+            @param request as ArtworkRequest
+        """
+        with self.__lock:
+            pending = self.__pending.get(request.key)
+            if pending is None or request not in pending.requests:
+                return
+            pending.requests.remove(request)
+            if not pending.requests:
+                pending.task.cancel()
+                del self.__pending[request.key]
 
     def get_album_artwork2(self, uri, size, scale):
         """
@@ -375,8 +456,50 @@ class AlbumArt(BaseArt, TagReader):
                 basename = f.get_basename()
                 if re.search("%s_.*\.jpg" % re.escape(cache_name), basename):
                     f.delete()
+            self.__store.remove(cache_name)
+            self.__schedule_flush()
         except Exception as e:
             print("Art::clean_album_cache(): ", e, cache_name)
+        self._clean_surface_cache(album.id)
+
+    def flush_album_cache(self):
+        """
+            Write cache index to disk
+        """
+        self.__store.flush()
+        self.__embedded.flush()
+
+    def add_embedded_artwork(self, data):
+        """
+            Store artwork extracted from tags, identical artworks
+            are stored once
+            @param data as bytes
+            @return artwork hash as str
+            @thread safe
+        """
+        artwork = sha1(data).hexdigest()
+        if not self.__embedded.exists(artwork, 0):
+            self.__embedded.add(artwork, 0, data)
+            self.__schedule_flush()
+        return artwork
+
+    def migrate_album_cache(self):
+        """
+            Move artworks cached as files by previous versions to store
+            @thread safe
+        """
+        if Lp().settings.get_value("cover-cache-migrated"):
+            return
+        try:
+            # Default icons are cached as files
+            count = self.__store.import_directory(
+                                self._CACHE_PATH, ".jpg",
+                                lambda name: name.endswith("-symbolic"))
+            debug("AlbumArt::migrate_album_cache(): %s files" % count)
+            GLib.idle_add(Lp().settings.set_value, "cover-cache-migrated",
+                          GLib.Variant("b", True))
+        except Exception as e:
+            print("AlbumArt::migrate_album_cache():", e)
 
     def pixbuf_from_tags(self, uri, size):
         """
@@ -385,28 +508,17 @@ class AlbumArt(BaseArt, TagReader):
             @param size as int
         """
         pixbuf = None
-        if uri.startswith("http:") or uri.startswith("https:"):
-            return
+        data = self.__get_tags_artwork_data(uri)
+        if data is None:
+            return None
         try:
-            info = self.get_info(uri)
-            exist = False
-            if info is not None:
-                (exist, sample) = info.get_tags().get_sample_index("image", 0)
-                # Some file store it in a preview-image tag
-                if not exist:
-                    (exist, sample) = info.get_tags().get_sample_index(
-                                                            "preview-image", 0)
-            if exist:
-                (exist, mapflags) = sample.get_buffer().map(Gst.MapFlags.READ)
-            if exist:
-                stream = Gio.MemoryInputStream.new_from_data(mapflags.data,
-                                                             None)
-                pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(stream,
-                                                                   size,
-                                                                   size,
-                                                                   False,
-                                                                   None)
-                stream.close()
+            stream = Gio.MemoryInputStream.new_from_data(data, None)
+            pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(stream,
+                                                               size,
+                                                               size,
+                                                               False,
+                                                               None)
+            stream.close()
         except Exception as e:
             print("AlbumArt::pixbuf_from_tags():", e)
         return pixbuf
@@ -420,9 +532,303 @@ class AlbumArt(BaseArt, TagReader):
             "_" + album.name[:100] + "_" + album.year
         return escape(name)
 
+#######################
+# PROTECTED           #
+#######################
+    def _clean_store(self):
+        """
+            Remove all artworks from stores
+        """
+        self.__store.clear()
+        self.__embedded.clear()
+
+    def _clean_surface_cache(self, album_id=None):
+        """
+            Remove surfaces from memory, pending requests are restarted
+            @param album id as int/None for all albums
+        """
+        with self.__lock:
+            for key in list(self.__surfaces.keys()):
+                if album_id is None or key[0] == album_id:
+                    surface = self.__surfaces.pop(key)
+                    self.__surfaces_size -= self.__get_surface_size(surface)
+            for key in self.__pending.keys():
+                if album_id is None or key[0] == album_id:
+                    self.__pending[key].task.cancel()
+                    self.__submit(key)
+
 #######################
 # PRIVATE             #
 #######################
+    def __get_album_pixbuf(self, album, size, scale):
+        """
+            Get pixbuf for album, from cache or from album artwork
+            On cache miss, artwork is decoded once for all cached sizes
+            @param album as Album
+            @param pixbuf size as int
+            @param scale factor as int
+            @return GdkPixbuf.Pixbuf/None
+        """
+        filename = self.get_album_cache_name(album)
+        pixbuf = None
+        try:
+            # Look in cache
+            data = self.__store.get(filename, size * scale)
+            if data is None:
+                cache_miss("covers")
+            else:
+                cache_hit("covers")
+                stream = Gio.MemoryInputStream.new_from_data(data, None)
+                pixbuf = GdkPixbuf.Pixbuf.new_from_stream(stream, None)
+                stream.close()
+                return pixbuf
+            data = self.__get_album_artwork_data(album)
+            # Use default artwork
+            if data is None:
+                self.cache_album_art(album.id)
+                return None
+            sizes = {ArtSize.SMALL, ArtSize.MEDIUM,
+                     ArtSize.BIG, ArtSize.MONSTER, size}
+            # Decode at bigger size and scale down for others
+            master = self._get_pixbuf_from_data(data,
+                                                max(sizes) * scale)
+            quality = str(Lp().settings.get_value(
+                                            "cover-quality").get_int32())
+            for cache_size in sorted(sizes, reverse=True):
+                (width, height) = self._get_scaled_size(
+                                                master.get_width(),
+                                                master.get_height(),
+                                                cache_size * scale)
+                scaled = master.scale_simple(width, height,
+                                             GdkPixbuf.InterpType.BILINEAR)
+                (status, jpeg) = scaled.save_to_bufferv("jpeg",
+                                                        ["quality"],
+                                                        [quality])
+                if status:
+                    self.__store.add(filename, cache_size * scale, jpeg)
+                if cache_size == size:
+                    pixbuf = scaled
+            del master
+            self.__schedule_flush()
+        except Exception as e:
+            print("AlbumArt::__get_album_pixbuf()", e)
+            pixbuf = None
+        return pixbuf
+
+    def __get_album_artwork_data(self, album):
+        """
+            Get album artwork data, looking for:
+            - favorite folder artwork
+            - tags artwork
+            - any folder artwork
+            @param album as Album
+            @return bytes/None
+        """
+        uri = self.get_album_artwork_uri(album)
+        if uri is not None:
+            f = Lio.File.new_for_uri(uri)
+            (status, data, tag) = f.load_contents(None)
+            if status:
+                return data
+        if album.tracks:
+            data = self.__get_embedded_artwork_data(album)
+            if data is not None:
+                return data
+        if album.uri != "":
+            uri = self.get_first_album_artwork(album)
+            if uri is not None:
+                f = Lio.File.new_for_uri(uri)
+                (status, data, tag) = f.load_contents(None)
+                if status:
+                    return data
+        return None
+
+    def __get_embedded_artwork_data(self, album):
+        """
+            Get artwork extracted from tags by scanner, read tags
+            if not extracted yet
+            @param album as Album
+            @return bytes/None
+        """
+        artwork = Lp().albums.get_artwork(album.id)
+        if artwork is not None:
+            data = self.__embedded.get(artwork, 0)
+            if data is not None:
+                cache_hit("embedded")
+                return data
+            cache_miss("embedded")
+        track = album.tracks[0]
+        data = self.__get_tags_artwork_data(track.uri)
+        # Evicted or scanned by a previous version
+        if data is not None and track.id is not None and track.id >= 0:
+            Lp().tracks.set_artwork(track.id, self.add_embedded_artwork(data))
+        return data
+
+    def __get_tags_artwork_data(self, uri):
+        """
+            Get artwork data from tags
+            @param uri as str
+            @return bytes/None
+        """
+        if uri.startswith("http:") or uri.startswith("https:"):
+            return None
+        try:
+            info = self.get_info(uri)
+            if info is not None:
+                return self.get_artwork_data(info.get_tags())
+        except Exception as e:
+            print("AlbumArt::__get_tags_artwork_data():", e)
+        return None
+
+    def __get_store_max_size(self):
+        """
+            Get store byte budget from settings
+            @return int
+        """
+        return max(0, Lp().settings.get_value(
+                                "cover-cache-size").get_int32()) * 1024 * 1024
+
+    def __get_embedded_max_size(self):
+        """
+            Get embedded store byte budget from settings
+            @return int
+        """
+        return max(0, Lp().settings.get_value(
+                            "embedded-cache-size").get_int32()) * 1024 * 1024
+
+    def __schedule_flush(self):
+        """
+            Write stores index after a delay, merging changes
+            @thread safe
+        """
+        with self.__lock:
+            if self.__flush_id is None:
+                self.__flush_id = GLib.timeout_add_seconds(
+                                                    5, self.__on_flush_timeout)
+
+    def __flush_store(self):
+        """
+            Write stores index and reclaim removed artworks space
+        """
+        try:
+            for store in [self.__store, self.__embedded]:
+                store.flush()
+                if store.compact():
+                    debug("AlbumArt::__flush_store(): store compacted")
+        except Exception as e:
+            print("AlbumArt::__flush_store():", e)
+
+    def __on_flush_timeout(self):
+        """
+            Flush store in background
+        """
+        with self.__lock:
+            self.__flush_id = None
+        Lp().executor.submit(self.__flush_store,
+                             priority=TaskPriority.BACKGROUND)
+
+    def __on_cover_cache_size_changed(self, settings, value):
+        """
+            Update store byte budget
+            @param settings as Gio.Settings
+            @param value as GLib.Variant
+        """
+        self.__store.set_max_size(self.__get_store_max_size())
+
+    def __on_embedded_cache_size_changed(self, settings, value):
+        """
+            Update embedded store byte budget
+            @param settings as Gio.Settings
+            @param value as GLib.Variant
+        """
+        self.__embedded.set_max_size(self.__get_embedded_max_size())
+
+    def __surface_from_pixbuf(self, key, pixbuf):
+        """
+            Create surface from pixbuf and keep it in memory
+            @param key as (int, int, int)
+            @param pixbuf as GdkPixbuf.Pixbuf/None
+            @return cairo surface
+        """
+        (album_id, size, scale) = key
+        if pixbuf is None:
+            surface = self.get_default_icon("folder-music-symbolic",
+                                            size * scale,
+                                            scale)
+        else:
+            surface = Gdk.cairo_surface_create_from_pixbuf(pixbuf, scale, None)
+        with self.__lock:
+            if key not in self.__surfaces:
+                self.__surfaces_size += self.__get_surface_size(surface)
+            self.__surfaces[key] = surface
+            # Forget least recently used surfaces
+            while self.__surfaces_size > self._SURFACES_MAX_SIZE:
+                (k, old) = self.__surfaces.popitem(last=False)
+                self.__surfaces_size -= self.__get_surface_size(old)
+        return surface
+
+    def __get_surface(self, key):
+        """
+            Get surface from memory
+            @param key as (int, int, int)
+            @return cairo surface/None
+        """
+        with self.__lock:
+            surface = self.__surfaces.get(key)
+            if surface is not None:
+                self.__surfaces.move_to_end(key)
+            return surface
+
+    def __get_surface_size(self, surface):
+        """
+            Get surface size in memory
+            @param surface as cairo surface
+            @return bytes as int
+        """
+        return surface.get_width() * surface.get_height() * 4
+
+    def __submit(self, key):
+        """
+            Queue loading for pending artwork
+            @param key as (int, int, int)
+            @warning lock must be held
+        """
+        pending = self.__pending[key]
+        self.__serial += 1
+        pending.serial = self.__serial
+        pending.task = Lp().executor.submit(self.__load_album_artwork,
+                                            key, pending.album,
+                                            pending.serial,
+                                            priority=pending.priority)
+
+    def __load_album_artwork(self, key, album, serial):
+        """
+            Load album pixbuf, surface is created in main loop
+            @param key as (int, int, int)
+            @param album as Album
+            @param serial as int
+            @thread safe
+        """
+        pixbuf = self.__get_album_pixbuf(album, key[1], key[2])
+        GLib.idle_add(self.__on_album_artwork_loaded, key, serial, pixbuf)
+
+    def __on_album_artwork_loaded(self, key, serial, pixbuf):
+        """
+            Run callbacks waiting for artwork
+            @param key as (int, int, int)
+            @param serial as int
+            @param pixbuf as GdkPixbuf.Pixbuf/None
+        """
+        with self.__lock:
+            pending = self.__pending.get(key)
+            # Request cancelled or restarted
+            if pending is None or pending.serial != serial:
+                return
+            del self.__pending[key]
+        surface = self.__surface_from_pixbuf(key, pixbuf)
+        for request in pending.requests:
+            request.callback(surface)
+
     def __save_artwork_tags(self, data, album):
         """
             Save artwork in tags
@@ -16,10 +16,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gtk, Gdk, GObject, GdkPixbuf, Gio, GLib
+from gi.repository import Gtk, Gdk, GObject, GdkPixbuf, GLib
 
 from lollypop.define import ArtSize, Lp
 from lollypop.lio import Lio
+from lollypop.utils import cache_hit, cache_miss
 
 
 class BaseArt(GObject.GObject):
@@ -35,6 +36,10 @@ class BaseArt(GObject.GObject):
         _STORE_PATH = GLib.get_home_dir() + "/.local/share/lollypop/store"
     else:
         _STORE_PATH = GLib.getenv("XDG_DATA_HOME") + "/lollypop/store"
+    # Album covers store name in _CACHE_PATH
+    _COVERS_STORE = "albums"
+    # Artworks extracted from tags store name in _CACHE_PATH
+    _EMBEDDED_STORE = "embedded"
     __gsignals__ = {
         "album-artwork-changed": (GObject.SignalFlags.RUN_FIRST, None, (int,)),
         "artist-artwork-changed": (GObject.SignalFlags.RUN_FIRST,
@@ -86,12 +91,14 @@ class BaseArt(GObject.GObject):
             cache_path_jpg = self._get_default_icon_path(size, icon_name)
             f = Lio.File.new_for_path(cache_path_jpg)
             if f.query_exists():
+                cache_hit("artwork", cache_path_jpg)
                 pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
                                                                 cache_path_jpg,
                                                                 size,
                                                                 size,
                                                                 False)
             else:
+                cache_miss("artwork")
                 # get a small pixbuf with the given path
                 icon_size = size / 4
                 icon = Gtk.IconTheme.get_default().load_icon(icon_name,
@@ -133,29 +140,54 @@ class BaseArt(GObject.GObject):
 #######################
 # PROTECTED           #
 #######################
-    def _respect_ratio(self, uri):
+    def _respect_ratio(self, width, height):
         """
             Check for aspect ratio based on size
-            @param uri as str
+            @param width as int
+            @param height as int
             @return respect aspect ratio as bool
         """
-        f = Lio.File.new_for_uri(uri)
-        (status, data, tag) = f.load_contents(None)
-        stream = Gio.MemoryInputStream.new_from_data(data,
-                                                     None)
-        cover = GdkPixbuf.Pixbuf.new_from_stream(stream, None)
-        stream.close()
-        cover_width = cover.get_width()
-        cover_height = cover.get_height()
-        del cover
-        if cover_width == cover_height:
+        if width == height:
             return True
-        elif cover_width < cover_height:
-            cut = cover_height / 5
-            return cover_width < cover_height - cut
+        elif width < height:
+            cut = height / 5
+            return width < height - cut
         else:
-            cut = cover_width / 5
-            return cover_height < cover_width - cut
+            cut = width / 5
+            return height < width - cut
+
+    def _get_scaled_size(self, width, height, size):
+        """
+            Get artwork size for an image scaled to size
+            Nearly squared images are squared
+            @param width as int
+            @param height as int
+            @param size as int
+            @return (width as int, height as int)
+        """
+        if not self._respect_ratio(width, height):
+            return (size, size)
+        elif width > height:
+            return (size, max(1, height * size // width))
+        else:
+            return (max(1, width * size // height), size)
+
+    def _get_pixbuf_from_data(self, data, size):
+        """
+            Decode image data scaled to size
+            Dimensions are read from image header so scaling happens
+            while decoding
+            @param data as bytes
+            @param size as int
+            @return GdkPixbuf.Pixbuf
+        """
+        loader = GdkPixbuf.PixbufLoader.new()
+        loader.connect("size-prepared", self.__on_size_prepared, size)
+        try:
+            loader.write(data)
+        finally:
+            loader.close()
+        return loader.get_pixbuf()
 
     def _create_store(self):
         """
@@ -189,3 +221,12 @@ class BaseArt(GObject.GObject):
 #######################
 # PRIVATE             #
 #######################
+    def __on_size_prepared(self, loader, width, height, size):
+        """
+            Set size image will be decoded at
+            @param loader as GdkPixbuf.PixbufLoader
+            @param width as int
+            @param height as int
+            @param size as int
+        """
+        loader.set_size(*self._get_scaled_size(width, height, size))
@@ -0,0 +1,134 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+from collections import deque
+from time import time
+
+from lollypop.define import Lp, ArtSize, TaskPriority
+from lollypop.objects import Album
+from lollypop.utils import debug
+
+
+class ArtPrefetcher:
+    """
+        Render album artworks in cache before views need them,
+        one album at a time in background lane
+    """
+    # Delay between albums in ms
+    __INTERVAL = 100
+    # Pause after playback changes in seconds
+    __PLAYBACK_PAUSE = 5
+
+    def __init__(self):
+        """
+            Init prefetcher
+        """
+        self.__album_ids = deque()
+        self.__total = 0
+        self.__done = 0
+        self.__timeout_id = None
+        self.__task = None
+        self.__paused_until = 0
+        Lp().player.connect("status-changed", self.__on_playback_changed)
+        Lp().player.connect("current-changed", self.__on_playback_changed)
+        Lp().player.connect("loading-changed", self.__on_loading_changed)
+
+    def add(self, album_ids):
+        """
+            Queue albums for rendering
+            @param album ids as [int]
+        """
+        queued = set(self.__album_ids)
+        album_ids = [album_id for album_id in album_ids
+                     if album_id not in queued]
+        if not album_ids:
+            return
+        debug("ArtPrefetcher::add(): %s albums" % len(album_ids))
+        self.__album_ids.extend(album_ids)
+        self.__total += len(album_ids)
+        Lp().window.progress.add(self)
+        Lp().window.progress.set_fraction(self.__done / self.__total, self)
+        self.__schedule(self.__INTERVAL)
+
+#######################
+# PRIVATE             #
+#######################
+    def __schedule(self, delay):
+        """
+            Render next album after delay, if not already rendering
+            @param delay in ms as int
+        """
+        if self.__timeout_id is None and self.__task is None:
+            self.__timeout_id = GLib.timeout_add(delay, self.__on_timeout)
+
+    def __render(self, album_id, size, scale):
+        """
+            Render album artwork
+            @param album id as int
+            @param size as int
+            @param scale factor as int
+            @thread safe
+        """
+        try:
+            Lp().art.prerender_album_artwork(Album(album_id), size, scale)
+        except Exception as e:
+            print("ArtPrefetcher::__render():", e)
+        GLib.idle_add(self.__on_rendered)
+
+    def __on_timeout(self):
+        """
+            Render next album, wait if playback is starting
+        """
+        self.__timeout_id = None
+        pause = self.__paused_until - time()
+        if pause > 0:
+            self.__schedule(int(pause * 1000))
+        elif self.__album_ids:
+            album_id = self.__album_ids.popleft()
+            self.__task = Lp().executor.submit(
+                                        self.__render,
+                                        album_id,
+                                        ArtSize.BIG,
+                                        Lp().window.get_scale_factor(),
+                                        priority=TaskPriority.BACKGROUND)
+        return False
+
+    def __on_rendered(self):
+        """
+            Update progress and render next album
+        """
+        self.__task = None
+        self.__done += 1
+        fraction = self.__done / self.__total
+        Lp().window.progress.set_fraction(fraction, self)
+        if self.__album_ids:
+            self.__schedule(self.__INTERVAL)
+        else:
+            self.__total = 0
+            self.__done = 0
+
+    def __on_playback_changed(self, player):
+        """
+            Pause rendering while playback is starting
+            @param player as Player
+        """
+        self.__paused_until = time() + self.__PLAYBACK_PAUSE
+
+    def __on_loading_changed(self, player, loading):
+        """
+            Pause rendering while track is loading
+            @param player as Player
+            @param loading as bool
+        """
+        self.__on_playback_changed(player)
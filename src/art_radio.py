@@ -16,6 +16,7 @@ import re
 
 from lollypop.art_base import BaseArt
 from lollypop.lio import Lio
+from lollypop.utils import cache_hit, cache_miss
 
 
 class RadioArt(BaseArt):
@@ -53,6 +54,7 @@ class RadioArt(BaseArt):
                                                size)
             f = Lio.File.new_for_path(cache_path_png)
             if f.query_exists():
+                cache_hit("artwork", cache_path_png)
                 return cache_path_png
             else:
                 self.get_radio_artwork(name, size, 1)
@@ -83,10 +85,12 @@ class RadioArt(BaseArt):
             # Look in cache
             f = Lio.File.new_for_path(cache_path_png)
             if f.query_exists():
+                cache_hit("artwork", cache_path_png)
                 pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(cache_path_png,
                                                                 size,
                                                                 size)
             else:
+                cache_miss("artwork")
                 path = self.__get_radio_art_path(name)
                 if path is not None:
                     pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(path,
@@ -0,0 +1,611 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from os import (path, open as os_open, close, pread, fstat, ftruncate,
+                remove, rename, listdir, stat, O_RDONLY, O_RDWR, O_CREAT,
+                O_APPEND, O_TRUNC)
+from os import write as os_write
+from fcntl import flock, LOCK_EX, LOCK_SH, LOCK_UN
+from mmap import mmap, ACCESS_READ
+from struct import Struct
+from hashlib import sha1
+from threading import Lock
+from time import time
+import re
+
+
+class BlobStore:
+    """
+        Append only packed store for small files, keyed by (name, size)
+        - name.pack: records appended as header, name, data
+        - name.index: header then records sorted by (name hash, size),
+          memory mapped and looked up by binary search
+        Changes since last flush are kept in memory, index is rebuilt
+        from pack tail if not flushed. Space of removed records is
+        reclaimed by compaction
+        Only one process may write, others open store read only. Pack
+        is locked with flock() while appending and recovering
+    """
+    VERSION = 2
+    # magic, version, count, pack size, live bytes, dead bytes
+    __HEADER = Struct("<4sIIQQQ")
+    # name hash, size, offset, length, access time
+    __RECORD = Struct("<QIQII")
+    # name length, size, data length
+    __BLOB = Struct("<HII")
+    # Data length of a record removing all sizes for name
+    __TOMBSTONE = 0xFFFFFFFF
+    # Data length of a record removing one size for name
+    __EVICTED = 0xFFFFFFFE
+
+    def __init__(self, directory, name, max_size, read_only=False):
+        """
+            Open store in directory
+            @param directory as str
+            @param name as str
+            @param max_size in bytes as int, 0 for no limit
+            @param read_only as bool, store written by another process,
+                   writes are ignored
+        """
+        self.__pack_path = "%s/%s.pack" % (directory, name)
+        self.__index_path = "%s/%s.index" % (directory, name)
+        self.__max_size = max_size
+        self.__read_only = read_only
+        self.__lock = Lock()
+        self.__fd = None
+        # Incremented each time pack is opened
+        self.__generation = 0
+        self.__compacting = False
+        self.__open()
+
+    @property
+    def count(self):
+        """
+            Get entries count
+            @return int
+        """
+        with self.__lock:
+            return sum(1 for entry in self.__entries())
+
+    @property
+    def size(self):
+        """
+            Get size used by live entries
+            @return bytes as int
+        """
+        with self.__lock:
+            return self.__live
+
+    @property
+    def dead_size(self):
+        """
+            Get size used by removed entries
+            @return bytes as int
+        """
+        with self.__lock:
+            return self.__dead
+
+    def set_max_size(self, max_size):
+        """
+            Set byte budget, entries are evicted on next add
+            @param max_size in bytes as int, 0 for no limit
+        """
+        self.__max_size = max_size
+
+    def exists(self, name, size):
+        """
+            True if entry exists
+            @param name as str
+            @param size as int
+            @return bool
+        """
+        with self.__lock:
+            return self.__lookup((self.__hash(name), size)) is not None
+
+    def get(self, name, size):
+        """
+            Get data for entry, update access time
+            @param name as str
+            @param size as int
+            @return bytes/None
+            @thread safe
+        """
+        key = (self.__hash(name), size)
+        with self.__lock:
+            entry = self.__lookup(key)
+            if entry is None:
+                return None
+            (offset, length, atime) = entry
+            encoded = name.encode("utf-8")
+            blob = pread(self.__fd,
+                         self.__BLOB.size + len(encoded) + length,
+                         offset)
+            # Different names with same hash
+            start = self.__BLOB.size
+            if blob[start:start + len(encoded)] != encoded:
+                return None
+            self.__changes[key] = (offset, length, int(time()))
+            return blob[start + len(encoded):]
+
+    def add(self, name, size, data):
+        """
+            Add data for entry, replace previous one
+            @param name as str
+            @param size as int
+            @param data as bytes
+            @thread safe
+        """
+        if self.__read_only:
+            return
+        key = (self.__hash(name), size)
+        encoded = name.encode("utf-8")
+        with self.__lock:
+            previous = self.__get_entry(key)
+            if previous is not None:
+                self.__live -= previous[1]
+                self.__dead += previous[1]
+            offset = self.__append(encoded, size, data)
+            self.__changes[key] = (offset, len(data), int(time()))
+            self.__live += len(data)
+            if self.__max_size and self.__live > self.__max_size:
+                self.__evict()
+
+    def remove(self, name):
+        """
+            Remove all sizes for name
+            @param name as str
+            @thread safe
+        """
+        if self.__read_only:
+            return
+        h = self.__hash(name)
+        with self.__lock:
+            keys = [key for (key, entry) in self.__entries() if key[0] == h]
+            if not keys:
+                return
+            for key in keys:
+                self.__remove_key(key)
+            # Keep removal if index is not flushed
+            self.__append_removal(name.encode("utf-8"), 0, self.__TOMBSTONE)
+
+    def close(self):
+        """
+            Close store, changes not flushed are kept in pack
+        """
+        with self.__lock:
+            self.__close()
+
+    def clear(self):
+        """
+            Remove all entries
+        """
+        if self.__read_only:
+            return
+        with self.__lock:
+            self.__close()
+            for filepath in [self.__pack_path, self.__index_path]:
+                if path.exists(filepath):
+                    remove(filepath)
+            self.__open()
+
+    def flush(self):
+        """
+            Write index to disk
+            @thread safe
+        """
+        if self.__read_only:
+            return
+        with self.__lock:
+            if not self.__changes:
+                return
+            records = sorted(self.__entries())
+            self.__write_index(records, self.__pack_size)
+            self.__unmap_index()
+            self.__changes = {}
+            self.__map_index()
+
+    def compact(self, ratio=0.5):
+        """
+            Rewrite pack without removed entries if they use more than
+            ratio of pack size. Entries are copied without holding the
+            lock, records added meanwhile are then copied as is
+            @param ratio as float
+            @return True if compacted
+            @thread safe
+        """
+        if self.__read_only:
+            return False
+        with self.__lock:
+            if self.__compacting or self.__pack_size == 0 or\
+                    self.__dead < self.__pack_size * ratio:
+                return False
+            src = os_open(self.__pack_path, O_RDONLY)
+            self.__compacting = True
+            records = sorted(self.__entries(), key=lambda r: r[1][0])
+            generation = self.__generation
+            copied_size = self.__pack_size
+        tmp_path = self.__pack_path + ".tmp"
+        fd = None
+        try:
+            fd = os_open(tmp_path, O_RDWR | O_CREAT | O_TRUNC, 0o600)
+            pack_size = 0
+            # Old offset to new offset
+            offsets = {}
+            for (key, (offset, length, atime)) in records:
+                header = pread(src, self.__BLOB.size, offset)
+                (name_length, unused, unused) = self.__BLOB.unpack(header)
+                blob_size = self.__BLOB.size + name_length + length
+                os_write(fd, pread(src, blob_size, offset))
+                offsets[offset] = pack_size
+                pack_size += blob_size
+            with self.__lock:
+                # Store cleared meanwhile
+                if generation != self.__generation:
+                    close(fd)
+                    fd = None
+                    remove(tmp_path)
+                    return False
+                # Copy records added meanwhile
+                offset = copied_size
+                while offset < self.__pack_size:
+                    data = pread(self.__fd,
+                                 min(1024 * 1024, self.__pack_size - offset),
+                                 offset)
+                    os_write(fd, data)
+                    offset += len(data)
+                shift = pack_size - copied_size
+                compacted = []
+                for (key, (offset, length, atime)) in self.__entries():
+                    if offset >= copied_size:
+                        offset += shift
+                    else:
+                        offset = offsets[offset]
+                    compacted.append((key, (offset, length, atime)))
+                pack_size = self.__pack_size + shift
+                close(fd)
+                fd = None
+                self.__close()
+                rename(tmp_path, self.__pack_path)
+                self.__dead = pack_size - self.__live
+                self.__write_index(sorted(compacted), pack_size)
+                self.__open()
+                return True
+        finally:
+            close(src)
+            if fd is not None:
+                close(fd)
+            with self.__lock:
+                self.__compacting = False
+
+    def import_directory(self, directory, extension, exclude=None):
+        """
+            Import files named name_size.extension from directory,
+            imported files are removed
+            @param directory as str
+            @param extension as str
+            @param exclude as function(name as str) -> bool
+            @return imported files count as int
+        """
+        count = 0
+        if self.__read_only or not path.isdir(directory):
+            return count
+        pattern = r"^(.+)_([0-9]+)%s$" % re.escape(extension)
+        for filename in listdir(directory):
+            match = re.match(pattern, filename)
+            if match is None:
+                continue
+            (name, size) = match.groups()
+            if exclude is not None and exclude(name):
+                continue
+            filepath = "%s/%s" % (directory, filename)
+            try:
+                with open(filepath, "rb") as f:
+                    data = f.read()
+                if data:
+                    self.add(name, int(size), data)
+                remove(filepath)
+                count += 1
+            except Exception as e:
+                print("BlobStore::import_directory():", e, filepath)
+        self.flush()
+        return count
+
+#######################
+# PRIVATE             #
+#######################
+    def __hash(self, name):
+        """
+            Hash name for index
+            @param name as str
+            @return int
+        """
+        return self.__hash_bytes(name.encode("utf-8"))
+
+    def __hash_bytes(self, encoded):
+        """
+            Hash encoded name for index
+            @param encoded as bytes
+            @return int
+        """
+        return int.from_bytes(sha1(encoded).digest()[:8], "little")
+
+    def __open(self):
+        """
+            Open pack and map index, recover entries not in index
+        """
+        self.__generation += 1
+        self.__changes = {}
+        self.__index = None
+        self.__count = 0
+        self.__pack_size = 0
+        self.__live = 0
+        self.__dead = 0
+        if self.__read_only:
+            # Not created yet by writer
+            if not path.exists(self.__pack_path):
+                return
+            self.__fd = os_open(self.__pack_path, O_RDONLY)
+        else:
+            self.__fd = os_open(self.__pack_path,
+                                O_RDWR | O_CREAT | O_APPEND, 0o600)
+        try:
+            self.__map_index()
+        except Exception as e:
+            print("BlobStore::__open():", e)
+            self.__unmap_index()
+            self.__pack_size = 0
+            self.__live = 0
+            self.__dead = 0
+        self.__recover()
+
+    def __close(self):
+        """
+            Close pack and index
+        """
+        self.__unmap_index()
+        if self.__fd is not None:
+            close(self.__fd)
+            self.__fd = None
+
+    def __map_index(self):
+        """
+            Map index if valid for pack
+        """
+        if not path.exists(self.__index_path):
+            return
+        with open(self.__index_path, "rb") as f:
+            if fstat(f.fileno()).st_size < self.__HEADER.size:
+                return
+            index = mmap(f.fileno(), 0, access=ACCESS_READ)
+        (magic, version, count, pack_size,
+         live, dead) = self.__HEADER.unpack_from(index)
+        if magic != b"LPBS" or version != self.VERSION or\
+                pack_size > fstat(self.__fd).st_size or\
+                len(index) != self.__HEADER.size + count * self.__RECORD.size:
+            index.close()
+            return
+        self.__index = index
+        self.__count = count
+        self.__pack_size = pack_size
+        self.__live = live
+        self.__dead = dead
+
+    def __unmap_index(self):
+        """
+            Unmap index
+        """
+        if self.__index is not None:
+            self.__index.close()
+            self.__index = None
+            self.__count = 0
+
+    def __recover(self):
+        """
+            Read pack records not in index
+        """
+        # Writer does not append while pack is read
+        flock(self.__fd, LOCK_SH if self.__read_only else LOCK_EX)
+        try:
+            self.__read_tail()
+        finally:
+            flock(self.__fd, LOCK_UN)
+
+    def __read_tail(self):
+        """
+            Read records from pack size to end of pack
+        """
+        end = fstat(self.__fd).st_size
+        offset = self.__pack_size
+        while offset + self.__BLOB.size <= end:
+            (name_length, size, length) = self.__BLOB.unpack(
+                                  pread(self.__fd, self.__BLOB.size, offset))
+            name = pread(self.__fd, name_length, offset + self.__BLOB.size)
+            if len(name) != name_length:
+                break
+            h = self.__hash_bytes(name)
+            removal = length in [self.__TOMBSTONE, self.__EVICTED]
+            if removal:
+                blob_size = self.__BLOB.size + name_length
+                if length == self.__EVICTED:
+                    self.__remove_key((h, size))
+                else:
+                    for (key, entry) in list(self.__entries()):
+                        if key[0] == h:
+                            self.__remove_key(key)
+            else:
+                blob_size = self.__BLOB.size + name_length + length
+                if offset + blob_size > end:
+                    break
+                previous = self.__get_entry((h, size))
+                if previous is not None:
+                    self.__live -= previous[1]
+                    self.__dead += previous[1]
+                self.__changes[(h, size)] = (offset, length, int(time()))
+                self.__live += length
+            self.__dead += blob_size - (0 if removal else length)
+            offset += blob_size
+        # Drop a record partially written
+        if offset < end and not self.__read_only:
+            ftruncate(self.__fd, offset)
+        self.__pack_size = offset
+
+    def __append(self, encoded, size, data):
+        """
+            Append a record to pack
+            @param encoded name as bytes
+            @param size as int
+            @param data as bytes
+            @return record offset as int
+        """
+        offset = self.__pack_size
+        blob = self.__BLOB.pack(len(encoded), size, len(data)) +\
+            encoded + data
+        self.__dead += len(blob) - len(data)
+        self.__write(blob)
+        self.__pack_size += len(blob)
+        return offset
+
+    def __append_removal(self, encoded, size, removal):
+        """
+            Append a removal record to pack, so removal is kept
+            if index is not flushed
+            @param encoded name as bytes
+            @param size as int
+            @param removal as __TOMBSTONE (all sizes)/__EVICTED (size)
+        """
+        blob = self.__BLOB.pack(len(encoded), size, removal) + encoded
+        self.__dead += len(blob)
+        self.__write(blob)
+        self.__pack_size += len(blob)
+
+    def __write(self, blob):
+        """
+            Append blob to pack, readers never see a partial record
+            @param blob as bytes
+        """
+        flock(self.__fd, LOCK_EX)
+        try:
+            os_write(self.__fd, blob)
+        finally:
+            flock(self.__fd, LOCK_UN)
+
+    def __lookup(self, key):
+        """
+            Get entry for key, read only store first reads records
+            appended by writer since last lookup
+            @param key as (int, int)
+            @return (offset, length, atime)/None
+        """
+        if self.__read_only:
+            self.__refresh()
+        return self.__get_entry(key)
+
+    def __refresh(self):
+        """
+            Follow writer changes: reopen pack if created or replaced
+            by compaction or clear, else read records appended to it
+        """
+        try:
+            if not path.exists(self.__pack_path):
+                return
+            if self.__fd is None or\
+                    stat(self.__pack_path).st_ino != fstat(self.__fd).st_ino:
+                self.__close()
+                self.__open()
+            elif fstat(self.__fd).st_size > self.__pack_size:
+                self.__recover()
+        except Exception as e:
+            print("BlobStore::__refresh():", e)
+
+    def __remove_key(self, key):
+        """
+            Mark entry as removed
+            @param key as (int, int)
+        """
+        entry = self.__get_entry(key)
+        if entry is not None:
+            self.__live -= entry[1]
+            self.__dead += entry[1]
+            self.__changes[key] = None
+
+    def __evict(self):
+        """
+            Remove least recently used entries until store uses 90%
+            of its budget
+        """
+        target = self.__max_size * 0.9
+        entries = sorted(self.__entries(), key=lambda e: e[1][2])
+        for (key, (offset, length, atime)) in entries:
+            if self.__live <= target:
+                break
+            header = pread(self.__fd, self.__BLOB.size, offset)
+            (name_length, unused, unused) = self.__BLOB.unpack(header)
+            encoded = pread(self.__fd, name_length,
+                            offset + self.__BLOB.size)
+            self.__remove_key(key)
+            self.__append_removal(encoded, key[1], self.__EVICTED)
+
+    def __get_entry(self, key):
+        """
+            Get entry for key
+            @param key as (int, int)
+            @return (offset, length, atime)/None
+        """
+        if key in self.__changes:
+            return self.__changes[key]
+        # Binary search in index
+        low = 0
+        high = self.__count
+        while low < high:
+            middle = (low + high) // 2
+            record = self.__RECORD.unpack_from(
+                                    self.__index,
+                                    self.__HEADER.size +
+                                    middle * self.__RECORD.size)
+            if (record[0], record[1]) < key:
+                low = middle + 1
+            elif (record[0], record[1]) > key:
+                high = middle
+            else:
+                return record[2:]
+        return None
+
+    def __entries(self):
+        """
+            Iterate over live entries
+            @return iterator of ((hash, size), (offset, length, atime))
+        """
+        for i in range(self.__count):
+            record = self.__RECORD.unpack_from(
+                                    self.__index,
+                                    self.__HEADER.size +
+                                    i * self.__RECORD.size)
+            key = (record[0], record[1])
+            if key not in self.__changes:
+                yield (key, record[2:])
+        for (key, entry) in list(self.__changes.items()):
+            if entry is not None:
+                yield (key, entry)
+
+    def __write_index(self, records, pack_size):
+        """
+            Write index with records
+            @param records as [((int, int), (int, int, int))] sorted
+            @param pack_size as int
+        """
+        tmp_path = self.__index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.__HEADER.pack(b"LPBS", self.VERSION, len(records),
+                                       pack_size, self.__live, self.__dead))
+            for ((h, size), (offset, length, atime)) in records:
+                f.write(self.__RECORD.pack(h, size, offset, length, atime))
+        rename(tmp_path, self.__index_path)
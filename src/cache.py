@@ -14,7 +14,7 @@ from gi.repository import Gio, GLib, GdkPixbuf
 
 from os import mkdir, path, rename
 
-from lollypop.utils import escape
+from lollypop.utils import escape, cache_hit, cache_miss
 from lollypop.define import ArtSize, Lp
 from lollypop.lio import Lio
 
@@ -104,7 +104,10 @@ class InfoCache:
                     filepath_at_size = None
                     continue
                 # Make cache for this size
-                if not path.exists(filepath_at_size):
+                if path.exists(filepath_at_size):
+                    cache_hit("info", filepath_at_size)
+                else:
+                    cache_miss("info")
                     pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(filepath,
                                                                     size,
                                                                     size)
@@ -0,0 +1,212 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+from pickle import load, dump
+from threading import Lock
+from os import listdir, stat, remove, utime, path
+from stat import S_ISREG
+
+from lollypop.define import Lp, DataPath, TaskPriority
+from lollypop.art_base import BaseArt
+from lollypop.cache import InfoCache
+from lollypop.blobstore import BlobStore
+from lollypop.utils import debug
+
+
+class CacheManager:
+    """
+        Track artwork caches usage and keep file caches under a byte
+        budget, least recently used files are removed first
+    """
+    # Name, directory, store name or None for files
+    CACHES = [("covers", BaseArt._CACHE_PATH, BaseArt._COVERS_STORE),
+              ("embedded", BaseArt._CACHE_PATH, BaseArt._EMBEDDED_STORE),
+              ("artwork", BaseArt._CACHE_PATH, None),
+              ("info", InfoCache._CACHE_PATH, None)]
+    # Interval between evictions in seconds
+    __EVICT_INTERVAL = 3600
+
+    def __init__(self):
+        """
+            Init manager, load usage statistics
+        """
+        self.__path = DataPath + "/cache_stats.bin"
+        self.__lock = Lock()
+        # Files read since last eviction
+        self.__accessed = set()
+        self.__stats = {}
+        # True if stats changed since last save
+        self.__changed = False
+        try:
+            if path.exists(self.__path):
+                self.__stats = load(open(self.__path, "rb"))
+        except Exception as e:
+            print("CacheManager::__init__():", e)
+        for (name, directory, store) in self.CACHES:
+            if name not in self.__stats:
+                self.__stats[name] = [0, 0]
+
+    def start(self):
+        """
+            Evict now and then periodically
+        """
+        self.__on_evict_timeout()
+        GLib.timeout_add_seconds(self.__EVICT_INTERVAL,
+                                 self.__on_evict_timeout)
+
+    def hit(self, name, filepath=None):
+        """
+            Count a cache hit
+            @param name as str
+            @param filepath as str/None
+            @thread safe
+        """
+        with self.__lock:
+            self.__stats[name][0] += 1
+            self.__changed = True
+            if filepath is not None:
+                self.__accessed.add(filepath)
+
+    def miss(self, name):
+        """
+            Count a cache miss
+            @param name as str
+            @thread safe
+        """
+        with self.__lock:
+            self.__stats[name][1] += 1
+            self.__changed = True
+
+    def get_stats(self):
+        """
+            Get usage for caches
+            @return [(name as str, size as int, entries as int,
+                      hits as int, misses as int)]
+        """
+        stats = []
+        for (name, directory, store) in self.CACHES:
+            if store is not None:
+                (size, count) = self.__get_store_usage(directory, store)
+            else:
+                files = self.__get_files(directory)
+                size = sum([f[1] for f in files])
+                count = len(files)
+            with self.__lock:
+                (hits, misses) = self.__stats[name]
+            stats.append((name, size, count, hits, misses))
+        return stats
+
+    def evict(self):
+        """
+            Remove least recently used files until caches fit in budget
+            @thread safe
+        """
+        max_size = Lp().settings.get_value(
+                                "cache-max-size").get_int32() * 1024 * 1024
+        with self.__lock:
+            accessed = self.__accessed
+            self.__accessed = set()
+        # Access time is not reliable (noatime, relatime), use mtime
+        for filepath in accessed:
+            try:
+                utime(filepath)
+            except OSError as e:
+                debug("CacheManager::evict(): %s" % e)
+        if max_size > 0:
+            files = []
+            for (name, directory, store) in self.CACHES:
+                if store is None:
+                    files += self.__get_files(directory)
+            total = sum([f[1] for f in files])
+            count = 0
+            for (filepath, size, mtime) in sorted(files,
+                                                  key=lambda f: f[2]):
+                if total <= max_size * 0.9:
+                    break
+                try:
+                    remove(filepath)
+                    total -= size
+                    count += 1
+                except Exception as e:
+                    print("CacheManager::evict():", e)
+            debug("CacheManager::evict(): %s files removed" % count)
+        self.save()
+
+    def save(self):
+        """
+            Save usage statistics if changed
+            @thread safe
+        """
+        try:
+            with self.__lock:
+                if not self.__changed:
+                    return
+                self.__changed = False
+                stats = {name: list(value)
+                         for (name, value) in self.__stats.items()}
+            dump(stats, open(self.__path, "wb"))
+        except Exception as e:
+            print("CacheManager::save():", e)
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_files(self, directory):
+        """
+            Get cached files in directory
+            @param directory as str
+            @return [(path as str, size as int, mtime as float)]
+        """
+        files = []
+        if not path.isdir(directory):
+            return files
+        stores = tuple(store + "." for (name, d, store) in self.CACHES
+                       if store is not None)
+        for filename in listdir(directory):
+            # Stores evict by themselves
+            if filename.startswith(stores):
+                continue
+            filepath = "%s/%s" % (directory, filename)
+            try:
+                info = stat(filepath)
+                if S_ISREG(info.st_mode):
+                    files.append((filepath, info.st_size, info.st_mtime))
+            except OSError as e:
+                debug("CacheManager::__get_files(): %s" % e)
+        return files
+
+    def __get_store_usage(self, directory, name):
+        """
+            Get store usage
+            @param directory as str
+            @param name as str
+            @return (size as int, entries as int)
+        """
+        if not path.exists("%s/%s.pack" % (directory, name)):
+            return (0, 0)
+        try:
+            store = BlobStore(directory, name, 0, True)
+            usage = (store.size, store.count)
+            store.close()
+            return usage
+        except Exception as e:
+            print("CacheManager::__get_store_usage():", e)
+            return (0, 0)
+
+    def __on_evict_timeout(self):
+        """
+            Evict in background
+        """
+        Lp().executor.submit(self.evict, priority=TaskPriority.BACKGROUND)
+        return True
@@ -14,12 +14,14 @@ from gi.repository import GLib, GObject, Gio
 
 from gettext import gettext as _
 from threading import Thread
+from queue import Queue, Empty
 from time import time
 
 from lollypop.inotify import Inotify
 from lollypop.define import Lp
 from lollypop.sqlcursor import SqlCursor
 from lollypop.tagreader import TagReader
+from lollypop.art_prefetcher import ArtPrefetcher
 from lollypop.database_history import History
 from lollypop.utils import is_audio, is_pls, debug
 from lollypop.lio import Lio
@@ -45,15 +47,19 @@ class CollectionScanner(GObject.GObject, TagReader):
 
         self.__thread = None
         self.__history = None
+        # Albums added by scan, artworks rendered when finished
+        self.__album_ids = set()
+        self.__prefetcher = ArtPrefetcher()
         if Lp().settings.get_value("auto-update"):
             self.__inotify = Inotify()
         else:
             self.__inotify = None
         Lp().albums.update_max_count()
 
-    def update(self):
+    def update(self, full=False):
         """
             Update database
+            @param full as bool, if False, skip files in unchanged dirs
         """
         if not self.is_locked():
             uris = Lp().settings.get_music_uris()
@@ -63,7 +69,20 @@ class CollectionScanner(GObject.GObject, TagReader):
             Lp().window.progress.add(self)
             Lp().window.progress.set_fraction(0.0, self)
 
-            self.__thread = Thread(target=self.__scan, args=(uris,))
+            self.__thread = Thread(target=self.__scan, args=(uris, full))
+            self.__thread.daemon = True
+            self.__thread.start()
+
+    def update_uris(self, uris):
+        """
+            Update database for uris only
+            @param uris as [str], files or dirs, may be deleted
+        """
+        if not self.is_locked():
+            Lp().window.progress.add(self)
+            Lp().window.progress.set_fraction(0.0, self)
+
+            self.__thread = Thread(target=self.__scan_uris, args=(uris,))
             self.__thread.daemon = True
             self.__thread.start()
 
@@ -87,6 +106,14 @@ class CollectionScanner(GObject.GObject, TagReader):
         """
         self.__thread = None
 
+    @property
+    def inotify(self):
+        """
+            Get collection monitor
+            @return Inotify/None
+        """
+        return self.__inotify
+
 #######################
 # PRIVATE             #
 #######################
@@ -98,28 +125,60 @@ class CollectionScanner(GObject.GObject, TagReader):
         Lp().db.del_tracks(track_ids)
         self.stop()
 
-    def __get_objects_for_uris(self, uris):
+    def __get_objects_for_uris(self, uris, full):
         """
             Return all tracks/dirs for uris
+            If not full, files in dirs with unchanged mtime are not listed
             @param uris as string
-            @return (track uri as [str], track dirs as [str],
-                     ignore dirs as [str])
+            @param full as bool
+            @return ([(track uri as str, mtime as int)], track dirs as [str],
+                     ignore dirs as [str], unchanged dirs as set(str),
+                     dir mtimes as {str: int})
         """
         tracks = []
         ignore_dirs = []
         track_dirs = list(uris)
         walk_uris = list(uris)
+        # Known dirs, unchanged dirs and their known children
+        db_dir_mtimes = {} if full else Lp().db.get_dir_mtimes()
+        dir_mtimes = {}
+        unchanged_dirs = set()
+        children = {}
+        for d in db_dir_mtimes.keys():
+            children.setdefault(d[:d.rfind("/")], []).append(d)
+        for uri in uris:
+            mtime = self.__get_mtime(uri)
+            if mtime is not None:
+                dir_mtimes[uri] = mtime
+                if db_dir_mtimes.get(uri) == mtime:
+                    unchanged_dirs.add(uri)
         while walk_uris:
             uri = walk_uris.pop(0)
+            # Only look at subdirectories mtimes, files did not change
+            if uri in unchanged_dirs:
+                for child_uri in children.get(uri, []):
+                    mtime = self.__get_mtime(child_uri)
+                    if mtime is None:
+                        continue
+                    dir_mtimes[child_uri] = mtime
+                    track_dirs.append(child_uri)
+                    walk_uris.append(child_uri)
+                    if db_dir_mtimes[child_uri] == mtime:
+                        unchanged_dirs.add(child_uri)
+                continue
             empty = True
             try:
                 d = Lio.File.new_for_uri(uri)
                 infos = d.enumerate_children(
-                    "standard::name,standard::type,standard::is-hidden",
+                    "standard::name,standard::type,standard::is-hidden,"
+                    "standard::content-type,time::modified",
                     Gio.FileQueryInfoFlags.NONE,
                     None)
             except Exception as e:
                 print("CollectionScanner::__get_objects_for_uris():", e)
+                # Never seen as unchanged, files will be listed again
+                if uri in dir_mtimes:
+                    dir_mtimes[uri] = 0
                 continue
             for info in infos:
                 f = infos.get_child(info)
@@ -130,24 +189,48 @@ class CollectionScanner(GObject.GObject, TagReader):
                 elif info.get_file_type() == Gio.FileType.DIRECTORY:
                     track_dirs.append(child_uri)
                     walk_uris.append(child_uri)
+                    mtime = int(info.get_attribute_as_string(
+                                                            "time::modified"))
+                    dir_mtimes[child_uri] = mtime
+                    if db_dir_mtimes.get(child_uri) == mtime:
+                        unchanged_dirs.add(child_uri)
                 else:
                     try:
-                        f = Lio.File.new_for_uri(child_uri)
-                        if is_pls(f):
+                        if is_pls(f, info):
                             pass
-                        elif is_audio(f):
-                            tracks.append(child_uri)
+                        elif is_audio(f, info):
+                            mtime = int(info.get_attribute_as_string(
+                                                            "time::modified"))
+                            tracks.append((child_uri, mtime))
                         else:
                             debug("%s not detected as a music file" %
                                   child_uri)
                     except Exception as e:
                         print("CollectionScanner::"
                               "__get_objects_for_uris():", e)
+                        if uri in dir_mtimes:
+                            dir_mtimes[uri] = 0
             # If a root uri is empty
             # Ensure user is not doing something bad
             if empty and uri in uris:
                 ignore_dirs.append(uri)
-        return (tracks, track_dirs, ignore_dirs)
+        return (tracks, track_dirs, ignore_dirs, unchanged_dirs, dir_mtimes)
+
+    def __get_mtime(self, uri):
+        """
+            Get modification time for uri
+            @param uri as str
+            @return mtime as int/None
+        """
+        try:
+            f = Lio.File.new_for_uri(uri)
+            info = f.query_info("time::modified",
+                                Gio.FileQueryInfoFlags.NONE,
+                                None)
+            return int(info.get_attribute_as_string("time::modified"))
+        except Exception as e:
+            debug("CollectionScanner::__get_mtime(): %s" % e)
+            return None
 
     def __update_progress(self, current, total):
         """
@@ -167,27 +250,33 @@ class CollectionScanner(GObject.GObject, TagReader):
         Lp().albums.update_max_count()
         if Lp().settings.get_value("artist-artwork"):
             Lp().art.cache_artists_info()
+        self.__prefetcher.add(list(self.__album_ids))
+        self.__album_ids = set()
 
-    def __scan(self, uris):
+    def __scan(self, uris, full):
         """
             Scan music collection for music files
             @param uris as [string], uris to scan
+            @param full as bool
             @thread safe
         """
-        gst_message = None
         if self.__history is None:
             self.__history = History()
         mtimes = Lp().tracks.get_mtimes()
-        (new_tracks, new_dirs, ignore_dirs) = self.__get_objects_for_uris(
-                                                                         uris)
-        orig_tracks = Lp().tracks.get_uris(ignore_dirs)
+        (new_tracks, new_dirs, ignore_dirs,
+         unchanged_dirs, dir_mtimes) = self.__get_objects_for_uris(uris, full)
+        orig_tracks = set(Lp().tracks.get_uris(ignore_dirs))
         was_empty = len(orig_tracks) == 0
+        # Tracks in unchanged dirs are still there
+        if unchanged_dirs:
+            for uri in list(orig_tracks):
+                if uri[:uri.rfind("/")] in unchanged_dirs:
+                    orig_tracks.remove(uri)
 
         if ignore_dirs:
             if Lp().notify is not None:
                 Lp().notify.send(_("Lollypop is detecting an empty folder."),
                                  _("Check your music settings."))
-        count = len(new_tracks) + len(orig_tracks)
         # Add monitors on dirs
         if self.__inotify is not None:
             for d in new_dirs:
@@ -195,57 +284,13 @@ class CollectionScanner(GObject.GObject, TagReader):
                     self.__inotify.add_monitor(d)
 
         with SqlCursor(Lp().db) as sql:
-            i = 0
-            # Look for new files/modified files
             try:
-                to_add = []
-                for uri in new_tracks:
-                    if self.__thread is None:
-                        return
-                    try:
-                        GLib.idle_add(self.__update_progress, i, count)
-                        f = Lio.File.new_for_uri(uri)
-                        info = f.query_info("time::modified",
-                                            Gio.FileQueryInfoFlags.NONE,
-                                            None)
-                        mtime = int(info.get_attribute_as_string(
-                                                             "time::modified"))
-                        # If songs exists and mtime unchanged, continue,
-                        # else rescan
-                        if uri in orig_tracks:
-                            orig_tracks.remove(uri)
-                            i += 1
-                            if mtime <= mtimes[uri]:
-                                i += 1
-                                continue
-                            else:
-                                self.__del_from_db(uri)
-                        # On first scan, use modification time
-                        # Else, use current time
-                        if not was_empty:
-                            mtime = int(time())
-                        to_add.append((uri, mtime))
-                    except Exception as e:
-                        print("CollectionScanner::__scan(mtime):", e)
-                # Clean deleted files
-                # Now because we need to populate history
-                for uri in orig_tracks:
-                    i += 1
-                    GLib.idle_add(self.__update_progress, i, count)
-                    self.__del_from_db(uri)
-                # Add files to db
-                for (uri, mtime) in to_add:
-                    try:
-                        debug("Adding file: %s" % uri)
-                        i += 1
-                        GLib.idle_add(self.__update_progress, i, count)
-                        self.__add2db(uri, mtime)
-                    except Exception as e:
-                        print("CollectionScanner::__scan(add):", e, uri)
-                        if e.message != gst_message:
-                            gst_message = e.message
-                            if Lp().notify is not None:
-                                Lp().notify.send(gst_message, uri)
+                failed = self.__update_tracks(new_tracks, orig_tracks,
+                                              mtimes, was_empty)
+                if failed is None:
+                    return
+                self.__set_failed_dirs(dir_mtimes, failed)
+                Lp().db.set_dir_mtimes(dir_mtimes)
                 sql.commit()
             except Exception as e:
                 print("CollectionScanner::__scan():", e)
@@ -253,34 +298,346 @@ class CollectionScanner(GObject.GObject, TagReader):
         del self.__history
         self.__history = None
 
-    def __add2db(self, uri, mtime):
+    def __scan_uris(self, uris):
         """
-            Add new file to db with informations
-            @param uri as string
-            @param mtime as int
-            @return track id as int
+            Scan uris only, files or dirs, existing or deleted
+            @param uris as [str]
+            @thread safe
+        """
+        if self.__history is None:
+            self.__history = History()
+        mtimes = Lp().tracks.get_mtimes()
+        db_uris = set(Lp().tracks.get_uris())
+        new_tracks = []
+        orig_tracks = set()
+        # Dirs to update in db
+        dir_uris = []
+        dir_mtimes = {}
+        for uri in uris:
+            f = Lio.File.new_for_uri(uri)
+            # Deleted file or dir, remove tracks from db
+            if not f.query_exists():
+                orig_tracks |= set([db_uri for db_uri in db_uris
+                                    if db_uri == uri or
+                                    db_uri.startswith(uri + "/")])
+                dir_uris.append(uri)
+            # New, moved or polled dir, look at its changed content
+            elif f.query_file_type(Gio.FileQueryInfoFlags.NONE,
+                                   None) == Gio.FileType.DIRECTORY:
+                (tracks, dirs, ignore_dirs, unchanged_dirs,
+                 mtimes_for_uri) = self.__get_objects_for_uris([uri], False)
+                new_tracks += tracks
+                # Tracks in unchanged dirs are still there
+                orig_tracks |= set([db_uri for db_uri in db_uris
+                                    if db_uri.startswith(uri + "/") and
+                                    db_uri[:db_uri.rfind("/")] not in
+                                    unchanged_dirs])
+                dir_uris.append(uri)
+                dir_mtimes.update(mtimes_for_uri)
+                if self.__inotify is not None:
+                    for d in dirs:
+                        if d.startswith("file://"):
+                            self.__inotify.add_monitor(d)
+            elif is_audio(f):
+                mtime = self.__get_mtime(uri)
+                if mtime is not None:
+                    new_tracks.append((uri, mtime))
+                if uri in db_uris:
+                    orig_tracks.add(uri)
+        with SqlCursor(Lp().db) as sql:
+            try:
+                failed = self.__update_tracks(new_tracks, orig_tracks,
+                                              mtimes, False)
+                if failed is None:
+                    return
+                self.__set_failed_dirs(dir_mtimes, failed)
+                Lp().db.update_dir_mtimes(dir_mtimes, dir_uris)
+                sql.commit()
+            except Exception as e:
+                print("CollectionScanner::__scan_uris():", e)
+        GLib.idle_add(self.__finish)
+        del self.__history
+        self.__history = None
+
+    def __set_failed_dirs(self, dir_mtimes, failed):
+        """
+            Never see dirs with files not imported as unchanged,
+            so their files are listed again on next scan
+            @param dir_mtimes as {uri as str: mtime as int}
+            @param failed as set(str), files not imported
+        """
+        for uri in failed:
+            parent = uri[:uri.rfind("/")]
+            if parent in dir_mtimes:
+                dir_mtimes[parent] = 0
+
+    def __update_tracks(self, new_tracks, orig_tracks, mtimes, was_empty):
+        """
+            Add new/modified tracks to db, remove deleted tracks
+            @param new_tracks as [(uri as str, mtime as int)]
+            @param orig_tracks as set(str), tracks in db to check
+            @param mtimes as {str: int}, mtimes in db
+            @param was_empty as bool, True if db was empty
+            @return uris not imported as set(str), None if stopped
+            @thread safe
+        """
+        gst_message = None
+        failed = set()
+        count = len(new_tracks) + len(orig_tracks)
+        i = 0
+        # Look for new files/modified files
+        to_add = []
+        to_delete = []
+        for (uri, mtime) in new_tracks:
+            if self.__thread is None:
+                return None
+            try:
+                # Do not flood main loop with unchanged files
+                if i % 100 == 0:
+                    GLib.idle_add(self.__update_progress, i, count)
+                # If songs exists and mtime unchanged, continue,
+                # else rescan
+                if uri in orig_tracks:
+                    orig_tracks.remove(uri)
+                    i += 1
+                    if mtime <= mtimes.get(uri, 0):
+                        i += 1
+                        continue
+                    else:
+                        to_delete.append(uri)
+                # On first scan, use modification time
+                # Else, use current time
+                if not was_empty:
+                    mtime = int(time())
+                to_add.append((uri, mtime))
+            except Exception as e:
+                print("CollectionScanner::__update_tracks(mtime):", e)
+                failed.add(uri)
+        # Clean deleted/modified files
+        # Now because we need to populate history
+        i += len(orig_tracks)
+        GLib.idle_add(self.__update_progress, i, count)
+        self.__del_from_db(to_delete + list(orig_tracks))
+        # Read tags in a worker pool, add files to db from this thread
+        start = time()
+        uris_queue = Queue()
+        records = Queue()
+        for item in to_add:
+            uris_queue.put(item)
+        workers = []
+        for x in range(self.__get_workers_count(len(to_add))):
+            t = Thread(target=self.__read_tags,
+                       args=(uris_queue, records))
+            t.daemon = True
+            t.start()
+            workers.append(t)
+        added = 0
+        read = set()
+        batch = []
+        batch_size = max(1, Lp().settings.get_value(
+                                    "scan-batch-size").get_int32())
+        # Artists/genres/albums may have been removed above
+        self.reset_ids_cache()
+        while added < len(to_add):
+            if self.__thread is None:
+                return None
+            try:
+                (uri, mtime, record, error) = records.get(timeout=1)
+            except Empty:
+                # All workers died, remaining files will never be read
+                if not [t for t in workers if t.is_alive()] and\
+                        records.empty():
+                    print("CollectionScanner::__update_tracks():",
+                          "tag readers stopped,", len(to_add) - added,
+                          "files not read")
+                    failed |= set([uri for (uri, mtime) in to_add
+                                   if uri not in read])
+                    break
+                continue
+            read.add(uri)
+            added += 1
+            i += 1
+            GLib.idle_add(self.__update_progress, i, count)
+            if error is not None:
+                print("CollectionScanner::__update_tracks(add):", error, uri)
+                message = getattr(error, "message", str(error))
+                if message != gst_message:
+                    gst_message = message
+                    if Lp().notify is not None:
+                        Lp().notify.send(gst_message, uri)
+                failed.add(uri)
+                continue
+            batch.append((uri, mtime, record))
+            if len(batch) >= batch_size:
+                failed |= self.__add_batch(batch)
+                batch = []
+        if batch:
+            failed |= self.__add_batch(batch)
+        # Removed tracks and new artists
+        Lp().db.update_search()
+        if to_add:
+            debug("CollectionScanner::__update_tracks(): %.1f files/s" %
+                  (len(to_add) / max(time() - start, 0.001)))
+        return failed
+
+    def __get_workers_count(self, count):
+        """
+            Get tag reader workers count for count files
+            @param count as int
+            @return int
+        """
+        workers = Lp().settings.get_value("scan-workers").get_int32()
+        return max(1, min(workers, count))
+
+    def __read_tags(self, uris, records):
+        """
+            Read tags for uris, each worker has its own discoverer
+            @param uris as Queue of (str, int)
+            @param records as Queue of (str, int, tuple, Exception)
+            @thread safe
+        """
+        try:
+            tag_reader = TagReader()
+            while self.__thread is not None:
+                try:
+                    (uri, mtime) = uris.get_nowait()
+                except Empty:
+                    return
+                try:
+                    record = self.__get_record(tag_reader, uri)
+                    records.put((uri, mtime, record, None))
+                except Exception as e:
+                    records.put((uri, mtime, None, e))
+        except Exception as e:
+            # Caller stops waiting once all workers are gone
+            print("CollectionScanner::__read_tags():", e)
+
+    def __get_record(self, tag_reader, uri):
+        """
+            Read tags for uri
+            @param tag_reader as TagReader
+            @param uri as str
+            @return track record as tuple
+            @thread safe
         """
         f = Lio.File.new_for_uri(uri)
-        debug("CollectionScanner::add2db(): Read tags")
-        info = self.get_info(uri)
+        debug("CollectionScanner::__get_record(): Read tags")
+        info = tag_reader.get_info(uri)
         tags = info.get_tags()
         name = f.get_basename()
-        title = self.get_title(tags, name)
-        artists = self.get_artists(tags)
-        composers = self.get_composers(tags)
-        performers = self.get_performers(tags)
-        a_sortnames = self.get_artist_sortnames(tags)
-        aa_sortnames = self.get_album_artist_sortnames(tags)
-        album_artists = self.get_album_artist(tags)
-        album_name = self.get_album_name(tags)
-        genres = self.get_genres(tags)
-        discnumber = self.get_discnumber(tags)
-        discname = self.get_discname(tags)
-        tracknumber = self.get_tracknumber(tags, name)
-        year = self.get_original_year(tags)
+        title = tag_reader.get_title(tags, name)
+        artists = tag_reader.get_artists(tags)
+        composers = tag_reader.get_composers(tags)
+        performers = tag_reader.get_performers(tags)
+        a_sortnames = tag_reader.get_artist_sortnames(tags)
+        aa_sortnames = tag_reader.get_album_artist_sortnames(tags)
+        album_artists = tag_reader.get_album_artist(tags)
+        album_name = tag_reader.get_album_name(tags)
+        genres = tag_reader.get_genres(tags)
+        discnumber = tag_reader.get_discnumber(tags)
+        discname = tag_reader.get_discname(tags)
+        tracknumber = tag_reader.get_tracknumber(tags, name)
+        year = tag_reader.get_original_year(tags)
         if year is None:
-            year = self.get_year(tags)
+            year = tag_reader.get_year(tags)
         duration = int(info.get_duration()/1000000000)
+        # Extract artwork while tags are loaded, track mtime change
+        # will extract it again
+        artwork = ""
+        data = tag_reader.get_artwork_data(tags)
+        if data is not None:
+            artwork = Lp().art.add_embedded_artwork(data)
+        return (name, title, artists, composers, performers, a_sortnames,
+                aa_sortnames, album_artists, album_name, genres,
+                discnumber, discname, tracknumber, year, duration, artwork)
+
+    def __add_batch(self, batch):
+        """
+            Add a batch of files to db in a single transaction
+            Artists, genres, albums and tracks are inserted per batch
+            @param batch as [(uri as str, mtime as int, record as tuple)]
+            @return uris not added as set(str)
+        """
+        failed = set()
+        items = []
+        for (uri, mtime, record) in batch:
+            try:
+                debug("Adding file: %s" % uri)
+                items.append(self.__get_item(uri, mtime, record))
+            except Exception as e:
+                print("CollectionScanner::__add_batch():", e, uri)
+                failed.add(uri)
+        if not items:
+            return failed
+        debug("CollectionScanner::__add_batch(): Add artists and genres")
+        artist_ids = self.add_artists_many(
+            [artist for item in items
+             for artist in item["artists"] + item["album_artists"]])
+        genre_ids = self.add_genres_many(
+            [genre for item in items for genre in item["genres"]])
+        debug("CollectionScanner::__add_batch(): Add albums")
+        album_ids = self.add_albums_many(
+            [(item["album_name"],
+              [artist_ids[artist] for (artist, s) in item["album_artists"]],
+              item["uri"], item["loved"], item["album_pop"],
+              item["album_rate"]) for item in items])
+        debug("CollectionScanner::__add_batch(): Add tracks")
+        track_ids = Lp().tracks.add_many(
+            [item["track"][:6] + (album_id,) + item["track"][6:]
+             for (item, album_id) in zip(items, album_ids)])
+        track_artists = []
+        track_genres = []
+        albums = {}
+        new_artist_ids = set()
+        new_genre_ids = set()
+        for (item, track_id, album_id) in zip(items, track_ids, album_ids):
+            item_artist_ids = [artist_ids[artist]
+                               for (artist, s) in item["artists"]]
+            item_album_artist_ids = [artist_ids[artist]
+                                     for (artist, s) in item["album_artists"]]
+            item_genre_ids = [genre_ids[genre] for genre in item["genres"]]
+            track_artists += [(track_id, artist_id)
+                              for artist_id in set(item_artist_ids)]
+            track_genres += [(track_id, genre_id, item["mtime"])
+                             for genre_id in set(item_genre_ids)]
+            if album_id in albums:
+                albums[album_id][1].update(item_genre_ids)
+                albums[album_id][2] = item["album_mtime"]
+            else:
+                albums[album_id] = [item_album_artist_ids,
+                                    set(item_genre_ids),
+                                    item["album_mtime"]]
+            new_artist_ids |= set(item_album_artist_ids) |\
+                set(item_artist_ids)
+            new_genre_ids |= set(item_genre_ids)
+        debug("CollectionScanner::__add_batch(): Update tracks")
+        Lp().tracks.add_artists_genres(track_artists, track_genres)
+        for album_id, (album_artist_ids, album_genre_ids, mtime) in\
+                albums.items():
+            self.update_album(album_id, album_artist_ids,
+                              list(album_genre_ids), mtime, None)
+        Lp().db.update_search(track_ids, list(albums.keys()))
+        self.__album_ids |= set(albums.keys())
+        with SqlCursor(Lp().db) as sql:
+            sql.commit()
+        for genre_id in new_genre_ids:
+            GLib.idle_add(self.emit, "genre-updated", genre_id, True)
+        for artist_id in new_artist_ids:
+            GLib.idle_add(self.emit, "artist-updated", artist_id, True)
+        return failed
+
+    def __get_item(self, uri, mtime, record):
+        """
+            Get values to add file to db
+            @param uri as string
+            @param mtime as int
+            @param record as tuple (see __get_record())
+            @return {key as str: value}, track is TracksDatabase.add_many()
+                    item without album id
+        """
+        (name, title, artists, composers, performers, a_sortnames,
+         aa_sortnames, album_artists, album_name, genres,
+         discnumber, discname, tracknumber, year, duration, artwork) = record
 
         # If no artists tag, use album artist
         if artists == "":
@@ -295,88 +652,45 @@ class CollectionScanner(GObject.GObject, TagReader):
             if artists == "":
                 artists = _("Unknown")
 
-        debug("CollectionScanner::add2db(): Restore stats")
+        debug("CollectionScanner::__get_item(): Restore stats")
         # Restore stats
         (track_pop, track_rate, track_ltime, album_mtime,
          loved, album_pop, album_rate) = self.__history.get(name, duration)
         # If nothing in stats, use track mtime
         if album_mtime == 0:
             album_mtime = mtime
+        return {"uri": uri,
+                "mtime": mtime,
+                "album_mtime": album_mtime,
+                "artists": self.get_artists_sortnames(artists, a_sortnames),
+                "album_artists": self.get_artists_sortnames(album_artists,
+                                                            aa_sortnames),
+                "genres": [genre.strip() for genre in genres.split(";")
+                           if genre.strip() != ""],
+                "album_name": album_name,
+                "loved": loved,
+                "album_pop": album_pop,
+                "album_rate": album_rate,
+                "track": (title, uri, duration, tracknumber, discnumber,
+                          discname, year, track_pop, track_rate,
+                          track_ltime, artwork)}
 
-        debug("CollectionScanner::add2db(): Add artists %s" % artists)
-        artist_ids = self.add_artists(artists, album_artists, a_sortnames)
-
-        debug("CollectionScanner::add2db(): "
-              "Add album artists %s" % album_artists)
-        album_artist_ids = self.add_album_artists(album_artists, aa_sortnames)
-
-        new_artist_ids = list(set(album_artist_ids) | set(artist_ids))
-
-        debug("CollectionScanner::add2db(): Add album: "
-              "%s, %s" % (album_name, album_artist_ids))
-        (album_id, new_album) = self.add_album(album_name, album_artist_ids,
-                                               uri, loved, album_pop,
-                                               album_rate, False)
-
-        genre_ids = self.add_genres(genres)
-
-        # Add track to db
-        debug("CollectionScanner::add2db(): Add track")
-        track_id = Lp().tracks.add(title, uri, duration,
-                                   tracknumber, discnumber, discname,
-                                   album_id, year, track_pop, track_rate,
-                                   track_ltime)
-
-        debug("CollectionScanner::add2db(): Update tracks")
-        self.update_track(track_id, artist_ids, genre_ids, mtime)
-        self.update_album(album_id, album_artist_ids,
-                          genre_ids, album_mtime, year)
-        if new_album:
-            with SqlCursor(Lp().db) as sql:
-                sql.commit()
-        for genre_id in genre_ids:
-            GLib.idle_add(self.emit, "genre-updated", genre_id, True)
-        for artist_id in new_artist_ids:
-            GLib.idle_add(self.emit, "artist-updated", artist_id, True)
-        return track_id
-
-    def __del_from_db(self, uri):
+    def __del_from_db(self, uris):
         """
-            Delete track from db
-            @param uri as str
+            Delete tracks from db
+            @param uris as [str]
         """
         try:
-            f = Lio.File.new_for_uri(uri)
-            name = f.get_basename()
-            track_id = Lp().tracks.get_id_by_uri(uri)
-            album_id = Lp().tracks.get_album_id(track_id)
-            genre_ids = Lp().tracks.get_genre_ids(track_id)
-            album_artist_ids = Lp().albums.get_artist_ids(album_id)
-            artist_ids = Lp().tracks.get_artist_ids(track_id)
-            popularity = Lp().tracks.get_popularity(track_id)
-            rate = Lp().tracks.get_rate(track_id)
-            ltime = Lp().tracks.get_ltime(track_id)
-            mtime = Lp().albums.get_mtime(album_id)
-            duration = Lp().tracks.get_duration(track_id)
-            album_popularity = Lp().albums.get_popularity(album_id)
-            album_rate = Lp().albums.get_rate(album_id)
-            loved = Lp().albums.get_loved(album_id)
-            uri = Lp().tracks.get_uri(track_id)
-            self.__history.add(name, duration, popularity, rate,
-                               ltime, mtime, loved, album_popularity,
-                               album_rate)
-            Lp().tracks.remove(track_id)
-            Lp().tracks.clean(track_id)
-            deleted = Lp().albums.clean(album_id)
-            if deleted:
-                with SqlCursor(Lp().db) as sql:
-                    sql.commit()
+            if not uris:
+                return
+            track_ids = Lp().tracks.get_ids_by_uris(uris)
+            (album_ids, artist_ids, genre_ids) = Lp().db.del_tracks(
+                                                    track_ids, self.__history)
+            for album_id in album_ids:
                 GLib.idle_add(self.emit, "album-updated", album_id, True)
-            for artist_id in album_artist_ids + artist_ids:
-                Lp().artists.clean(artist_id)
+            for artist_id in artist_ids:
                 GLib.idle_add(self.emit, "artist-updated", artist_id, False)
             for genre_id in genre_ids:
-                Lp().genres.clean(genre_id)
                 GLib.idle_add(self.emit, "genre-updated", genre_id, False)
         except Exception as e:
             print("CollectionScanner::__del_from_db:", e)
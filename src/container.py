@@ -65,16 +65,17 @@ class Container:
         Lp().playlists.connect("playlists-changed",
                                self.__update_playlists)
 
-    def update_db(self):
+    def update_db(self, full=False):
         """
             Update db at startup only if needed
+            @param full as bool, rescan unchanged dirs
         """
         # Stop previous scan
         if Lp().scanner.is_locked():
             Lp().scanner.stop()
-            GLib.timeout_add(250, self.update_db)
+            GLib.timeout_add(250, self.update_db, full)
         else:
-            Lp().scanner.update()
+            Lp().scanner.update(full)
 
     def get_genre_id(self):
         """
@@ -459,8 +460,7 @@ class Container:
             else:
                 selection_list.populate(items)
 
-        loader = Loader(target=load, view=selection_list, on_finished=setup)
-        loader.start()
+        self.__load(("genres",), load, selection_list, setup)
 
     def __update_list_artists(self, selection_list, genre_ids, update):
         """
@@ -496,9 +496,8 @@ class Container:
             if self.__list_two.is_visible():
                 self.__list_two.hide()
             self.__list_two_restore = Type.NONE
-        loader = Loader(target=load, view=selection_list,
-                        on_finished=lambda r: setup(*r))
-        loader.start()
+        self.__load(("artists", tuple(genre_ids)), load,
+                    selection_list, lambda r: setup(*r))
 
     def __update_list_charts(self):
         """
@@ -533,6 +532,23 @@ class Container:
             self.__list_two.mark_as_artists(False)
             self.__list_two.populate(items)
 
+    def __load(self, key, load, view, on_finished):
+        """
+            Call on_finished with library snapshot value for key,
+            load value in a thread if missing
+            @param key as tuple
+            @param load as function
+            @param view as Gtk.Widget
+            @param on_finished as function
+        """
+        value = Lp().snapshot.get(key)
+        if value is Lp().snapshot.MISSING:
+            loader = Loader(target=lambda: Lp().snapshot.get(key, load),
+                            view=view, on_finished=on_finished)
+            loader.start()
+        else:
+            on_finished(value)
+
     def __stop_current_view(self):
         """
             Stop current view
@@ -633,6 +649,10 @@ class Container:
                     items += Lp().albums.get_ids([], genre_ids)
             return items
 
+        def load_with_rows():
+            items = load()
+            return (items, Lp().snapshot.get_album_rows(items))
+
         # Spotify albums contains only one tracks, show playlist view
         if genre_ids and genre_ids[0] in [Type.SPOTIFY,
                                           Type.LASTFM]:
@@ -644,8 +664,18 @@ class Container:
             from lollypop.view_albums import AlbumsView
             self.__stop_current_view()
             view = AlbumsView(genre_ids, artist_ids)
-            loader = Loader(target=load, view=view)
-            loader.start()
+            # Popular, random, charts, ... are not only changed by a scan
+            if genre_ids and (genre_ids[0] == Type.ALL or
+                              genre_ids[0] >= 0) and\
+                    not (artist_ids and artist_ids[0] == Type.CHARTS):
+                key = ("albums", tuple(genre_ids), tuple(artist_ids),
+                       Lp().settings.get_value(
+                                        "show-compilations").get_boolean())
+                self.__load(key, load_with_rows, view,
+                            lambda r: view.populate(list(r[0]), r[1]))
+            else:
+                loader = Loader(target=load, view=view)
+                loader.start()
         view.show()
         self.__stack.add(view)
         self.__stack.set_visible_child(view)
@@ -13,13 +13,15 @@
 from gi.repository import GLib, Gio
 
 import sqlite3
+import itertools
+from locale import setlocale, LC_COLLATE
 
-from lollypop.define import Lp
+from lollypop.define import Lp, Type
 from lollypop.objects import Album
 from lollypop.database_upgrade import DatabaseUpgrade
 from lollypop.sqlcursor import SqlCursor
 from lollypop.localized import LocalizedCollation
-from lollypop.utils import noaccents
+from lollypop.utils import noaccents, get_sort_key
 from lollypop.lio import Lio
 
 
@@ -46,10 +48,20 @@ class Database:
                                               popularity INT NOT NULL,
                                               rate INT NOT NULL,
                                               loved INT NOT NULL,
-                                              synced INT NOT NULL)"""
+                                              synced INT NOT NULL,
+                                              is_chart INT NOT NULL DEFAULT 0,
+                                              name_folded TEXT NOT NULL
+                                                          DEFAULT '',
+                                              sort_key BLOB NOT NULL
+                                                       DEFAULT ''
+                                              )"""
     __create_artists = """CREATE TABLE artists (id INTEGER PRIMARY KEY,
                                                name TEXT NOT NULL,
-                                               sortname TEXT NOT NULL)"""
+                                               sortname TEXT NOT NULL,
+                                               name_folded TEXT NOT NULL
+                                                           DEFAULT '',
+                                               sort_key BLOB NOT NULL
+                                                        DEFAULT '')"""
     __create_genres = """CREATE TABLE genres (id INTEGER PRIMARY KEY,
                                             name TEXT NOT NULL)"""
     __create_album_artists = """CREATE TABLE album_artists (
@@ -71,7 +83,15 @@ class Database:
                                               popularity INT NOT NULL,
                                               rate INT NOT NULL,
                                               ltime INT NOT NULL,
-                                              persistent INT NOT NULL DEFAULT 1
+                                              persistent INT NOT NULL
+                                                         DEFAULT 1,
+                                              is_chart INT NOT NULL DEFAULT 0,
+                                              name_folded TEXT NOT NULL
+                                                          DEFAULT '',
+                                              sort_key BLOB NOT NULL
+                                                       DEFAULT '',
+                                              artwork TEXT NOT NULL
+                                                      DEFAULT ''
                                               )"""
     __create_track_artists = """CREATE TABLE track_artists (
                                                 track_id INT NOT NULL,
@@ -80,6 +100,8 @@ class Database:
                                                 track_id INT NOT NULL,
                                                 mtime INT NOT NULL,
                                                 genre_id INT NOT NULL)"""
+    __create_dirs = """CREATE TABLE dirs (uri TEXT NOT NULL,
+                                          mtime INT NOT NULL)"""
     __create_album_artists_idx = """CREATE index idx_aa ON album_artists(
                                                 album_id)"""
     __create_track_artists_idx = """CREATE index idx_ta ON track_artists(
@@ -88,11 +110,66 @@ class Database:
                                                 album_id)"""
     __create_track_genres_idx = """CREATE index idx_tg ON track_genres(
                                                 track_id)"""
+    __create_tracks_uri_idx = """CREATE index idx_tu ON tracks(uri)"""
+    __create_tracks_album_idx = """CREATE index idx_tal ON tracks(album_id)"""
+    __create_artists_name_idx = """CREATE index idx_an ON artists(
+                                                name COLLATE NOCASE)"""
+    __create_album_artists_artist_idx = """CREATE index idx_aaa ON
+                                    album_artists(artist_id, album_id)"""
+    __create_track_artists_artist_idx = """CREATE index idx_taa ON
+                                    track_artists(artist_id, track_id)"""
+    __create_album_genres_genre_idx = """CREATE index idx_agg ON
+                                         album_genres(genre_id, album_id)"""
+    __create_track_genres_genre_idx = """CREATE index idx_tgg ON
+                                         track_genres(genre_id, track_id)"""
+    __create_albums_uri_idx = """CREATE index idx_au ON albums(uri)"""
+    __create_albums_name_idx = """CREATE index idx_aln ON albums(
+                                                name COLLATE NOCASE)"""
+    # Compilations are looked up by exact name
+    __create_compilations_name_idx = """CREATE index idx_alc ON albums(name)
+                                          WHERE no_album_artist=1"""
+    __create_genres_name_idx = """CREATE index idx_gn ON genres(name)"""
+    # Keep is_chart in sync with charts genre
+    __create_album_charts_insert = """CREATE TRIGGER album_charts_insert
+                                      AFTER INSERT ON album_genres
+                                      WHEN NEW.genre_id=%s
+                                      BEGIN
+                                        UPDATE albums SET is_chart=1
+                                        WHERE rowid=NEW.album_id;
+                                      END""" % Type.CHARTS
+    __create_album_charts_delete = """CREATE TRIGGER album_charts_delete
+                                      AFTER DELETE ON album_genres
+                                      WHEN OLD.genre_id=%s
+                                      BEGIN
+                                        UPDATE albums SET is_chart=EXISTS(
+                                            SELECT 1 FROM album_genres
+                                            WHERE album_id=OLD.album_id
+                                            AND genre_id=%s)
+                                        WHERE rowid=OLD.album_id;
+                                      END""" % (Type.CHARTS, Type.CHARTS)
+    __create_track_charts_insert = """CREATE TRIGGER track_charts_insert
+                                      AFTER INSERT ON track_genres
+                                      WHEN NEW.genre_id=%s
+                                      BEGIN
+                                        UPDATE tracks SET is_chart=1
+                                        WHERE rowid=NEW.track_id;
+                                      END""" % Type.CHARTS
+    __create_track_charts_delete = """CREATE TRIGGER track_charts_delete
+                                      AFTER DELETE ON track_genres
+                                      WHEN OLD.genre_id=%s
+                                      BEGIN
+                                        UPDATE tracks SET is_chart=EXISTS(
+                                            SELECT 1 FROM track_genres
+                                            WHERE track_id=OLD.track_id
+                                            AND genre_id=%s)
+                                        WHERE rowid=OLD.track_id;
+                                      END""" % (Type.CHARTS, Type.CHARTS)
 
     def __init__(self):
         """
             Create database tables or manage update if needed
         """
+        self.__has_search = False
         f = Lio.File.new_for_path(self.DB_PATH)
         if not f.query_exists():
             db_version = Lp().settings.get_value("db-version").get_int32()
@@ -111,16 +188,153 @@ class Database:
                     sql.execute(self.__create_tracks)
                     sql.execute(self.__create_track_artists)
                     sql.execute(self.__create_track_genres)
+                    sql.execute(self.__create_dirs)
                     sql.execute(self.__create_album_artists_idx)
                     sql.execute(self.__create_track_artists_idx)
                     sql.execute(self.__create_album_genres_idx)
                     sql.execute(self.__create_track_genres_idx)
+                    sql.execute(self.__create_tracks_uri_idx)
+                    sql.execute(self.__create_tracks_album_idx)
+                    sql.execute(self.__create_artists_name_idx)
+                    sql.execute(self.__create_album_artists_artist_idx)
+                    sql.execute(self.__create_track_artists_artist_idx)
+                    sql.execute(self.__create_album_genres_genre_idx)
+                    sql.execute(self.__create_track_genres_genre_idx)
+                    sql.execute(self.__create_albums_uri_idx)
+                    sql.execute(self.__create_albums_name_idx)
+                    sql.execute(self.__create_compilations_name_idx)
+                    sql.execute(self.__create_genres_name_idx)
+                    sql.execute(self.__create_album_charts_insert)
+                    sql.execute(self.__create_album_charts_delete)
+                    sql.execute(self.__create_track_charts_insert)
+                    sql.execute(self.__create_track_charts_delete)
                     sql.commit()
                     Lp().settings.set_value("db-version",
                                             GLib.Variant("i", upgrade.count()))
+                self.create_search()
             except Exception as e:
                 print("Database::__init__(): %s" % e)
 
+    @property
+    def has_search(self):
+        """
+            True if full text search index is available
+            @return bool
+        """
+        if not self.__has_search:
+            with SqlCursor(self) as sql:
+                result = sql.execute("SELECT COUNT(1) FROM sqlite_master\
+                                      WHERE type='table'\
+                                      AND name='tracks_search'")
+                v = result.fetchone()
+                self.__has_search = v is not None and v[0] == 1
+        return self.__has_search
+
+    def create_search(self):
+        """
+            Create full text search index, needs SQLite FTS5
+        """
+        try:
+            with SqlCursor(self) as sql:
+                for table in ["albums_search", "tracks_search"]:
+                    sql.execute("CREATE VIRTUAL TABLE %s\
+                                 USING fts5(name, artists)" % table)
+                sql.execute("CREATE VIRTUAL TABLE artists_search\
+                             USING fts5(name)")
+                sql.commit()
+        except Exception as e:
+            print("Database::create_search():", e)
+
+    def update_sort_keys(self):
+        """
+            Compute folded names and sort keys for current collation locale
+        """
+        with SqlCursor(self) as sql:
+            for table in ["albums", "tracks"]:
+                result = sql.execute("SELECT rowid, name FROM %s" % table)
+                sql.executemany("UPDATE %s SET name_folded=?, sort_key=?\
+                                 WHERE rowid=?" % table,
+                                [(noaccents(name), get_sort_key(name), rowid)
+                                 for (rowid, name) in list(result)])
+            result = sql.execute("SELECT rowid, name, sortname FROM artists")
+            sql.executemany("UPDATE artists SET name_folded=?, sort_key=?\
+                             WHERE rowid=?",
+                            [(noaccents(name), get_sort_key(sortname), rowid)
+                             for (rowid, name, sortname) in list(result)])
+            sql.commit()
+        Lp().settings.set_value("sort-keys-locale",
+                                GLib.Variant("s", setlocale(LC_COLLATE)))
+
+    def update_search(self, track_ids=None, album_ids=None):
+        """
+            Update full text search index
+            @param track_ids as [int], tracks to reindex
+            @param album_ids as [int], albums to reindex
+            If both None, sync whole index with collection
+            @warning commit needed
+        """
+        if not self.has_search:
+            return
+        albums = "SELECT albums.rowid, albums.name_folded,\
+                  IFNULL((SELECT group_concat(artists.name_folded, ' ')\
+                          FROM artists, album_artists\
+                          WHERE album_artists.album_id=albums.rowid\
+                          AND artists.rowid=album_artists.artist_id), '')\
+                  FROM albums"
+        tracks = "SELECT tracks.rowid, tracks.name_folded,\
+                  IFNULL((SELECT group_concat(artists.name_folded, ' ')\
+                          FROM artists, track_artists\
+                          WHERE track_artists.track_id=tracks.rowid\
+                          AND artists.rowid=track_artists.artist_id), '')\
+                  FROM tracks"
+        with SqlCursor(self) as sql:
+            if track_ids is None and album_ids is None:
+                for (table, select) in [("albums", albums),
+                                        ("tracks", tracks)]:
+                    sql.execute("DELETE FROM %s_search\
+                                 WHERE rowid NOT IN (\
+                                    SELECT rowid FROM %s)" % (table, table))
+                    sql.execute("INSERT INTO %s_search (rowid, name, artists)\
+                                 %s WHERE %s.rowid NOT IN (\
+                                    SELECT rowid FROM %s_search)" %
+                                (table, select, table, table))
+                sql.execute("DELETE FROM artists_search\
+                             WHERE rowid NOT IN (SELECT rowid FROM artists)")
+            else:
+                for (table, select, ids) in [("albums", albums, album_ids),
+                                             ("tracks", tracks, track_ids)]:
+                    # Chunk to stay under SQLite variables limit
+                    ids = list(ids or [])
+                    for i in range(0, len(ids), 500):
+                        chunk = ids[i:i + 500]
+                        marks = ",".join(["?"] * len(chunk))
+                        sql.execute("DELETE FROM %s_search\
+                                     WHERE rowid IN (%s)" % (table, marks),
+                                    chunk)
+                        sql.execute("INSERT INTO %s_search\
+                                     (rowid, name, artists)\
+                                     %s WHERE %s.rowid IN (%s)" %
+                                    (table, select, table, marks), chunk)
+            # Artists table is small, always look for new ones
+            sql.execute("INSERT INTO artists_search (rowid, name)\
+                         SELECT rowid, name_folded FROM artists\
+                         WHERE rowid NOT IN (\
+                            SELECT rowid FROM artists_search)")
+
+    def get_search_query(self, string, any_word=False):
+        """
+            Get full text search query matching words as prefixes
+            @param string as str
+            @param any_word as bool, match any word instead of all words
+            @return str/None
+        """
+        words = []
+        for word in noaccents(string).split():
+            words.append('"%s"*' % word.replace('"', '""'))
+        if words:
+            return (" OR " if any_word else " ").join(words)
+        return None
+
     def upgrade(self):
         """
             Upgrade database
@@ -132,62 +346,263 @@ class Database:
             upgrade.do_db_upgrade()
             Lp().settings.set_value("db-version",
                                     GLib.Variant("i", upgrade.count()))
+        # Sort keys depend on collation locale
+        if Lp().settings.get_value("sort-keys-locale").get_string() !=\
+                setlocale(LC_COLLATE):
+            self.update_sort_keys()
 
     def get_cursor(self):
         """
             Return a new sqlite cursor
         """
         try:
-            c = sqlite3.connect(self.DB_PATH, 600.0)
+            c = sqlite3.connect(
+                self.DB_PATH, 600.0,
+                cached_statements=SqlCursor.get_statements_cache())
+            SqlCursor.set_pragmas(c)
             c.create_collation("LOCALIZED", LocalizedCollation())
             c.create_function("noaccents", 1, noaccents)
             return c
         except:
             exit(-1)
 
+    def get_dir_mtimes(self):
+        """
+            Get mtimes for collection dirs
+            @return {uri as str: mtime as int}
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT uri, mtime FROM dirs")
+            return dict(result)
+
+    def set_dir_mtimes(self, mtimes):
+        """
+            Set mtimes for collection dirs
+            @param mtimes as {uri as str: mtime as int}
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("DELETE FROM dirs")
+            sql.executemany("INSERT INTO dirs (uri, mtime) VALUES (?, ?)",
+                            mtimes.items())
+            sql.commit()
+
+    def update_dir_mtimes(self, mtimes, uris):
+        """
+            Replace mtimes for dirs under uris
+            @param mtimes as {uri as str: mtime as int}
+            @param uris as [str], scanned or deleted dirs
+        """
+        with SqlCursor(self) as sql:
+            for uri in uris:
+                sql.execute("DELETE FROM dirs WHERE uri=?\
+                             OR substr(uri, 1, ?)=?",
+                            (uri, len(uri) + 1, uri + "/"))
+            sql.executemany("INSERT INTO dirs (uri, mtime) VALUES (?, ?)",
+                            mtimes.items())
+            sql.commit()
+
     def drop_db(self):
         """
             Drop database
         """
         try:
+            # Do not let a stale WAL be replayed in new database
+            with SqlCursor(self) as sql:
+                sql.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            SqlCursor.close_pool()
             f = Gio.File.new_for_path(self.DB_PATH)
             f.trash()
+            for suffix in ["-wal", "-shm"]:
+                f = Gio.File.new_for_path(self.DB_PATH + suffix)
+                if f.query_exists():
+                    f.delete(None)
         except Exception as e:
             print("Database::drop_db():", e)
 
-    def del_tracks(self, track_ids):
+    def del_tracks(self, track_ids, history=None):
         """
             Delete tracks from db
             @param track_ids as [int]
+            @param history as History, if not None, save tracks stats to
+                   history and keep playlists/artwork (collection scan)
+            @return (modified album ids as [int], artist ids as [int],
+                     genre ids as [int])
         """
         SqlCursor.add(Lp().playlists)
         with SqlCursor(self) as sql:
-            all_album_ids = []
-            all_artist_ids = []
-            all_genre_ids = []
-            for track_id in track_ids:
-                album_id = Lp().tracks.get_album_id(track_id)
-                art_file = Lp().art.get_album_cache_name(Album(album_id))
-                genre_ids = Lp().tracks.get_genre_ids(track_id)
-                album_artist_ids = Lp().albums.get_artist_ids(album_id)
-                artist_ids = Lp().tracks.get_artist_ids(track_id)
-                uri = Lp().tracks.get_uri(track_id)
-                Lp().playlists.remove(uri)
-                Lp().tracks.remove(track_id)
-                Lp().tracks.clean(track_id)
-                all_album_ids.append(album_id)
-                all_artist_ids += album_artist_ids + artist_ids
-                all_genre_ids += genre_ids
-            for album_id in list(set(all_album_ids)):
-                if Lp().albums.clean(album_id):
-                    Lp().art.clean_store(art_file)
-            for artist_id in list(set(all_artist_ids)):
-                Lp().artists.clean(artist_id)
-            for genre_id in list(set(all_genre_ids)):
-                Lp().genres.clean(genre_id)
+            sql.execute("CREATE TEMP TABLE IF NOT EXISTS del_tracks (\
+                                                track_id INTEGER PRIMARY KEY)")
+            sql.execute("DELETE FROM del_tracks")
+            sql.executemany("INSERT OR IGNORE INTO del_tracks VALUES (?)",
+                            [(track_id,) for track_id in track_ids])
+            result = sql.execute("SELECT DISTINCT album_id FROM tracks\
+                                  WHERE rowid IN (\
+                                    SELECT track_id FROM del_tracks)")
+            album_ids = list(itertools.chain(*result))
+            result = sql.execute("SELECT DISTINCT artist_id\
+                                  FROM track_artists\
+                                  WHERE track_id IN (\
+                                    SELECT track_id FROM del_tracks)\
+                                  UNION SELECT DISTINCT artist_id\
+                                  FROM album_artists, tracks\
+                                  WHERE album_artists.album_id=tracks.album_id\
+                                  AND tracks.rowid IN (\
+                                    SELECT track_id FROM del_tracks)")
+            artist_ids = list(itertools.chain(*result))
+            result = sql.execute("SELECT DISTINCT genre_id FROM track_genres\
+                                  WHERE track_id IN (\
+                                    SELECT track_id FROM del_tracks)")
+            genre_ids = list(itertools.chain(*result))
+            if history is None:
+                art_files = {}
+                for album_id in album_ids:
+                    art_files[album_id] = Lp().art.get_album_cache_name(
+                                                               Album(album_id))
+                result = sql.execute("SELECT uri FROM tracks\
+                                      WHERE rowid IN (\
+                                        SELECT track_id FROM del_tracks)")
+                Lp().playlists.remove_uris(list(itertools.chain(*result)))
+            else:
+                self.__save_history(sql, history)
+            for table in ["track_genres", "track_artists"]:
+                sql.execute("DELETE FROM %s WHERE track_id IN (\
+                                SELECT track_id FROM del_tracks)" % table)
+            sql.execute("DELETE FROM tracks WHERE rowid IN (\
+                            SELECT track_id FROM del_tracks)")
+            modified_ids = self.__clean_albums(sql, album_ids)
+            if history is None:
+                for album_id in modified_ids:
+                    Lp().art.clean_store(art_files[album_id])
+            self.__clean_artists(sql, artist_ids)
+            self.__clean_genres(sql, genre_ids)
+            if self.has_search:
+                self.__clean_search(sql, album_ids, artist_ids)
+            sql.execute("DELETE FROM del_tracks")
             sql.commit()
         SqlCursor.remove(Lp().playlists)
+        return (modified_ids, artist_ids, genre_ids)
 
 #######################
 # PRIVATE             #
 #######################
+    def __save_history(self, sql, history):
+        """
+            Save stats for tracks in del_tracks table to history
+            @param sql as sqlite cursor
+            @param history as History
+        """
+        result = sql.execute("SELECT tracks.uri, tracks.duration,\
+                              tracks.popularity, tracks.rate, tracks.ltime,\
+                              (SELECT mtime FROM album_genres AS AG\
+                               WHERE AG.album_id=albums.rowid\
+                               AND NOT EXISTS (\
+                                    SELECT mtime FROM album_genres\
+                                    WHERE album_id=AG.album_id\
+                                    AND genre_id < 0)),\
+                              albums.loved, albums.popularity, albums.rate\
+                              FROM tracks, albums\
+                              WHERE albums.rowid=tracks.album_id\
+                              AND tracks.rowid IN (\
+                                SELECT track_id FROM del_tracks)")
+        items = []
+        for (uri, duration, popularity, rate, ltime, mtime,
+             loved, album_popularity, album_rate) in result:
+            name = Lio.File.new_for_uri(uri).get_basename()
+            items.append((name, duration, popularity, rate, ltime,
+                          mtime or 0, loved, album_popularity, album_rate))
+        history.add_many(items)
+
+    def __clean_albums(self, sql, album_ids):
+        """
+            Remove orphaned albums/album genres
+            @param sql as sqlite cursor
+            @param album_ids as [int]
+            @return modified album ids as [int]
+            @warning commit needed
+        """
+        sql.execute("CREATE TEMP TABLE IF NOT EXISTS del_albums (\
+                                                album_id INTEGER PRIMARY KEY)")
+        sql.execute("DELETE FROM del_albums")
+        sql.executemany("INSERT INTO del_albums VALUES (?)",
+                        [(album_id,) for album_id in album_ids])
+        # Albums losing a genre or all their tracks
+        result = sql.execute("SELECT DISTINCT album_id FROM album_genres AS AG\
+                              WHERE album_id IN (\
+                                SELECT album_id FROM del_albums)\
+                              AND NOT EXISTS (\
+                                SELECT track_genres.track_id\
+                                FROM tracks, track_genres\
+                                WHERE tracks.album_id=AG.album_id\
+                                AND track_genres.track_id=tracks.rowid\
+                                AND track_genres.genre_id=AG.genre_id)\
+                              UNION SELECT album_id FROM del_albums\
+                              WHERE NOT EXISTS (\
+                                SELECT rowid FROM tracks\
+                                WHERE tracks.album_id=del_albums.album_id)")
+        modified_ids = list(itertools.chain(*result))
+        sql.execute("DELETE FROM album_genres\
+                     WHERE album_id IN (SELECT album_id FROM del_albums)\
+                     AND NOT EXISTS (\
+                        SELECT track_genres.track_id\
+                        FROM tracks, track_genres\
+                        WHERE tracks.album_id=album_genres.album_id\
+                        AND track_genres.track_id=tracks.rowid\
+                        AND track_genres.genre_id=album_genres.genre_id)")
+        sql.execute("DELETE FROM del_albums\
+                     WHERE EXISTS (\
+                        SELECT rowid FROM tracks\
+                        WHERE tracks.album_id=del_albums.album_id)")
+        sql.execute("DELETE FROM album_artists\
+                     WHERE album_id IN (SELECT album_id FROM del_albums)")
+        sql.execute("DELETE FROM albums\
+                     WHERE rowid IN (SELECT album_id FROM del_albums)")
+        sql.execute("DELETE FROM del_albums")
+        return modified_ids
+
+    def __clean_artists(self, sql, artist_ids):
+        """
+            Remove artists without albums/tracks
+            @param sql as sqlite cursor
+            @param artist_ids as [int]
+            @warning commit needed
+        """
+        sql.executemany("DELETE FROM artists WHERE rowid=?\
+                         AND NOT EXISTS (\
+                            SELECT album_id FROM album_artists\
+                            WHERE artist_id=artists.rowid)\
+                         AND NOT EXISTS (\
+                            SELECT track_id FROM track_artists\
+                            WHERE artist_id=artists.rowid)",
+                        [(artist_id,) for artist_id in artist_ids])
+
+    def __clean_search(self, sql, album_ids, artist_ids):
+        """
+            Remove deleted tracks/albums/artists from search index
+            @param sql as sqlite cursor
+            @param album_ids as [int]
+            @param artist_ids as [int]
+            @warning commit needed
+        """
+        sql.execute("DELETE FROM tracks_search WHERE rowid IN (\
+                        SELECT track_id FROM del_tracks)")
+        sql.executemany("DELETE FROM albums_search WHERE rowid=?\
+                         AND NOT EXISTS (\
+                            SELECT rowid FROM albums WHERE rowid=?)",
+                        [(album_id, album_id) for album_id in album_ids])
+        sql.executemany("DELETE FROM artists_search WHERE rowid=?\
+                         AND NOT EXISTS (\
+                            SELECT rowid FROM artists WHERE rowid=?)",
+                        [(artist_id, artist_id) for artist_id in artist_ids])
+
+    def __clean_genres(self, sql, genre_ids):
+        """
+            Remove genres without tracks
+            @param sql as sqlite cursor
+            @param genre_ids as [int]
+            @warning commit needed
+        """
+        sql.executemany("DELETE FROM genres WHERE rowid=?\
+                         AND NOT EXISTS (\
+                            SELECT track_id FROM track_genres\
+                            WHERE genre_id=genres.rowid)",
+                        [(genre_id,) for genre_id in genre_ids])
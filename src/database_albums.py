@@ -15,7 +15,8 @@ import itertools
 
 from lollypop.sqlcursor import SqlCursor
 from lollypop.define import Lp, Type, OrderBy
-from lollypop.utils import remove_static_genres, noaccents
+from lollypop.objects import Album
+from lollypop.utils import remove_static_genres, noaccents, get_sort_key
 from lollypop.utils import get_network_available
 
 
@@ -46,16 +47,46 @@ class AlbumsDatabase:
         with SqlCursor(Lp().db) as sql:
             result = sql.execute("INSERT INTO albums\
                                   (name, no_album_artist,\
-                                  uri, loved, popularity, rate, synced)\
-                                  VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                  uri, loved, popularity, rate, synced,\
+                                  name_folded, sort_key)\
+                                  VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
                                  (name, artist_ids == [],
-                                  uri, loved, popularity, rate, 0))
+                                  uri, loved, popularity, rate, 0,
+                                  noaccents(name), get_sort_key(name)))
             for artist_id in artist_ids:
                 sql.execute("INSERT INTO album_artists\
                              (album_id, artist_id)\
                              VALUES (?, ?)", (result.lastrowid, artist_id))
             return result.lastrowid
 
+    def add_many(self, albums):
+        """
+            Add new albums to database
+            @param albums as [(name as str, artist ids as [int], uri as str,
+                               loved as bool, popularity as int, rate as int)]
+            @return inserted rowids as [int]
+            @warning: commit needed
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.executemany("INSERT INTO albums\
+                             (name, no_album_artist,\
+                             uri, loved, popularity, rate, synced,\
+                             name_folded, sort_key)\
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            [(name, artist_ids == [],
+                              uri, loved, popularity, rate, 0,
+                              noaccents(name), get_sort_key(name))
+                             for (name, artist_ids, uri,
+                                  loved, popularity, rate) in albums])
+            album_ids = SqlCursor.get_inserted_ids(sql, len(albums))
+            sql.executemany("INSERT INTO album_artists\
+                             (album_id, artist_id)\
+                             VALUES (?, ?)",
+                            [(album_id, artist_id)
+                             for (album_id, album) in zip(album_ids, albums)
+                             for artist_id in album[1]])
+            return album_ids
+
     def add_artist(self, album_id, artist_id):
         """
             Add artist to track
@@ -123,6 +154,7 @@ class AlbumsDatabase:
                     sql.execute("INSERT INTO album_artists\
                                 (album_id, artist_id)\
                                 VALUES (?, ?)", (album_id, artist_id))
+                Album.CACHE.remove(album_id)
 
     def set_synced(self, album_id, synced):
         """
@@ -134,6 +166,7 @@ class AlbumsDatabase:
         with SqlCursor(Lp().db) as sql:
             sql.execute("UPDATE albums SET synced=? WHERE rowid=?",
                         (synced, album_id))
+            Album.CACHE.remove(album_id)
 
     def set_loved(self, album_id, loved):
         """
@@ -146,6 +179,7 @@ class AlbumsDatabase:
             sql.execute("UPDATE albums SET loved=? WHERE rowid=?",
                         (loved, album_id))
             sql.commit()
+            Album.CACHE.remove(album_id)
 
     def set_rate(self, album_id, rate):
         """
@@ -156,6 +190,7 @@ class AlbumsDatabase:
             sql.execute("UPDATE albums SET rate=? WHERE rowid=?",
                         (rate, album_id))
             sql.commit()
+            Album.CACHE.remove(album_id)
 
     def set_year(self, album_id, year):
         """
@@ -167,6 +202,7 @@ class AlbumsDatabase:
         with SqlCursor(Lp().db) as sql:
             sql.execute("UPDATE albums SET year=? WHERE rowid=?",
                         (year, album_id))
+            Album.CACHE.remove(album_id)
 
     def set_uri(self, album_id, uri):
         """
@@ -177,6 +213,7 @@ class AlbumsDatabase:
         with SqlCursor(Lp().db) as sql:
             sql.execute("UPDATE albums SET uri=? WHERE rowid=?",
                         (uri, album_id))
+            Album.CACHE.remove(album_id)
 
     def set_popularity(self, album_id, popularity, commit=False):
         """
@@ -193,6 +230,7 @@ class AlbumsDatabase:
                     sql.commit()
             except:  # Database is locked
                 pass
+            Album.CACHE.remove(album_id)
 
     def get_synced_ids(self):
         """
@@ -205,11 +243,9 @@ class AlbumsDatabase:
                        AND (album_artists.artist_id = artists.rowid\
                             OR album_artists.artist_id=?)\
                        AND synced=1"
-            order = " ORDER BY artists.sortname\
-                     COLLATE NOCASE COLLATE LOCALIZED,\
+            order = " ORDER BY artists.sort_key,\
                      albums.year,\
-                     albums.name\
-                     COLLATE NOCASE COLLATE LOCALIZED"
+                     albums.sort_key"
             filters = (Type.COMPILATIONS,)
             result = sql.execute(request + order, filters)
             return list(itertools.chain(*result))
@@ -250,15 +286,11 @@ class AlbumsDatabase:
             @param year as str
         """
         with SqlCursor(Lp().db) as sql:
-            filters = (Type.CHARTS, year)
+            filters = (year,)
             request = "SELECT DISTINCT albums.rowid\
-                       FROM albums, album_genres AS AG\
-                       WHERE ? NOT IN (\
-                            SELECT album_genres.genre_id\
-                            FROM album_genres\
-                            WHERE AG.album_id=album_genres.album_id)\
-                       AND year=?\
-                       AND AG.album_id=albums.rowid"
+                       FROM albums\
+                       WHERE albums.is_chart=0\
+                       AND year=?"
             if not get_network_available():
                 request += " AND albums.synced!=%s" % Type.NONE
             result = sql.execute(request, filters)
@@ -341,6 +373,7 @@ class AlbumsDatabase:
             sql.execute("UPDATE albums set popularity=? WHERE rowid=?",
                         (current, album_id))
             sql.commit()
+            Album.CACHE.remove(album_id)
 
     def get_avg_popularity(self):
         """
@@ -412,6 +445,58 @@ class AlbumsDatabase:
                 return v[0]
             return None
 
+    def get_row(self, album_id):
+        """
+            Get album fields in one request
+            @param album id as int
+            @return {field as str: value}/None
+        """
+        return self.get_many([album_id]).get(album_id)
+
+    def get_many(self, album_ids):
+        """
+            Get fields for many albums in a few requests
+            @param album ids as [int]
+            @return {album id as int: {field as str: value}}
+        """
+        rows = {}
+        album_ids = list(album_ids)
+        with SqlCursor(Lp().db) as sql:
+            for i in range(0, len(album_ids), 500):
+                chunk = album_ids[i:i + 500]
+                request = "SELECT albums.rowid, albums.name, albums.year,\
+                           albums.uri, albums.synced, albums.loved,\
+                           (SELECT group_concat(artist_id)\
+                            FROM album_artists\
+                            WHERE album_id=albums.rowid),\
+                           (SELECT group_concat(artists.name, char(31))\
+                            FROM artists, album_artists\
+                            WHERE album_artists.album_id=albums.rowid\
+                            AND album_artists.artist_id=artists.rowid),\
+                           (SELECT SUM(duration) FROM tracks\
+                            WHERE album_id=albums.rowid),\
+                           (SELECT mtime FROM album_genres AS AG\
+                            WHERE AG.album_id=albums.rowid\
+                            AND NOT EXISTS (\
+                             SELECT mtime FROM album_genres\
+                             WHERE album_id=AG.album_id\
+                             AND genre_id < 0))\
+                           FROM albums WHERE rowid IN (%s)" %\
+                    ",".join("?" * len(chunk))
+                for v in sql.execute(request, chunk):
+                    rows[v[0]] = {
+                        "name": v[1],
+                        "year": str(v[2]) if v[2] else "",
+                        "uri": v[3],
+                        "synced": v[4],
+                        "loved": v[5],
+                        "artist_ids": [int(i) for i in v[6].split(",")]
+                        if v[6] else [],
+                        "artists": v[7].split(chr(31)) if v[7] else [],
+                        "duration": v[8] or 0,
+                        "mtime": v[9] or 0}
+        return rows
+
     def get_genre_ids(self, album_id):
         """
             Get genre ids
@@ -479,6 +564,22 @@ class AlbumsDatabase:
                 return str(v[0])
             return ""
 
+    def get_artwork(self, album_id):
+        """
+            Get embedded artwork for album, from first track having one
+            @param album id as int
+            @return artwork hash as str/None
+        """
+        with SqlCursor(Lp().db) as sql:
+            result = sql.execute("SELECT artwork FROM tracks\
+                                  WHERE album_id=? AND artwork!=''\
+                                  ORDER BY discnumber, tracknumber\
+                                  LIMIT 1", (album_id,))
+            v = result.fetchone()
+            if v is not None:
+                return v[0]
+            return None
+
     def get_uri(self, album_id):
         """
             Get album uri for album id
@@ -530,19 +631,14 @@ class AlbumsDatabase:
             @return array of album ids as int
         """
         with SqlCursor(Lp().db) as sql:
-            filters = (Type.CHARTS, )
             request = "SELECT DISTINCT albums.rowid\
-                       FROM albums, album_genres as AG\
-                       WHERE ? NOT IN (\
-                            SELECT album_genres.genre_id\
-                            FROM album_genres\
-                            WHERE AG.album_id=album_genres.album_id)\
-                       AND rate>=4\
-                       AND AG.album_id=albums.rowid"
+                       FROM albums\
+                       WHERE albums.is_chart=0\
+                       AND rate>=4"
             if not get_network_available():
                 request += " AND albums.synced!=%s" % Type.NONE
             request += " ORDER BY popularity DESC LIMIT %s" % limit
-            result = sql.execute(request, filters)
+            result = sql.execute(request)
             return list(itertools.chain(*result))
 
     def get_populars(self, limit=100):
@@ -552,19 +648,14 @@ class AlbumsDatabase:
             @return array of album ids as int
         """
         with SqlCursor(Lp().db) as sql:
-            filters = (Type.CHARTS, )
             request = "SELECT DISTINCT albums.rowid\
-                       FROM albums, album_genres as AG\
-                       WHERE ? NOT IN (\
-                            SELECT album_genres.genre_id\
-                            FROM album_genres\
-                            WHERE AG.album_id=album_genres.album_id)\
-                       AND popularity!=0\
-                       AND AG.album_id=albums.rowid"
+                       FROM albums\
+                       WHERE albums.is_chart=0\
+                       AND popularity!=0"
             if not get_network_available():
                 request += " AND albums.synced!=%s" % Type.NONE
             request += " ORDER BY popularity DESC LIMIT %s" % limit
-            result = sql.execute(request, filters)
+            result = sql.execute(request)
             return list(itertools.chain(*result))
 
     def get_loves(self):
@@ -573,19 +664,14 @@ class AlbumsDatabase:
             @return array of album ids as int
         """
         with SqlCursor(Lp().db) as sql:
-            filters = (Type.CHARTS, )
             request = "SELECT DISTINCT albums.rowid\
-                       FROM albums, album_genres as AG\
-                       WHERE ? NOT IN (\
-                            SELECT album_genres.genre_id\
-                            FROM album_genres\
-                            WHERE AG.album_id=album_genres.album_id)\
-                       AND loved=1\
-                       AND AG.album_id=albums.rowid"
+                       FROM albums\
+                       WHERE albums.is_chart=0\
+                       AND loved=1"
             if not get_network_available():
                 request += " AND albums.synced!=%s" % Type.NONE
             request += " ORDER BY popularity DESC"
-            result = sql.execute(request, filters)
+            result = sql.execute(request)
             return list(itertools.chain(*result))
 
     def get_recents(self):
@@ -594,18 +680,14 @@ class AlbumsDatabase:
             @return array of albums ids as int
         """
         with SqlCursor(Lp().db) as sql:
-            filters = (Type.CHARTS, )
             request = "SELECT DISTINCT albums.rowid\
                        FROM albums, album_genres as AG\
-                       WHERE ? NOT IN (\
-                            SELECT album_genres.genre_id\
-                            FROM album_genres\
-                            WHERE AG.album_id=album_genres.album_id)\
+                       WHERE albums.is_chart=0\
                        AND AG.album_id=albums.rowid"
             if not get_network_available():
                 request += " AND albums.synced!=%s" % Type.NONE
             request += " ORDER BY mtime DESC LIMIT 100"
-            result = sql.execute(request, filters)
+            result = sql.execute(request)
             return list(itertools.chain(*result))
 
     def get_randoms(self):
@@ -615,18 +697,13 @@ class AlbumsDatabase:
         """
         with SqlCursor(Lp().db) as sql:
             albums = []
-            filters = (Type.CHARTS, )
             request = "SELECT DISTINCT albums.rowid\
-                       FROM albums, album_genres as AG\
-                       WHERE ? NOT IN (\
-                            SELECT album_genres.genre_id\
-                            FROM album_genres\
-                            WHERE AG.album_id=album_genres.album_id)\
-                       AND AG.album_id=albums.rowid"
+                       FROM albums\
+                       WHERE albums.is_chart=0"
             if not get_network_available():
                 request += " AND albums.synced!=%s" % Type.NONE
             request += " ORDER BY random() LIMIT 100"
-            result = sql.execute(request, filters)
+            result = sql.execute(request)
             albums = list(itertools.chain(*result))
             self._cached_randoms = list(albums)
             return albums
@@ -849,20 +926,14 @@ class AlbumsDatabase:
             order = " ORDER BY mtime DESC,"
         else:
             order = " ORDER BY"
-        order += " artists.sortname\
-                   COLLATE NOCASE COLLATE LOCALIZED,\
+        order += " artists.sort_key,\
                    albums.year,\
-                   albums.name\
-                   COLLATE NOCASE COLLATE LOCALIZED"
+                   albums.sort_key"
         with SqlCursor(Lp().db) as sql:
-            filters = tuple([Type.CHARTS] + genre_ids)
+            filters = tuple(genre_ids)
             request = "SELECT DISTINCT albums.rowid FROM albums,\
                        album_genres, artists, album_artists\
-                       WHERE EXISTS (\
-                            SELECT album_genres.album_id\
-                            FROM album_genres\
-                            WHERE albums.rowid = album_genres.album_id\
-                            AND album_genres.genre_id=?)\
+                       WHERE albums.is_chart=1\
                        AND artists.rowid=album_artists.artist_id\
                        AND albums.rowid=album_artists.album_id\
                        AND album_genres.album_id=albums.rowid AND ("
@@ -885,58 +956,41 @@ class AlbumsDatabase:
         genre_ids = remove_static_genres(genre_ids)
         orderby = Lp().settings.get_enum("orderby")
         if orderby == OrderBy.ARTIST:
-            order = " ORDER BY artists.sortname\
-                     COLLATE NOCASE COLLATE LOCALIZED,\
+            order = " ORDER BY artists.sort_key,\
                      albums.year,\
-                     albums.name\
-                     COLLATE NOCASE COLLATE LOCALIZED"
+                     albums.sort_key"
         elif orderby == OrderBy.NAME:
-            order = " ORDER BY albums.name\
-                     COLLATE NOCASE COLLATE LOCALIZED"
+            order = " ORDER BY albums.sort_key"
         elif orderby == OrderBy.YEAR:
             order = " ORDER BY albums.year,\
-                     albums.name\
-                     COLLATE NOCASE COLLATE LOCALIZED"
+                     albums.sort_key"
         else:
             order = " ORDER BY albums.popularity DESC,\
-                     albums.name\
-                     COLLATE NOCASE COLLATE LOCALIZED"
+                     albums.sort_key"
 
         with SqlCursor(Lp().db) as sql:
             result = []
             # Get albums for all artists
             if not artist_ids and not genre_ids:
-                filters = (Type.CHARTS,)
                 request = "SELECT DISTINCT albums.rowid\
-                           FROM albums, artists,\
-                           album_artists, album_genres as AG\
+                           FROM albums, artists, album_artists\
                            WHERE artists.rowid=album_artists.artist_id\
-                           AND ? NOT IN (\
-                                SELECT album_genres.genre_id\
-                                FROM album_genres\
-                                WHERE AG.album_id=album_genres.album_id)\
-                           AND AG.album_id=albums.rowid\
+                           AND albums.is_chart=0\
                            AND albums.rowid=album_artists.album_id"
                 if not get_network_available():
                     request += " AND albums.synced!=%s" % Type.NONE
                 request += order
-                result = sql.execute(request, filters)
+                result = sql.execute(request)
             # Get albums for genre
             elif not artist_ids:
-                # Only show charts if wanted
-                if Type.CHARTS in genre_ids:
-                    filters = tuple(genre_ids)
-                else:
-                    filters = (Type.CHARTS,) + tuple(genre_ids)
+                filters = tuple(genre_ids)
                 request = "SELECT DISTINCT albums.rowid FROM albums,\
                            album_genres as AG, artists, album_artists\
                            WHERE artists.rowid=album_artists.artist_id\
                            AND albums.rowid=album_artists.album_id "
+                # Only show charts if wanted
                 if Type.CHARTS not in genre_ids:
-                    request += "AND ? NOT IN (\
-                                  SELECT album_genres.genre_id\
-                                  FROM album_genres\
-                                  WHERE AG.album_id=album_genres.album_id)"
+                    request += "AND albums.is_chart=0"
                 request += " AND AG.album_id=albums.rowid AND ( "
                 for genre_id in genre_ids:
                     request += "AG.genre_id=? OR "
@@ -947,17 +1001,11 @@ class AlbumsDatabase:
                 result = sql.execute(request, filters)
             # Get albums for artist
             elif not genre_ids:
-                filters = (Type.CHARTS,)
-                filters += tuple(artist_ids)
+                filters = tuple(artist_ids)
                 request = "SELECT DISTINCT albums.rowid\
-                           FROM albums, artists,\
-                           album_artists, album_genres as AG\
+                           FROM albums, artists, album_artists\
                            WHERE artists.rowid=album_artists.artist_id\
-                           AND ? NOT IN (\
-                                SELECT album_genres.genre_id\
-                                FROM album_genres\
-                                WHERE AG.album_id=album_genres.album_id)\
-                           AND AG.album_id=albums.rowid\
+                           AND albums.is_chart=0\
                            AND album_artists.album_id=albums.rowid AND ("
                 for artist_id in artist_ids:
                     request += "album_artists.artist_id=? OR "
@@ -968,18 +1016,14 @@ class AlbumsDatabase:
                 result = sql.execute(request, filters)
             # Get albums for artist id and genre id
             else:
-                filters = (Type.CHARTS,)
-                filters += tuple(artist_ids)
+                filters = tuple(artist_ids)
                 filters += tuple(genre_ids)
                 request = "SELECT DISTINCT albums.rowid\
                            FROM albums, album_genres as AG,\
                            artists, album_artists\
                            WHERE AG.album_id=albums.rowid\
                            AND artists.rowid=album_artists.artist_id\
-                           AND ? NOT IN (\
-                                SELECT album_genres.genre_id\
-                                FROM album_genres\
-                                WHERE AG.album_id=album_genres.album_id)\
+                           AND albums.is_chart=0\
                            AND album_artists.album_id=albums.rowid AND ("
                 for artist_id in artist_ids:
                     request += "album_artists.artist_id=? OR "
@@ -1081,26 +1125,39 @@ class AlbumsDatabase:
             result = sql.execute(request, filters)
             return list(itertools.chain(*result)) != []
 
-    def search(self, string, limit=25):
+    def search(self, string, limit=25, any_word=False):
         """
             Search for albums looking like string
             @param search as str
             @param limit as int/None
+            @param any_word as bool, with full text search, match any word
             @return album ids as [int]
         """
+        if Lp().db.has_search:
+            query = Lp().db.get_search_query(string, any_word)
+            if query is None:
+                return []
+            with SqlCursor(Lp().db) as sql:
+                request = "SELECT albums.rowid\
+                           FROM albums_search, albums\
+                           WHERE albums_search MATCH ?\
+                           AND albums.rowid=albums_search.rowid\
+                           AND albums.is_chart=0\
+                           ORDER BY rank"
+                if limit is None:
+                    result = sql.execute(request, (query,))
+                else:
+                    result = sql.execute(request + " LIMIT ?", (query, limit))
+                return list(itertools.chain(*result))
         with SqlCursor(Lp().db) as sql:
             if limit is None:
-                filters = ("%" + noaccents(string) + "%", Type.CHARTS)
+                filters = ("%" + noaccents(string) + "%",)
             else:
-                filters = ("%" + noaccents(string) + "%", Type.CHARTS, limit)
+                filters = ("%" + noaccents(string) + "%", limit)
             request = ("SELECT albums.rowid\
-                       FROM albums, album_genres AS AG\
-                       WHERE noaccents(name) LIKE ?\
-                       AND ? NOT IN (\
-                                SELECT album_genres.genre_id\
-                                FROM album_genres\
-                                WHERE AG.album_id=album_genres.album_id)\
-                       AND AG.album_id=albums.rowid")
+                       FROM albums\
+                       WHERE name_folded LIKE ?\
+                       AND albums.is_chart=0")
             if limit is not None:
                 request += " LIMIT ?"
             result = sql.execute(request, filters)
@@ -15,7 +15,7 @@ import itertools
 
 from lollypop.sqlcursor import SqlCursor
 from lollypop.define import Lp, Type
-from lollypop.utils import format_artist_name, noaccents
+from lollypop.utils import format_artist_name, noaccents, get_sort_key
 
 
 class ArtistsDatabase:
@@ -40,11 +40,29 @@ class ArtistsDatabase:
         if sortname == "":
             sortname = format_artist_name(name)
         with SqlCursor(Lp().db) as sql:
-            result = sql.execute("INSERT INTO artists (name, sortname)\
-                                  VALUES (?, ?)",
-                                 (name, sortname))
+            result = sql.execute("INSERT INTO artists\
+                                  (name, sortname, name_folded, sort_key)\
+                                  VALUES (?, ?, ?, ?)",
+                                 (name, sortname, noaccents(name),
+                                  get_sort_key(sortname)))
             return result.lastrowid
 
+    def add_many(self, artists):
+        """
+            Add new artists to database, skip names already in database
+            @param artists as [(name as str, sortname as str)]
+            @warning: commit needed
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.executemany("INSERT INTO artists\
+                             (name, sortname, name_folded, sort_key)\
+                             SELECT ?, ?, ?, ?\
+                             WHERE NOT EXISTS (SELECT 1 FROM artists\
+                                    WHERE name=? COLLATE NOCASE)",
+                            [(name, sortname, noaccents(name),
+                              get_sort_key(sortname), name)
+                             for (name, sortname) in artists])
+
     def set_sortname(self, artist_id, sortname):
         """
             Set sort name
@@ -54,9 +72,22 @@ class ArtistsDatabase:
         """
         with SqlCursor(Lp().db) as sql:
             sql.execute("UPDATE artists\
-                         SET sortname=?\
+                         SET sortname=?, sort_key=?\
                          WHERE rowid=?",
-                        (sortname, artist_id))
+                        (sortname, get_sort_key(sortname), artist_id))
+
+    def set_sortnames(self, sortnames):
+        """
+            Set sort names
+            @param sortnames as {artist id as int: sortname as str}
+            @warning: commit needed
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.executemany("UPDATE artists\
+                             SET sortname=?, sort_key=?\
+                             WHERE rowid=?",
+                            [(sortname, get_sort_key(sortname), artist_id)
+                             for (artist_id, sortname) in sortnames.items()])
 
     def get_sortname(self, artist_id):
         """
@@ -86,6 +117,26 @@ class ArtistsDatabase:
                 return v[0]
             return None
 
+    def get_ids_by_names(self, names):
+        """
+            Get artist ids for names
+            @param names as [str]
+            @return {name as str: artist id as int}, unknown names missing
+        """
+        artist_ids = {}
+        with SqlCursor(Lp().db) as sql:
+            # Stay under SQLITE_MAX_VARIABLE_NUMBER
+            for i in range(0, len(names), 500):
+                chunk = names[i:i + 500]
+                request = "WITH names(name) AS (VALUES %s)\
+                           SELECT names.name, artists.rowid\
+                           FROM names, artists\
+                           WHERE artists.name=names.name COLLATE NOCASE" %\
+                    ",".join(["(?)"] * len(chunk))
+                for (name, artist_id) in sql.execute(request, chunk):
+                    artist_ids.setdefault(name, artist_id)
+        return artist_ids
+
     def get_name(self, artist_id):
         """
             Get artist name
@@ -110,11 +161,9 @@ class ArtistsDatabase:
         """
         with SqlCursor(Lp().db) as sql:
             request = "SELECT DISTINCT albums.rowid\
-                       FROM album_artists, albums, album_genres\
+                       FROM album_artists, albums\
                        WHERE albums.rowid=album_artists.album_id AND\
-                       album_genres.genre_id!=%s AND\
-                       albums.rowid=album_genres.album_id AND\
-                       (1=0 " % Type.CHARTS
+                       albums.is_chart=0 AND (1=0 "
             for artist_id in artist_ids:
                 request += "OR album_artists.artist_id=%s " % artist_id
             request += ") ORDER BY year"
@@ -153,35 +202,24 @@ class ArtistsDatabase:
                 result = sql.execute(
                                  "SELECT DISTINCT artists.rowid,\
                                   artists.name, artists.sortname\
-                                  FROM artists, albums,\
-                                  album_genres AS AG, album_artists\
+                                  FROM artists, albums, album_artists\
                                   WHERE album_artists.artist_id=artists.rowid\
                                   AND album_artists.album_id=albums.rowid\
-                                  AND AG.album_id=albums.rowid\
-                                  AND ? NOT IN (\
-                                    SELECT album_genres.genre_id\
-                                    FROM album_genres\
-                                    WHERE AG.album_id=album_genres.album_id)\
-                                  ORDER BY artists.sortname\
-                                  COLLATE NOCASE COLLATE LOCALIZED",
-                                 (Type.CHARTS,))
+                                  AND albums.is_chart=0\
+                                  ORDER BY artists.sort_key")
             else:
-                genres = (Type.CHARTS,) + tuple(genre_ids)
+                genres = tuple(genre_ids)
                 request = "SELECT DISTINCT artists.rowid,\
                            artists.name, artists.sortname\
                            FROM artists, albums, album_genres AS AG,\
                            album_artists\
                            WHERE artists.rowid=album_artists.artist_id\
-                           AND ? NOT IN (\
-                                    SELECT album_genres.genre_id\
-                                    FROM album_genres\
-                                    WHERE AG.album_id=album_genres.album_id)\
+                           AND albums.is_chart=0\
                            AND albums.rowid=album_artists.album_id\
                            AND AG.album_id=albums.rowid AND ("
                 for genre_id in genre_ids:
                     request += "AG.genre_id=? OR "
-                request += "1=0) ORDER BY artists.sortname\
-                            COLLATE NOCASE COLLATE LOCALIZED"
+                request += "1=0) ORDER BY artists.sort_key"
                 result = sql.execute(request, genres)
             return [(row[0], row[1], row[2]) for row in result]
 
@@ -199,8 +237,7 @@ class ArtistsDatabase:
                               WHERE album_artists.artist_id=artists.rowid\
                               AND album_artists.album_id=albums.rowid\
                               AND albums.synced!=?\
-                              ORDER BY artists.sortname\
-                              COLLATE NOCASE COLLATE LOCALIZED",
+                              ORDER BY artists.sort_key",
                              (Type.NONE,))
             return [(row[0], row[1], row[2]) for row in result]
 
@@ -216,15 +253,11 @@ class ArtistsDatabase:
                 # Only artist that really have an album
                 result = sql.execute(
                                  "SELECT DISTINCT artists.rowid\
-                                  FROM artists, albums,\
-                                  album_genres, album_artists\
+                                  FROM artists, albums, album_artists\
                                   WHERE album_artists.artist_id=artists.rowid\
                                   AND album_artists.album_id=albums.rowid\
-                                  AND album_genres.album_id=albums.rowid\
-                                  AND album_genres.genre_id!=?\
-                                  ORDER BY artists.sortname\
-                                  COLLATE NOCASE COLLATE LOCALIZED",
-                                 (Type.CHARTS,))
+                                  AND albums.is_chart=0\
+                                  ORDER BY artists.sort_key")
             else:
                 genres = tuple(genre_ids)
                 request = "SELECT DISTINCT artists.rowid\
@@ -234,8 +267,7 @@ class ArtistsDatabase:
                            AND album_genres.album_id=albums.rowid AND ("
                 for genre_id in genre_ids:
                     request += "album_genres.genre_id=? OR "
-                request += "1=0) ORDER BY artists.sortname\
-                            COLLATE NOCASE COLLATE LOCALIZED"
+                request += "1=0) ORDER BY artists.sort_key"
                 result = sql.execute(request, genres)
             return list(itertools.chain(*result))
 
@@ -252,25 +284,37 @@ class ArtistsDatabase:
                 return bool(v[0])
             return False
 
-    def search(self, string):
+    def search(self, string, any_word=False):
         """
             Search for artists looking like string
             @param string
+            @param any_word as bool, with full text search, match any word
             @return Array of id as int
         """
+        if Lp().db.has_search:
+            query = Lp().db.get_search_query(string, any_word)
+            if query is None:
+                return []
+            with SqlCursor(Lp().db) as sql:
+                result = sql.execute("SELECT DISTINCT artists.rowid\
+                                      FROM artists_search, artists,\
+                                      albums, album_artists\
+                                      WHERE artists_search MATCH ?\
+                                      AND artists.rowid=artists_search.rowid\
+                                      AND album_artists.artist_id=\
+                                          artists.rowid\
+                                      AND album_artists.album_id=albums.rowid\
+                                      AND albums.is_chart=0\
+                                      ORDER BY rank LIMIT 25", (query,))
+                return list(itertools.chain(*result))
         with SqlCursor(Lp().db) as sql:
             result = sql.execute("SELECT artists.rowid FROM artists, albums,\
-                                  album_genres AS AG, album_artists\
-                                  WHERE noaccents(artists.name) LIKE ?\
+                                  album_artists\
+                                  WHERE artists.name_folded LIKE ?\
                                   AND album_artists.artist_id=artists.rowid\
                                   AND album_artists.album_id=albums.rowid\
-                                  AND AG.album_id=albums.rowid\
-                                  AND ? NOT IN (\
-                                    SELECT album_genres.genre_id\
-                                    FROM album_genres\
-                                    WHERE AG.album_id=album_genres.album_id)\
-                                  LIMIT 25", ("%" + noaccents(string) + "%",
-                                              Type.CHARTS))
+                                  AND albums.is_chart=0\
+                                  LIMIT 25", ("%" + noaccents(string) + "%",))
             return list(itertools.chain(*result))
 
     def count(self):
@@ -41,6 +41,16 @@ class GenresDatabase:
                                  (name,))
             return result.lastrowid
 
+    def add_many(self, names):
+        """
+            Add new genres to database
+            @param names as [str]
+            @warning: commit needed
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.executemany("INSERT INTO genres (name) VALUES (?)",
+                            [(name,) for name in names])
+
     def get_id(self, name):
         """
             Get genre id for name
@@ -55,6 +65,24 @@ class GenresDatabase:
                 return v[0]
             return None
 
+    def get_ids_by_names(self, names):
+        """
+            Get genre ids for names
+            @param names as [str]
+            @return {name as str: genre id as int}, unknown names missing
+        """
+        genre_ids = {}
+        with SqlCursor(Lp().db) as sql:
+            # Stay under SQLITE_MAX_VARIABLE_NUMBER
+            for i in range(0, len(names), 500):
+                chunk = names[i:i + 500]
+                result = sql.execute("SELECT name, rowid FROM genres\
+                                      WHERE name IN (%s)" %
+                                     ",".join("?" * len(chunk)),
+                                     chunk)
+                genre_ids.update(result)
+        return genre_ids
+
     def get_name(self, genre_id):
         """
             Get genre name for genre id
@@ -104,15 +132,12 @@ class GenresDatabase:
         """
         with SqlCursor(Lp().db) as sql:
             result = sql.execute("SELECT DISTINCT genres.rowid, genres.name\
-                                  FROM genres,album_genres AS AG\
+                                  FROM genres, album_genres AS AG, albums\
                                   WHERE AG.genre_id=genres.rowid\
-                                  AND ? NOT IN (\
-                                    SELECT album_genres.genre_id\
-                                    FROM album_genres\
-                                    WHERE AG.album_id=album_genres.album_id)\
+                                  AND AG.album_id=albums.rowid\
+                                  AND albums.is_chart=0\
                                   ORDER BY genres.name\
-                                  COLLATE NOCASE COLLATE LOCALIZED",
-                                 (Type.CHARTS,))
+                                  COLLATE NOCASE COLLATE LOCALIZED")
             return list(result)
 
     def get_ids(self):
@@ -122,15 +147,12 @@ class GenresDatabase:
         """
         with SqlCursor(Lp().db) as sql:
             result = sql.execute("SELECT DISTINCT genres.rowid\
-                                  FROM genres,album_genres AS AG\
+                                  FROM genres, album_genres AS AG, albums\
                                   WHERE AG.genre_id=genres.rowid\
-                                  AND ? NOT IN (\
-                                    SELECT album_genres.genre_id\
-                                    FROM album_genres\
-                                    WHERE AG.album_id=album_genres.album_id)\
+                                  AND AG.album_id=albums.rowid\
+                                  AND albums.is_chart=0\
                                   ORDER BY genres.name\
-                                  COLLATE NOCASE COLLATE LOCALIZED",
-                                 (Type.CHARTS,))
+                                  COLLATE NOCASE COLLATE LOCALIZED")
             return list(itertools.chain(*result))
 
     def get_charts(self, filter=Type.CHARTS):
@@ -95,6 +95,25 @@ class History:
                              loved_album, album_popularity, album_rate))
             sql.commit()
 
+    def add_many(self, items):
+        """
+            Add many entries, replace existing ones
+            @param items as [(name as str, duration as int, popularity as int,
+                              rate as int, ltime as int, mtime as int,
+                              loved album as bool, album_popularity as int,
+                              album_rate as int)]
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.executemany("DELETE FROM history\
+                             WHERE name=? AND duration=?",
+                            [(item[0], item[1]) for item in items])
+            sql.executemany("INSERT INTO history\
+                             (name, duration, popularity, rate, ltime, mtime,\
+                             loved_album, album_popularity, album_rate)\
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", items)
+            sql.commit()
+
     def get(self, name, duration):
         """
             Get stats for track with filename and duration
@@ -140,7 +159,11 @@ class History:
             Return a new sqlite cursor
         """
         try:
-            return sqlite3.connect(self.__DB_PATH, 600.0)
+            sql = sqlite3.connect(
+                self.__DB_PATH, 600.0,
+                cached_statements=SqlCursor.get_statements_cache())
+            SqlCursor.set_pragmas(sql)
+            return sql
         except:
             exit(-1)
 
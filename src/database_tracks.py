@@ -16,7 +16,9 @@ import itertools
 
 from lollypop.sqlcursor import SqlCursor
 from lollypop.define import Lp, Type, DbPersistent
+from lollypop.objects import Album, Track
 from lollypop.utils import noaccents, get_network_available
+from lollypop.utils import get_sort_key
 
 
 class TracksDatabase:
@@ -33,7 +35,7 @@ class TracksDatabase:
 
     def add(self, name, uri, duration, tracknumber, discnumber,
             discname, album_id, year, popularity, rate, ltime,
-            persistent=DbPersistent.INTERNAL):
+            persistent=DbPersistent.INTERNAL, artwork=""):
         """
             Add a new track to database
             @param name as string
@@ -49,6 +51,7 @@ class TracksDatabase:
             @param rate as int
             @param ltime as int
             @param persistent as int
+            @param artwork as str, embedded artwork hash
             @return inserted rowid as int
             @warning: commit needed
         """
@@ -56,8 +59,9 @@ class TracksDatabase:
             result = sql.execute(
                 "INSERT INTO tracks (name, uri, duration, tracknumber,\
                 discnumber, discname, album_id,\
-                year, popularity, rate, ltime, persistent) VALUES\
-                (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                year, popularity, rate, ltime, persistent,\
+                name_folded, sort_key, artwork) VALUES\
+                (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
                                                         name,
                                                         uri,
                                                         duration,
@@ -69,9 +73,35 @@ class TracksDatabase:
                                                         popularity,
                                                         rate,
                                                         ltime,
-                                                        persistent))
+                                                        persistent,
+                                                        noaccents(name),
+                                                        get_sort_key(name),
+                                                        artwork))
             return result.lastrowid
 
+    def add_many(self, tracks):
+        """
+            Add new internal tracks to database
+            @param tracks as [(name as str, uri as str, duration as int,
+                               tracknumber as int, discnumber as int,
+                               discname as str, album_id as int,
+                               year as int, popularity as int, rate as int,
+                               ltime as int, artwork as str)]
+            @return inserted rowids as [int]
+            @warning: commit needed
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.executemany(
+                "INSERT INTO tracks (name, uri, duration, tracknumber,\
+                discnumber, discname, album_id,\
+                year, popularity, rate, ltime, persistent,\
+                name_folded, sort_key, artwork) VALUES\
+                (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [track[:11] + (DbPersistent.INTERNAL, noaccents(track[0]),
+                               get_sort_key(track[0]), track[11])
+                 for track in tracks])
+            return SqlCursor.get_inserted_ids(sql, len(tracks))
+
     def add_artist(self, track_id, artist_id):
         """
             Add artist to track
@@ -113,6 +143,21 @@ class TracksDatabase:
                                  VALUES (?, ?, ?)",
                                 (track_id, genre_id, mtime))
 
+    def add_artists_genres(self, artists, genres):
+        """
+            Add artists and genres to new tracks
+            @param artists as [(track id as int, artist id as int)]
+            @param genres as [(track id as int, genre id as int, mtime as int)]
+            @warning: commit needed
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.executemany("INSERT INTO\
+                             track_artists (track_id, artist_id)\
+                             VALUES (?, ?)", artists)
+            sql.executemany("INSERT INTO\
+                             track_genres (track_id, genre_id, mtime)\
+                             VALUES (?, ?, ?)", genres)
+
     def del_genres(self, track_id):
         """
             Delete all genres for track
@@ -155,20 +200,14 @@ class TracksDatabase:
         """
         result = []
         order = " ORDER BY mtime DESC,\
-                 artists.sortname\
-                 COLLATE NOCASE COLLATE LOCALIZED,\
+                 artists.sort_key,\
                  tracks.year,\
-                 tracks.name\
-                 COLLATE NOCASE COLLATE LOCALIZED"
+                 tracks.sort_key"
         with SqlCursor(Lp().db) as sql:
-            filters = tuple([Type.CHARTS] + genre_ids)
+            filters = tuple(genre_ids)
             request = "SELECT DISTINCT tracks.rowid FROM tracks,\
                        track_genres, artists, track_artists\
-                       WHERE EXISTS (\
-                            SELECT track_genres.track_id\
-                            FROM track_genres\
-                            WHERE tracks.rowid = track_genres.track_id\
-                            AND track_genres.genre_id=?)\
+                       WHERE tracks.is_chart=1\
                        AND artists.rowid=track_artists.artist_id\
                        AND tracks.rowid=track_artists.track_id\
                        AND track_genres.track_id=tracks.rowid AND ("
@@ -195,6 +234,24 @@ class TracksDatabase:
                 return v[0]
             return None
 
+    def get_ids_by_uris(self, uris):
+        """
+            Return track ids for uris
+            @param uris as [str]
+            @return track ids as [int]
+        """
+        track_ids = []
+        with SqlCursor(Lp().db) as sql:
+            # Stay under SQLITE_MAX_VARIABLE_NUMBER
+            for i in range(0, len(uris), 500):
+                chunk = uris[i:i + 500]
+                result = sql.execute("SELECT rowid FROM tracks\
+                                      WHERE uri IN (%s)" %
+                                     ",".join("?" * len(chunk)),
+                                     chunk)
+                track_ids += list(itertools.chain(*result))
+        return track_ids
+
     def get_id_by(self, name, album_id, artist_ids):
         """
             Return track id for uri
@@ -221,6 +278,72 @@ class TracksDatabase:
                 return v[0]
             return None
 
+    def get_row(self, track_id):
+        """
+            Get track fields in one request
+            @param track id as int
+            @return {field as str: value}/None
+        """
+        return self.get_many([track_id]).get(track_id)
+
+    def get_many(self, track_ids):
+        """
+            Get fields for many tracks in a few requests
+            @param track ids as [int]
+            @return {track id as int: {field as str: value}}
+        """
+        rows = {}
+        track_ids = list(track_ids)
+        with SqlCursor(Lp().db) as sql:
+            for i in range(0, len(track_ids), 500):
+                chunk = track_ids[i:i + 500]
+                request = "SELECT tracks.rowid, tracks.name, tracks.album_id,\
+                           albums.name, tracks.duration,\
+                           tracks.tracknumber, tracks.year,\
+                           tracks.persistent,\
+                           (SELECT group_concat(artist_id)\
+                            FROM track_artists\
+                            WHERE track_id=tracks.rowid),\
+                           (SELECT group_concat(artists.name, char(31))\
+                            FROM artists, track_artists\
+                            WHERE track_artists.track_id=tracks.rowid\
+                            AND track_artists.artist_id=artists.rowid),\
+                           (SELECT group_concat(genre_id)\
+                            FROM track_genres\
+                            WHERE track_id=tracks.rowid),\
+                           (SELECT group_concat(genres.name, char(31))\
+                            FROM genres, track_genres\
+                            WHERE track_genres.track_id=tracks.rowid\
+                            AND track_genres.genre_id=genres.rowid),\
+                           (SELECT mtime FROM track_genres AS TG\
+                            WHERE TG.track_id=tracks.rowid\
+                            AND NOT EXISTS (\
+                             SELECT mtime FROM track_genres\
+                             WHERE track_id=TG.track_id\
+                             AND genre_id < 0))\
+                           FROM tracks LEFT JOIN albums\
+                           ON albums.rowid=tracks.album_id\
+                           WHERE tracks.rowid IN (%s)" %\
+                    ",".join("?" * len(chunk))
+                for v in sql.execute(request, chunk):
+                    rows[v[0]] = {
+                        "name": v[1],
+                        "album_id": v[2],
+                        "album_name": v[3] if v[3] is not None
+                        else _("Unknown"),
+                        "duration": v[4],
+                        "number": v[5],
+                        "year": str(v[6]) if v[6] else "",
+                        "persistent": v[7],
+                        "artist_ids": [int(i) for i in v[8].split(",")]
+                        if v[8] else [],
+                        "artists": v[9].split(chr(31)) if v[9] else [],
+                        "genre_ids": [int(i) for i in v[10].split(",")]
+                        if v[10] else [],
+                        "genres": v[11].split(chr(31)) if v[11] else [],
+                        "mtime": v[12] or 0}
+        return rows
+
     def get_name(self, track_id):
         """
             Get track name for track id
@@ -288,6 +411,7 @@ class TracksDatabase:
                          WHERE rowid=?",
                         (uri, track_id))
             sql.commit()
+            Track.CACHE.remove(track_id)
             if uri.startswith("http") or uri.startswith("https"):
                 self.set_duration(track_id, 0)
 
@@ -302,6 +426,20 @@ class TracksDatabase:
                          WHERE rowid=?",
                         (rate, track_id))
             sql.commit()
+            Track.CACHE.remove(track_id)
+
+    def set_artwork(self, track_id, artwork):
+        """
+            Set track embedded artwork
+            @param track id as int
+            @param artwork as str, embedded artwork hash
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.execute("UPDATE tracks SET artwork=?\
+                         WHERE rowid=?",
+                        (artwork, track_id))
+            sql.commit()
+            Track.CACHE.remove(track_id)
 
     def get_album_id(self, track_id):
         """
@@ -454,6 +592,9 @@ class TracksDatabase:
                          SET duration=?\
                          WHERE rowid=?", (duration, track_id,))
             sql.commit()
+            Track.CACHE.remove(track_id)
+            # Album duration is the sum of its tracks durations
+            Album.CACHE.remove(self.get_album_id(track_id))
 
     def is_empty(self):
         """
@@ -548,6 +689,7 @@ class TracksDatabase:
             sql.execute("UPDATE tracks set popularity=? WHERE rowid=?",
                         (current, track_id))
             sql.commit()
+            Track.CACHE.remove(track_id)
 
     def set_listened_at(self, track_id, time):
         """
@@ -559,6 +701,7 @@ class TracksDatabase:
             sql.execute("UPDATE tracks set ltime=? WHERE rowid=?",
                         (time, track_id))
             sql.commit()
+            Track.CACHE.remove(track_id)
 
     def get_never_listened_to(self):
         """
@@ -597,8 +740,8 @@ class TracksDatabase:
             @return int
         """
         with SqlCursor(Lp().db) as sql:
-            result = sql.execute("SELECT rowid FROM tracks\
-                                  WHERE persistent=?", (track_id,))
+            result = sql.execute("SELECT persistent FROM tracks\
+                                  WHERE rowid=?", (track_id,))
             v = result.fetchone()
             if v is not None:
                 return v[0]
@@ -615,6 +758,7 @@ class TracksDatabase:
                          SET persistent=?\
                          WHERE rowid=?", (persistent, track_id,))
             sql.commit()
+            Track.CACHE.remove(track_id)
 
     def get_non_persistent(self):
         """
@@ -634,10 +778,9 @@ class TracksDatabase:
         """
         with SqlCursor(Lp().db) as sql:
             result = sql.execute("SELECT tracks.rowid\
-                                  FROM tracks, track_genres\
-                                  WHERE track_genres.genre_id!=?\
-                                  AND track_genres.track_id=tracks.rowid\
-                                  ORDER BY random() LIMIT 100", (Type.CHARTS,))
+                                  FROM tracks\
+                                  WHERE tracks.is_chart=0\
+                                  ORDER BY random() LIMIT 100")
             return list(itertools.chain(*result))
 
     def set_popularity(self, track_id, popularity, commit=False):
@@ -655,6 +798,7 @@ class TracksDatabase:
                     sql.commit()
             except:  # Database is locked
                 pass
+            Track.CACHE.remove(track_id)
 
     def get_popularity(self, track_id):
         """
@@ -774,24 +918,32 @@ class TracksDatabase:
             sql.execute("DELETE FROM track_genres\
                          WHERE track_id = ?", (track_id,))
 
-    def search(self, searched):
+    def search(self, searched, any_word=False):
         """
             Search for tracks looking like searched
             @param searched as string
+            @param any_word as bool, with full text search, match any word
             return: list of [id as int, name as string]
         """
+        if Lp().db.has_search:
+            query = Lp().db.get_search_query(searched, any_word)
+            if query is None:
+                return []
+            with SqlCursor(Lp().db) as sql:
+                result = sql.execute("SELECT tracks.rowid, tracks.name\
+                                      FROM tracks_search, tracks\
+                                      WHERE tracks_search MATCH ?\
+                                      AND tracks.rowid=tracks_search.rowid\
+                                      AND tracks.is_chart=0\
+                                      ORDER BY rank LIMIT 25", (query,))
+                return list(result)
         with SqlCursor(Lp().db) as sql:
             result = sql.execute("SELECT tracks.rowid, tracks.name\
-                                  FROM tracks, track_genres AS TG\
-                                  WHERE noaccents(name) LIKE ?\
-                                  AND tracks.rowid=TG.track_id\
-                                  AND ? NOT IN (\
-                                    SELECT track_genres.genre_id\
-                                    FROM track_genres\
-                                    WHERE TG.track_id=track_genres.track_id)\
+                                  FROM tracks\
+                                  WHERE name_folded LIKE ?\
+                                  AND tracks.is_chart=0\
                                   LIMIT 25",
-                                 ("%" + noaccents(searched) + "%",
-                                  Type.CHARTS))
+                                 ("%" + noaccents(searched) + "%",))
             return list(result)
 
     def search_track(self, artist, title):
@@ -19,7 +19,7 @@ from lollypop.sqlcursor import SqlCursor
 from lollypop.utils import translate_artist_name
 from lollypop.database_history import History
 from lollypop.radios import Radios
-from lollypop.define import Lp
+from lollypop.define import Lp, Type
 
 
 class DatabaseUpgrade:
@@ -57,6 +57,13 @@ class DatabaseUpgrade:
             19: self.__upgrade_19,
             20: self.__upgrade_20,
             21: self.__upgrade_21,
+            22: "CREATE TABLE dirs (uri TEXT NOT NULL, mtime INT NOT NULL)",
+            23: self.__upgrade_23,
+            24: self.__upgrade_24,
+            25: self.__upgrade_25,
+            26: self.__upgrade_26,
+            27: "ALTER TABLE tracks ADD artwork TEXT NOT NULL DEFAULT ''",
+            28: self.__upgrade_28,
                          }
 
     """
@@ -416,3 +423,94 @@ class DatabaseUpgrade:
             sql.execute("ALTER TABLE radios ADD rate\
                          INT NOT NULL DEFAULT -1")
             sql.commit()
+
+    def __upgrade_23(self):
+        """
+            Add indexes for lookups by uri, album, artist and genre
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.execute("CREATE INDEX IF NOT EXISTS idx_tu ON tracks(uri)")
+            sql.execute("CREATE INDEX IF NOT EXISTS idx_tal\
+                         ON tracks(album_id)")
+            sql.execute("CREATE INDEX IF NOT EXISTS idx_an\
+                         ON artists(name COLLATE NOCASE)")
+            sql.execute("CREATE INDEX IF NOT EXISTS idx_aaa\
+                         ON album_artists(artist_id, album_id)")
+            sql.execute("CREATE INDEX IF NOT EXISTS idx_taa\
+                         ON track_artists(artist_id, track_id)")
+            sql.execute("CREATE INDEX IF NOT EXISTS idx_agg\
+                         ON album_genres(genre_id, album_id)")
+            sql.execute("CREATE INDEX IF NOT EXISTS idx_tgg\
+                         ON track_genres(genre_id, track_id)")
+            sql.commit()
+
+    def __upgrade_24(self):
+        """
+            Add a charts flag to albums and tracks, kept in sync by triggers
+        """
+        with SqlCursor(Lp().db) as sql:
+            for (table, genres, column) in [
+                    ("albums", "album_genres", "album_id"),
+                    ("tracks", "track_genres", "track_id")]:
+                sql.execute("ALTER TABLE %s ADD is_chart\
+                             INT NOT NULL DEFAULT 0" % table)
+                sql.execute("UPDATE %s SET is_chart=1\
+                             WHERE rowid IN (\
+                                SELECT %s FROM %s\
+                                WHERE genre_id=?)" % (table, column, genres),
+                            (Type.CHARTS,))
+                sql.execute("CREATE TRIGGER %s_charts_insert\
+                             AFTER INSERT ON %s\
+                             WHEN NEW.genre_id=%s\
+                             BEGIN\
+                                UPDATE %s SET is_chart=1\
+                                WHERE rowid=NEW.%s;\
+                             END" % (table[:-1], genres, Type.CHARTS,
+                                     table, column))
+                sql.execute("CREATE TRIGGER %s_charts_delete\
+                             AFTER DELETE ON %s\
+                             WHEN OLD.genre_id=%s\
+                             BEGIN\
+                                UPDATE %s SET is_chart=EXISTS(\
+                                    SELECT 1 FROM %s\
+                                    WHERE %s=OLD.%s\
+                                    AND genre_id=%s)\
+                                WHERE rowid=OLD.%s;\
+                             END" % (table[:-1], genres, Type.CHARTS,
+                                     table, genres, column, column,
+                                     Type.CHARTS, column))
+            sql.commit()
+
+    def __upgrade_25(self):
+        """
+            Add full text search index
+        """
+        Lp().db.create_search()
+
+    def __upgrade_26(self):
+        """
+            Add folded names and sort keys, fill search index
+        """
+        with SqlCursor(Lp().db) as sql:
+            for table in ["albums", "artists", "tracks"]:
+                sql.execute("ALTER TABLE %s ADD name_folded\
+                             TEXT NOT NULL DEFAULT ''" % table)
+                sql.execute("ALTER TABLE %s ADD sort_key\
+                             BLOB NOT NULL DEFAULT ''" % table)
+            sql.commit()
+            Lp().db.update_sort_keys()
+            Lp().db.update_search()
+            sql.commit()
+
+    def __upgrade_28(self):
+        """
+            Add indexes for album and genre lookups done while scanning
+        """
+        with SqlCursor(Lp().db) as sql:
+            sql.execute("CREATE INDEX IF NOT EXISTS idx_au ON albums(uri)")
+            sql.execute("CREATE INDEX IF NOT EXISTS idx_aln\
+                         ON albums(name COLLATE NOCASE)")
+            sql.execute("CREATE INDEX IF NOT EXISTS idx_alc\
+                         ON albums(name) WHERE no_album_artist=1")
+            sql.execute("CREATE INDEX IF NOT EXISTS idx_gn ON genres(name)")
+            sql.commit()
@@ -93,6 +93,13 @@ class ArtSize:
     MAX = 4000
 
 
+# Executor lanes, lower first
+class TaskPriority:
+    UI = 0               # Visible content
+    BACKGROUND = 1       # Prefetch, cache, maintenance
+    ALL = 2              # Lanes count
+
+
 class Shuffle:
     NONE = 0             # No shuffle
     TRACKS = 1           # Shuffle by tracks on genre
@@ -0,0 +1,153 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Thread, Lock
+from queue import PriorityQueue
+from itertools import count
+from time import perf_counter
+
+from lollypop.define import TaskPriority
+
+
+class Task:
+    """
+        A function queued in TaskExecutor
+        Cancellation is cooperative: a cancelled task is not run,
+        a running task may check cancelled property
+    """
+
+    def __init__(self, target, args, priority):
+        """
+            Init task
+            @param target as function
+            @param args as tuple
+            @param priority as TaskPriority
+        """
+        self.__target = target
+        self.__args = args
+        self.__cancelled = False
+        self.priority = priority
+        self.queued = perf_counter()
+
+    @property
+    def cancelled(self):
+        """
+            True if task cancelled
+            @return bool
+        """
+        return self.__cancelled
+
+    def cancel(self):
+        """
+            Cancel task
+        """
+        self.__cancelled = True
+
+    def run(self):
+        """
+            Run task
+        """
+        self.__target(*self.__args)
+
+
+class TaskExecutor:
+    """
+        Bounded pool of threads running tasks by priority lane,
+        in submission order inside a lane
+    """
+
+    def __init__(self, workers):
+        """
+            Init executor and start workers
+            @param workers as int
+        """
+        self.__queue = PriorityQueue()
+        self.__count = count()
+        self.__lock = Lock()
+        self.__depth = [0] * TaskPriority.ALL
+        self.__running = 0
+        self.__done = 0
+        self.__latency = 0.0
+        self.__max_latency = 0.0
+        for i in range(max(1, workers)):
+            t = Thread(target=self.__run)
+            t.daemon = True
+            t.start()
+
+    def submit(self, target, *args, priority=TaskPriority.UI):
+        """
+            Queue target(*args)
+            @param target as function
+            @param args
+            @param priority as TaskPriority
+            @return Task
+            @thread safe
+        """
+        task = Task(target, args, priority)
+        with self.__lock:
+            self.__depth[priority] += 1
+        self.__queue.put((priority, next(self.__count), task))
+        return task
+
+    @property
+    def queue_depth(self):
+        """
+            Get queued tasks count per lane
+            @return [int], indexed by TaskPriority
+        """
+        with self.__lock:
+            return list(self.__depth)
+
+    @property
+    def running(self):
+        """
+            Get running tasks count
+            @return int
+        """
+        with self.__lock:
+            return self.__running
+
+    @property
+    def latency(self):
+        """
+            Get time tasks waited in queue
+            @return (average as float, max as float) in ms
+        """
+        with self.__lock:
+            if self.__done == 0:
+                return (0.0, 0.0)
+            return (self.__latency / self.__done * 1000,
+                    self.__max_latency * 1000)
+
+#######################
+# PRIVATE             #
+#######################
+    def __run(self):
+        """
+            Worker loop
+        """
+        while True:
+            (priority, index, task) = self.__queue.get()
+            latency = perf_counter() - task.queued
+            with self.__lock:
+                self.__depth[priority] -= 1
+                self.__done += 1
+                self.__latency += latency
+                self.__max_latency = max(self.__max_latency, latency)
+                self.__running += 1
+            try:
+                if not task.cancelled:
+                    task.run()
+            except Exception as e:
+                print("TaskExecutor::__run():", e)
+            with self.__lock:
+                self.__running -= 1
@@ -12,24 +12,39 @@
 
 from gi.repository import Gio, GLib
 
+from collections import deque
+from time import time
+
 from lollypop.define import Lp
-from lollypop.utils import is_audio
+from lollypop.utils import is_audio, debug
 from lollypop.lio import Lio
 
 
 class Inotify:
     """
         Inotify support
+        Use a file monitor per dir until max-file-monitors is reached,
+        then poll dirs mtime
     """
     # 10 second before updating database
     __TIMEOUT = 10000
+    # Poll unmonitored dirs every minute
+    __POLL_TIMEOUT = 60000
+    # Events per second are computed over this delay (in seconds)
+    __EVENTS_DELAY = 10
 
     def __init__(self):
         """
             Init inode notification
         """
-        self.__monitors = []
+        self.__monitors = {}
+        self.__polled = {}
+        self.__uris = set()
+        self.__events = deque()
         self.__timeout = None
+        self.__poll_timeout = None
+        self.__max_monitors = Lp().settings.get_value(
+                                            "max-file-monitors").get_int32()
 
     def add_monitor(self, uri):
         """
@@ -37,7 +52,10 @@ class Inotify:
             @param uri as string
         """
         # Check if there is already a monitor for this uri
-        if uri in self.__monitors:
+        if uri in self.__monitors or uri in self.__polled:
+            return
+        if len(self.__monitors) >= self.__max_monitors:
+            self.__add_polled(uri)
             return
         try:
             f = Lio.File.new_for_uri(uri)
@@ -45,52 +63,154 @@ class Inotify:
                                           None)
             if monitor is not None:
                 monitor.connect("changed", self.__on_dir_changed)
-                self.__monitors.append(uri)
+                self.__monitors[uri] = monitor
         except Exception as e:
             print("Inotify::add_monitor():", e)
+            # Probably out of inotify watches
+            self.__add_polled(uri)
+
+    @property
+    def active_watches(self):
+        """
+            Get active file monitors count
+            @return int
+        """
+        return len(self.__monitors)
+
+    @property
+    def polled_dirs(self):
+        """
+            Get polled dirs count
+            @return int
+        """
+        return len(self.__polled)
+
+    @property
+    def events_per_second(self):
+        """
+            Get events per second over last seconds
+            @return float
+        """
+        self.__expire_events()
+        return len(self.__events) / self.__EVENTS_DELAY
 
 #######################
 # PRIVATE             #
 #######################
+    def __add_polled(self, uri):
+        """
+            Poll uri mtime instead of monitoring it
+            @param uri as str
+        """
+        mtime = self.__get_mtime(uri)
+        if mtime is None:
+            return
+        self.__polled[uri] = mtime
+        if self.__poll_timeout is None:
+            self.__poll_timeout = GLib.timeout_add(self.__POLL_TIMEOUT,
+                                                   self.__poll)
+
+    def __remove_monitors(self, uri):
+        """
+            Stop monitoring and polling uri and its subdirs
+            @param uri as str
+        """
+        prefix = uri + "/"
+        for monitor_uri in list(self.__monitors.keys()):
+            if monitor_uri == uri or monitor_uri.startswith(prefix):
+                self.__monitors[monitor_uri].cancel()
+                del self.__monitors[monitor_uri]
+        for polled_uri in list(self.__polled.keys()):
+            if polled_uri == uri or polled_uri.startswith(prefix):
+                del self.__polled[polled_uri]
+
+    def __get_mtime(self, uri):
+        """
+            Get modification time for uri
+            @param uri as str
+            @return mtime as int/None
+        """
+        try:
+            f = Lio.File.new_for_uri(uri)
+            info = f.query_info("time::modified",
+                                Gio.FileQueryInfoFlags.NONE,
+                                None)
+            return int(info.get_attribute_as_string("time::modified"))
+        except Exception as e:
+            debug("Inotify::__get_mtime(): %s" % e)
+            return None
+
+    def __poll(self):
+        """
+            Check polled dirs mtime, update changed ones
+        """
+        for uri in list(self.__polled.keys()):
+            # Removed with a deleted parent
+            if uri not in self.__polled:
+                continue
+            mtime = self.__get_mtime(uri)
+            if mtime is None:
+                self.__remove_monitors(uri)
+                self.__add_uri(uri)
+            elif mtime != self.__polled[uri]:
+                self.__polled[uri] = mtime
+                self.__add_uri(uri)
+        if self.__polled:
+            return True
+        self.__poll_timeout = None
+
+    def __expire_events(self):
+        """
+            Forget events older than events delay
+        """
+        limit = time() - self.__EVENTS_DELAY
+        while self.__events and self.__events[0] < limit:
+            self.__events.popleft()
+
+    def __add_uri(self, uri):
+        """
+            Add uri to next update
+            @param uri as str
+        """
+        self.__uris.add(uri)
+        if self.__timeout is not None:
+            GLib.source_remove(self.__timeout)
+        self.__timeout = GLib.timeout_add(self.__TIMEOUT,
+                                          self.__run_collection_update)
+
     def __on_dir_changed(self, monitor, changed_file, other_file, event):
         """
-            Prepare thread to handle changes
+            Remember changed uri and prepare a delayed update
         """
-        update = False
-        # Stop collection scanner and wait
-        if Lp().scanner.is_locked():
-            Lp().scanner.stop()
-            GLib.timeout_add(self.__TIMEOUT,
-                             self.__on_dir_changed,
-                             monitor,
-                             changed_file,
-                             other_file,
-                             event)
-        # Run update delayed
+        self.__events.append(time())
+        self.__expire_events()
+        uri = changed_file.get_uri()
+        d = Lio.File.new_for_uri(uri)
+        if d.query_exists():
+            # If a directory, monitor it
+            if changed_file.query_file_type(
+                                        Gio.FileQueryInfoFlags.NONE,
+                                        None) == Gio.FileType.DIRECTORY:
+                self.add_monitor(uri)
+            # If not an audio file, exit
+            elif not is_audio(changed_file):
+                return
+        # Deleted dir, remove its monitors
         else:
-            uri = changed_file.get_uri()
-            d = Lio.File.new_for_uri(uri)
-            if d.query_exists():
-                # If a directory, monitor it
-                if changed_file.query_file_type(
-                                            Gio.FileQueryInfoFlags.NONE,
-                                            None) == Gio.FileType.DIRECTORY:
-                    self.add_monitor(uri)
-                # If not an audio file, exit
-                elif is_audio(changed_file):
-                    update = True
-            else:
-                update = True
-            if update:
-                if self.__timeout is not None:
-                    GLib.source_remove(self.__timeout)
-                    self.__timeout = None
-                self.__timeout = GLib.timeout_add(self.__TIMEOUT,
-                                                  self.__run_collection_update)
+            self.__remove_monitors(uri)
+        self.__add_uri(uri)
 
     def __run_collection_update(self):
         """
-            Run a collection update
+            Run a collection update for changed uris
         """
+        # Wait for current scan
+        if Lp().scanner.is_locked():
+            return True
         self.__timeout = None
-        Lp().window.update_db()
+        uris = list(self.__uris)
+        self.__uris = set()
+        debug("Inotify::__run_collection_update(): %s watches, %s polled, "
+              "%.1f events/s" % (self.active_watches, self.polled_dirs,
+                                 self.events_per_second))
+        Lp().scanner.update_uris(uris)
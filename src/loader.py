@@ -12,45 +12,74 @@
 
 from gi.repository import GLib
 
-from threading import Thread, Lock
+from threading import Lock
 
+from lollypop.define import Lp, TaskPriority
 
-class Loader(Thread):
+
+class Loader:
     """
-        Helper to load data on a separate thread and
+        Helper to load data with application executor and
         dispatch it to the UI thread
+        Starting a loader for a view cancels previous one
     """
     active = {}
     active_lock = Lock()
 
-    def __init__(self, target, view=None, on_finished=None):
-        Thread.__init__(self)
-        self.daemon = True
+    def __init__(self, target, view=None, on_finished=None,
+                 priority=TaskPriority.UI):
+        """
+            Init loader
+            @param target as function
+            @param view as Gtk.Widget
+            @param on_finished as function
+            @param priority as TaskPriority
+        """
         self._target = target
         self._view = view
         self._on_finished = on_finished
-        self._invalidated = False
-        self._invalidated_lock = Lock()
+        self._priority = priority
+        self._task = None
 
-    def is_invalidated(self):
-        with self._invalidated_lock:
-            return self._invalidated
+    def is_cancelled(self):
+        """
+            True if loader cancelled
+            @return bool
+        """
+        return self._task is not None and self._task.cancelled
 
-    def invalidate(self):
-        with self._invalidated_lock:
-            self._invalidated = True
+    def cancel(self):
+        """
+            Cancel loader, result will not be dispatched
+        """
+        if self._task is not None:
+            self._task.cancel()
 
-    def run(self):
+    def start(self):
+        """
+            Queue loader
+        """
         with Loader.active_lock:
             active = Loader.active.get(self._view, None)
             if active:
-                active.invalidate()
+                active.cancel()
             Loader.active[self._view] = self
+            self._task = Lp().executor.submit(self.__run,
+                                              priority=self._priority)
+
+#######################
+# PRIVATE             #
+#######################
+    def __run(self):
+        """
+            Load data and dispatch it
+        """
         result = self._target()
-        if not self.is_invalidated():
+        if not self.is_cancelled():
             if self._on_finished:
                 GLib.idle_add(self._on_finished, (result))
             elif self._view:
                 GLib.idle_add(self._view.populate, (result))
-            with Loader.active_lock:
+        with Loader.active_lock:
+            if Loader.active.get(self._view, None) is self:
                 Loader.active.pop(self._view, None)
@@ -13,41 +13,193 @@
 
 from gi.repository import GLib
 
+from collections import OrderedDict
+from threading import Lock
+
 from lollypop.radios import Radios
 from lollypop.define import Lp, Type
 from lollypop.sqlcursor import SqlCursor
 
 
+class RowCache:
+    """
+        Bounded LRU of database rows keyed by object id
+    """
+
+    def __init__(self, max_items):
+        """
+            Init cache
+            @param max_items as int
+        """
+        self.__max_items = max_items
+        self.__rows = OrderedDict()
+        self.__lock = Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, object_id):
+        """
+            Get row for object id
+            @param object_id as int
+            @return {field as str: value}/None
+        """
+        with self.__lock:
+            row = self.__rows.get(object_id)
+            if row is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+                self.__rows.move_to_end(object_id)
+            return row
+
+    def set(self, object_id, row):
+        """
+            Cache row for object id
+            @param object_id as int
+            @param row as {field as str: value}
+        """
+        with self.__lock:
+            self.__rows[object_id] = row
+            self.__rows.move_to_end(object_id)
+            while len(self.__rows) > self.__max_items:
+                self.__rows.popitem(last=False)
+
+    def remove(self, object_id):
+        """
+            Invalidate row for object id
+            @param object_id as int
+        """
+        with self.__lock:
+            self.__rows.pop(object_id, None)
+
+    def clear(self):
+        """
+            Invalidate all rows
+        """
+        with self.__lock:
+            self.__rows.clear()
+
+    @property
+    def hits(self):
+        """
+            Cache hits count
+            @return int
+        """
+        return self.__hits
+
+    @property
+    def misses(self):
+        """
+            Cache misses count
+            @return int
+        """
+        return self.__misses
+
+
+class LazyField:
+    """
+        Descriptor for a field lazily loaded from database
+    """
+    __slots__ = ("__name", "__default")
+
+    def __init__(self, name, default):
+        """
+            Init field
+            @param name as str
+            @param default as object
+        """
+        self.__name = name
+        self.__default = default
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = obj.get_field(self.__name)
+        # Return default value if None
+        if value is None:
+            return self.__default
+        else:
+            return value
+
+    def __set__(self, obj, value):
+        obj.set_field(self.__name, value)
+
+
+def lazy_fields(cls):
+    """
+        Add a LazyField to class for each name in cls.FIELDS
+        @param cls as class
+        @return cls
+    """
+    for index, field in enumerate(cls.FIELDS):
+        setattr(cls, field, LazyField(field, cls.DEFAULTS[index]))
+    return cls
+
+
 class Base:
     """
         Base for album and track objects
+        Objects do not have a __dict__: database rows are shared between
+        objects and only overridden fields are stored in object
     """
-    def __init__(self, db):
-        self.db = db
+    __slots__ = ("db", "id", "_row", "_values")
 
-    def __dir__(self, *args, **kwargs):
+    def __init__(self, db, row=None):
         """
-            Concatenate base class"s fields with child class"s fields
+            Init base
+            @param db as database object
+            @param row as {field as str: value}/None (prefetched fields)
         """
-        return super(Base, self).__dir__(*args, **kwargs) + self.FIELDS
+        self.db = db
+        self._row = row
+        self._values = None
 
     def __getattr__(self, attr):
-        # Lazy DB calls of attributes referenced
-        # in self.FIELDS
-        if attr in self.FIELDS:
-            if self.id is None or self.id < 0:
-                return self.DEFAULTS[self.FIELDS.index(attr)]
-            # Actual value of "attr_name" is stored in "_attr_name"
-            attr_name = "_" + attr
-            attr_value = getattr(self, attr_name)
-            if attr_value is None:
-                attr_value = getattr(self.db, "get_" + attr)(self.id)
-                setattr(self, attr_name, attr_value)
-            # Return default value if None
-            if attr_value is None:
-                return self.DEFAULTS[self.FIELDS.index(attr)]
-            else:
-                return attr_value
+        # Unset slots and unknown attributes are None
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return None
+
+    def get_field(self, field):
+        """
+            Get field value, lazy loaded from DB
+            @param field as str
+            @return object/None
+        """
+        if self._values is not None and field in self._values:
+            return self._values[field]
+        if self.id is None or self.id < 0:
+            return None
+        # Load all fields at once, shared between objects
+        # Prefetched row may only contain some fields
+        row = self._row
+        if row is None or field not in row:
+            full_row = self.CACHE.get(self.id)
+            if full_row is None:
+                full_row = self.db.get_row(self.id)
+                if full_row is not None:
+                    self.CACHE.set(self.id, full_row)
+            if full_row is not None:
+                row = self._row = full_row
+        if row is not None and field in row:
+            value = row[field]
+            # Row is shared, do not let callers modify its lists
+            if isinstance(value, list):
+                return list(value)
+            return value
+        value = getattr(self.db, "get_" + field)(self.id)
+        self.set_field(field, value)
+        return value
+
+    def set_field(self, field, value):
+        """
+            Override field value
+            @param field as str
+            @param value as object
+        """
+        if self._values is None:
+            self._values = {}
+        self._values[field] = value
 
     def get_popularity(self):
         """
@@ -121,6 +273,7 @@ class Disc:
     """
         Represent an album disc
     """
+    __slots__ = ("db", "album", "number", "_track_ids")
 
     def __init__(self, album, disc_number):
         self.db = Lp().albums
@@ -166,6 +319,7 @@ class Disc:
         return [Track(id) for id in self.track_ids]
 
 
+@lazy_fields
 class Album(Base):
     """
         Represent an album
@@ -173,14 +327,19 @@ class Album(Base):
     FIELDS = ["name", "artists", "artist_ids",
               "year", "uri", "duration", "mtime", "synced", "loved"]
     DEFAULTS = ["", "", [], "", "", 0, 0, False, False]
+    CACHE = RowCache(1000)
+    __slots__ = ("genre_ids", "_track_ids", "_tracks", "_discs")
 
-    def __init__(self, album_id=None, genre_ids=[], artist_ids=[]):
+    def __init__(self, album_id=None, genre_ids=[], artist_ids=[],
+                 row=None):
         """
             Init album
             @param album_id as int
             @param genre_ids as [int]
+            @param artist_ids as [int]
+            @param row as {field as str: value} from AlbumsDatabase.get_many()
         """
-        Base.__init__(self, Lp().albums)
+        Base.__init__(self, Lp().albums, row)
         self.id = album_id
         self.genre_ids = genre_ids
         self._track_ids = None
@@ -308,6 +467,7 @@ class Album(Base):
         GLib.idle_add(Lp().scanner.emit, "album-updated", self.id, deleted)
 
 
+@lazy_fields
 class Track(Base):
     """
         Represent a track
@@ -316,16 +476,20 @@ class Track(Base):
               "artist_ids", "genre_ids", "album_name", "artists", "genres",
               "duration", "number", "year", "persistent", "mtime"]
     DEFAULTS = ["", None, [], [], [], "", "", "", 0.0, 0, None, 1, 0]
+    CACHE = RowCache(5000)
+    __slots__ = ("_uri", "_non_album_artists", "_album_artists",
+                 "artist_names")
 
-    def __init__(self, track_id=None):
+    def __init__(self, track_id=None, row=None):
         """
             Init track
             @param track_id as int
+            @param row as {field as str: value} from TracksDatabase.get_many()
         """
-        Base.__init__(self, Lp().tracks)
+        Base.__init__(self, Lp().tracks, row)
         self.id = track_id
         self._uri = None
-        self._non_album_artists = []
+        self._non_album_artists = None
 
     @property
     def is_web(self):
@@ -363,6 +527,7 @@ class Track(Base):
                     self.album.artist_ids[0] == Type.COMPILATIONS:
                 self._non_album_artists = self.artists
             else:
+                self._non_album_artists = []
                 lower_album_artists = map(lambda x: x.lower(),
                                           self.album_artists)
                 for artist in self.artists:
@@ -421,7 +586,7 @@ class Track(Base):
             Set duration
             @param duration as in
         """
-        self._duration = duration
+        self.set_field("duration", duration)
 
     def set_album_artists(self, artists):
         """
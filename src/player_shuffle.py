@@ -11,9 +11,8 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import random
-from threading import Thread
 
-from lollypop.define import Shuffle, NextContext, Lp, Type
+from lollypop.define import Shuffle, NextContext, Lp, Type, TaskPriority
 from lollypop.player_base import BasePlayer
 from lollypop.objects import Track, Album
 from lollypop.list import LinkedList
@@ -48,9 +47,8 @@ class ShufflePlayer(BasePlayer):
         # Tracks already played for albums
         self.__already_played_tracks = {}
         # If we have tracks/albums to ignore in party mode, add them
-        t = Thread(target=self.__init_party_blacklist)
-        t.daemon = True
-        t.start()
+        Lp().executor.submit(self.__init_party_blacklist,
+                             priority=TaskPriority.BACKGROUND)
         # Reset user playlist
         self._user_playlist = []
         self._user_playlist_ids = []
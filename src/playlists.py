@@ -137,6 +137,17 @@ class Playlists(GObject.GObject):
                         (uri,))
             sql.commit()
 
+    def remove_uris(self, uris):
+        """
+            Remove tracks from playlists
+            @param uris as [str]
+        """
+        with SqlCursor(self) as sql:
+            sql.executemany("DELETE FROM tracks\
+                             WHERE uri=?",
+                            [(uri,) for uri in uris])
+            sql.commit()
+
     def get(self):
         """
             Return availables playlists
@@ -465,8 +476,12 @@ class Playlists(GObject.GObject):
             Return a new sqlite cursor
         """
         try:
-            sql = sqlite3.connect(self._DB_PATH, 600.0)
+            sql = sqlite3.connect(
+                self._DB_PATH, 600.0,
+                cached_statements=SqlCursor.get_statements_cache())
+            SqlCursor.set_pragmas(sql)
             sql.execute('ATTACH DATABASE "%s" AS music' % Database.DB_PATH)
+            SqlCursor.set_pragmas(sql, "music")
             sql.create_collation("LOCALIZED", LocalizedCollation())
             return sql
         except:
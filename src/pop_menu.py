@@ -13,7 +13,6 @@
 from gi.repository import Gio, GLib, Gtk
 
 from gettext import gettext as _
-from threading import Thread
 from time import time
 
 from lollypop.widgets_rating import RatingWidget
@@ -291,9 +290,7 @@ class PlaylistsMenu(BaseMenu):
             if playlist_id in Lp().player.get_user_playlist_ids():
                 Lp().player.update_user_playlist(
                                      Lp().playlists.get_track_ids(playlist_id))
-        t = Thread(target=add, args=(playlist_id,))
-        t.daemon = True
-        t.start()
+        Lp().executor.submit(add, playlist_id)
 
     def __remove_from_playlist(self, action, variant, playlist_id):
         """
@@ -318,9 +315,7 @@ class PlaylistsMenu(BaseMenu):
             if playlist_id in Lp().player.get_user_playlist_ids():
                 Lp().player.update_user_playlist(
                                      Lp().playlists.get_track_ids(playlist_id))
-        t = Thread(target=remove, args=(playlist_id,))
-        t.daemon = True
-        t.start()
+        Lp().executor.submit(remove, playlist_id)
 
     def __add_to_loved(self, action, variant):
         """
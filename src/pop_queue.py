@@ -24,13 +24,15 @@ class QueueRow(Gtk.ListBoxRow):
         "track-moved": (GObject.SignalFlags.RUN_FIRST, None, (int, int, int))
     }
 
-    def __init__(self, track_id):
+    def __init__(self, track_id, row=None):
         """
             Init row widgets
             @param track_id as int
+            @param row as {field as str: value}/None
         """
         Gtk.ListBoxRow.__init__(self)
         self.__id = track_id
+        self.__row = row
         self.__number = 0
         self.set_margin_start(5)
         self.set_margin_end(5)
@@ -121,7 +123,7 @@ class QueueRow(Gtk.ListBoxRow):
         """
             Set artist, album and title label
         """
-        track = Track(self.__id)
+        track = Track(self.__id, self.__row)
         self.__artist_label.set_markup(
                                  "<b>" + GLib.markup_escape_text(
                                         ", ".join(track.album.artists))+"</b>")
@@ -281,7 +283,8 @@ class QueuePopover(Gtk.Popover):
         """
         if Lp().player.queue:
             self.__clear_button.set_sensitive(True)
-        self.__add_items(list(Lp().player.queue))
+        items = list(Lp().player.queue)
+        self.__add_items(items, Lp().tracks.get_many(items))
 
 #######################
 # PROTECTED           #
@@ -307,15 +310,18 @@ class QueuePopover(Gtk.Popover):
         if clear_queue:
             Lp().player.clear_queue()
 
-    def __add_items(self, items, prev_album_id=None):
+    def __add_items(self, items, rows, prev_album_id=None):
         """
             Add items to the view
             @param item ids as [int]
+            @param rows as {track id as int: {field as str: value}}
+            @param previous album id as int
         """
         if items and not self._stop:
             track_id = items.pop(0)
-            album_id = Lp().tracks.get_album_id(track_id)
-            row = self.__row_for_track_id(track_id)
+            track = Track(track_id, rows.get(track_id))
+            album_id = track.album_id
+            row = self.__row_for_track_id(track_id, rows.get(track_id))
             if album_id != prev_album_id:
                 surface = Lp().art.get_album_artwork(
                                         Album(album_id),
@@ -324,14 +330,15 @@ class QueuePopover(Gtk.Popover):
                 row.set_cover(surface)
                 row.show_header(True)
             self.__view.add(row)
-            GLib.idle_add(self.__add_items, items, album_id)
+            GLib.idle_add(self.__add_items, items, rows, album_id)
 
-    def __row_for_track_id(self, track_id):
+    def __row_for_track_id(self, track_id, track_row=None):
         """
             Get a row for track id
             @param track id as int
+            @param track row as {field as str: value}/None
         """
-        row = QueueRow(track_id)
+        row = QueueRow(track_id, track_row)
         row.set_labels()
         row.connect("destroy", self.__on_child_destroyed)
         row.connect("track-moved", self.__on_track_moved)
@@ -375,8 +382,10 @@ class QueuePopover(Gtk.Popover):
             Update row headers based on current queue
         """
         prev_album_id = None
-        for child in self.__view.get_children():
-            track = Track(child.id)
+        children = self.__view.get_children()
+        rows = Lp().tracks.get_many([child.id for child in children])
+        for child in children:
+            track = Track(child.id, rows.get(child.id))
             if track.album.id == prev_album_id:
                 child.set_cover(None)
                 child.show_header(False)
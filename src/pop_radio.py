@@ -12,8 +12,6 @@
 
 from gi.repository import Gtk, Gdk, GLib, Gio, GdkPixbuf
 
-from threading import Thread
-
 from gettext import gettext as _
 
 from lollypop.objects import Track
@@ -99,9 +97,7 @@ class RadioPopover(Gtk.Popover):
             Populate view
         """
         self._thread = True
-        t = Thread(target=self.__populate)
-        t.daemon = True
-        t.start()
+        Lp().executor.submit(self.__populate)
 
     def __populate(self):
         """
@@ -220,10 +220,8 @@ class SearchRow(Gtk.ListBoxRow):
         artists = []
         if self.__item.is_track:
             obj = Track(self.__item.id)
-            album_id = obj.album_id
         else:
             obj = Album(self.__item.id)
-            album_id = obj.id
 
         if self.__item.id is None:
             if self.__item.is_track:
@@ -236,12 +234,13 @@ class SearchRow(Gtk.ListBoxRow):
                                                 self.get_scale_factor())
         else:
             if self.__item.is_track:
-                self.__name.set_text("♫ " + Track(self.__item.id).name)
+                self.__name.set_text("♫ " + obj.name)
             else:
-                self.__name.set_text(Album(self.__item.id).name)
+                self.__name.set_text(obj.name)
             for artist_id in self.__item.artist_ids:
                 artists.append(Lp().artists.get_name(artist_id))
-            surface = Lp().art.get_album_artwork(Album(album_id),
+            album = obj.album if self.__item.is_track else obj
+            surface = Lp().art.get_album_artwork(album,
                                                  ArtSize.MEDIUM,
                                                  self.get_scale_factor())
         self.__cover.set_from_surface(surface)
@@ -366,9 +365,7 @@ class SearchPopover(Gtk.Popover):
             Create a new playlist based on search
             @param button as Gtk.Button
         """
-        t = Thread(target=self.__new_playlist)
-        t.daemon = True
-        t.start()
+        Lp().executor.submit(self.__new_playlist)
 
     def _on_search_changed(self, widget):
         """
@@ -487,9 +484,7 @@ class SearchPopover(Gtk.Popover):
             if len(item) >= 3:
                 search_items.append(item)
         GLib.idle_add(self.__clear, self.__view.get_children())
-        t = Thread(target=self.__lsearch.do, args=(search_items,))
-        t.daemon = True
-        t.start()
+        Lp().executor.submit(self.__lsearch.do, search_items)
 
     def __download_cover(self, uri, row):
         """
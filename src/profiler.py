@@ -0,0 +1,62 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from time import perf_counter
+
+
+class StartupProfiler:
+    """
+        Record startup phases and print a timeline
+    """
+
+    def __init__(self, enabled):
+        """
+            Init profiler, time origin is now
+            @param enabled as bool
+        """
+        self.__enabled = enabled
+        self.__start = perf_counter()
+        self.__last = self.__start
+        self.__phases = []
+
+    @property
+    def enabled(self):
+        """
+            True if profiling
+            @return bool
+        """
+        return self.__enabled
+
+    def mark(self, phase):
+        """
+            Mark end of phase
+            @param phase as str
+        """
+        if not self.__enabled:
+            return
+        now = perf_counter()
+        self.__phases.append((phase,
+                              (now - self.__start) * 1000,
+                              (now - self.__last) * 1000))
+        self.__last = now
+
+    def report(self):
+        """
+            Print timeline and stop profiling
+        """
+        if not self.__enabled:
+            return
+        print("Startup timeline (ms):")
+        print("%10s %10s  %s" % ("total", "phase", "name"))
+        for (phase, total, duration) in self.__phases:
+            print("%10.1f %10.1f  %s" % (total, duration, phase))
+        self.__enabled = False
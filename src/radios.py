@@ -284,7 +284,11 @@ class Radios(GObject.GObject):
             Return a new sqlite cursor
         """
         try:
-            return sqlite3.connect(self.DB_PATH, 600.0)
+            sql = sqlite3.connect(
+                self.DB_PATH, 600.0,
+                cached_statements=SqlCursor.get_statements_cache())
+            SqlCursor.set_pragmas(sql)
+            return sql
         except:
             exit(-1)
 
@@ -59,16 +59,23 @@ class LocalSearch(GObject.GObject):
             @return tracks as [SearchItem]
         """
         self.__stop = False
+        # Full text search: match all words, then any word,
+        # instead of searching each word
+        if Lp().db.has_search and len(search_items) > 1:
+            search_items = [(search_items[0], False),
+                            (" ".join(search_items[1:]), True)]
+        else:
+            search_items = [(item, False) for item in search_items]
         # Local search
         added_album_ids = []
         added_track_ids = []
-        for item in search_items:
+        for (item, any_word) in search_items:
             if self.__stop:
                 return
             albums = []
             tracks_non_album_artist = []
             # Get all albums for all artists and non album_artist tracks
-            for artist_id in Lp().artists.search(item):
+            for artist_id in Lp().artists.search(item, any_word):
                 if self.__stop:
                     return
                 for album_id in Lp().albums.get_ids([artist_id], []):
@@ -92,12 +99,13 @@ class LocalSearch(GObject.GObject):
                 self._items.append(search_item)
                 GLib.idle_add(self.emit, "item-found")
 
-            try:
-                year = int(item)
-                albums = Lp().albums.get_by_year(year)
-            except:
-                albums = []
-            albums += Lp().albums.search(item)
+            albums = []
+            for word in item.split() if any_word else [item]:
+                try:
+                    albums += Lp().albums.get_by_year(int(word))
+                except ValueError:
+                    pass
+            albums += Lp().albums.search(item, any_word=any_word)
             for album_id in albums:
                 if self.__stop:
                     return
@@ -113,7 +121,7 @@ class LocalSearch(GObject.GObject):
                 GLib.idle_add(self.emit, "item-found")
 
             for track_id, track_name in Lp().tracks.search(
-                                               item) + tracks_non_album_artist:
+                                     item, any_word) + tracks_non_album_artist:
                 if self.__stop:
                     return
                 if track_id in added_track_ids:
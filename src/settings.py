@@ -24,6 +24,7 @@ from threading import Thread
 from lollypop.define import Lp, SecretSchema, SecretAttributes, Type
 from lollypop.cache import InfoCache
 from lollypop.database import Database
+from lollypop.sqlcursor import SqlCursor
 from lollypop.touch_helper import TouchHelper
 from lollypop.database_history import History
 from lollypop.utils import get_network_available
@@ -784,7 +785,9 @@ class SettingsDialog:
             self.__progress.hide()
             Lp().player.stop()
             Lp().db.drop_db()
+            SqlCursor.reset_pool()
             Lp().db = Database()
+            Lp().snapshot.invalidate()
             Lp().window.show_genres(Lp().settings.get_value("show-genres"))
             Lp().window.update_db()
             self.__progress.get_toplevel().set_deletable(True)
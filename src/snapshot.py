@@ -0,0 +1,179 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+from pickle import loads, dump
+from mmap import mmap, ACCESS_READ
+from threading import Lock
+from os import rename, remove, path
+
+from lollypop.define import Lp, DataPath
+from lollypop.utils import debug
+
+
+class LibrarySnapshot:
+    """
+        On disk snapshot of library state needed by UI at startup
+        Values are keyed by tuples and loaded with a function on miss.
+        Snapshot is valid while library generation is unchanged
+    """
+    # Bump when stored values change format
+    VERSION = 2
+    # Album fields shown by albums view, only updated by a scan
+    # Others, like synced or loved, are loaded by Album on demand
+    ALBUM_FIELDS = ["name", "year", "artists", "artist_ids"]
+    # Returned by get() for a missing key without loader, None is a value
+    MISSING = object()
+
+    def __init__(self):
+        """
+            Init snapshot, load it from disk if valid
+        """
+        self.__path = DataPath + "/snapshot.bin"
+        self.__lock = Lock()
+        self.__values = {}
+        self.__loaders = {}
+        self.__generation = Lp().settings.get_value(
+                                           "library-generation").get_int32()
+        # True if values on disk do not match generation
+        self.__dirty = True
+        self.__load()
+
+    def get(self, key, load=None):
+        """
+            Get value for key, load it if missing
+            @param key as tuple
+            @param load as function/None
+            @return object, MISSING if missing and load is None
+            @thread safe
+        """
+        with self.__lock:
+            if load is not None:
+                self.__loaders[key] = load
+            if key in self.__values:
+                return self.__values[key]
+            generation = self.__generation
+        if load is None:
+            return self.MISSING
+        value = load()
+        with self.__lock:
+            # Library changed while loading, do not keep value
+            if generation == self.__generation:
+                self.__values[key] = value
+        return value
+
+    def get_album_rows(self, album_ids):
+        """
+            Get album rows restricted to fields only changed by a scan
+            @param album ids as [int]
+            @return {album id as int: {field as str: value}}
+        """
+        rows = {}
+        for album_id, row in Lp().albums.get_many(album_ids).items():
+            rows[album_id] = {field: row[field]
+                              for field in self.ALBUM_FIELDS}
+        return rows
+
+    def invalidate(self):
+        """
+            Forget values, library changed
+        """
+        with self.__lock:
+            self.__values = {}
+            self.__generation += 1
+            if self.__dirty:
+                return
+            self.__dirty = True
+            # Snapshot on disk is now outdated
+            self.__set_generation()
+
+    def save(self):
+        """
+            Reload values if needed and write snapshot to disk
+            @thread safe
+        """
+        with self.__lock:
+            if not self.__dirty:
+                return
+            loaders = list(self.__loaders.items())
+        for key, load in loaders:
+            self.get(key, load)
+        with self.__lock:
+            generation = self.__generation
+            values = dict(self.__values)
+        GLib.idle_add(self.__write, generation, values)
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_version(self):
+        """
+            Get snapshot version, changes with database version and
+            with collation used for sort keys
+            @return (int, int, str)
+        """
+        return (self.VERSION,
+                Lp().settings.get_value("db-version").get_int32(),
+                Lp().settings.get_value("sort-keys-locale").get_string())
+
+    def __set_generation(self):
+        """
+            Store current generation in settings
+            Call with lock held, settings must follow generation order
+        """
+        Lp().settings.set_value("library-generation",
+                                GLib.Variant("i", self.__generation))
+
+    def __write(self, generation, values):
+        """
+            Write values to disk if library did not change
+            @param generation as int
+            @param values as {tuple: object}
+        """
+        with self.__lock:
+            if generation != self.__generation:
+                return
+        try:
+            tmp_path = self.__path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                dump({"version": self.__get_version(),
+                      "generation": generation,
+                      "values": values}, f)
+            rename(tmp_path, self.__path)
+            with self.__lock:
+                # Library changed while writing, keep snapshot outdated
+                if generation == self.__generation:
+                    self.__dirty = False
+                self.__set_generation()
+            debug("LibrarySnapshot::__write(): %s values" % len(values))
+        except Exception as e:
+            print("LibrarySnapshot::__write():", e)
+
+    def __load(self):
+        """
+            Map snapshot file and load values if valid
+        """
+        if not path.exists(self.__path):
+            return
+        try:
+            with open(self.__path, "rb") as f:
+                with mmap(f.fileno(), 0, access=ACCESS_READ) as m:
+                    snapshot = loads(m)
+            if snapshot["version"] == self.__get_version() and\
+                    snapshot["generation"] == self.__generation:
+                self.__values = snapshot["values"]
+                self.__dirty = False
+            else:
+                remove(self.__path)
+        except Exception as e:
+            print("LibrarySnapshot::__load():", e)
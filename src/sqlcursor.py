@@ -11,15 +11,45 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from threading import current_thread
+from threading import current_thread, local
 
 from lollypop.define import Lp
 
 
+class SqlConnections(dict):
+    """
+        Persistent connections for a thread:
+        {class name as str: [connection, depth as int, generation as int]}
+        Connections are closed on thread exit
+    """
+    def __del__(self):
+        """
+            Release connections, may run outside owning thread
+            so let sqlite close them on deallocation
+        """
+        self.clear()
+
+    def close(self):
+        """
+            Close all connections
+        """
+        for (connection, depth, generation) in self.values():
+            try:
+                connection.close()
+            except Exception as e:
+                print("SqlConnections::close():", e)
+        self.clear()
+
+
 class SqlCursor:
     """
         Context manager to get the SQL cursor
     """
+    # Per thread connections pool
+    __pool = local()
+    # Increment to invalidate pooled connections
+    __generation = 0
+
     def add(obj):
         """
             Add cursor to thread list
@@ -36,28 +66,113 @@ class SqlCursor:
         name = current_thread().getName() + obj.__class__.__name__
         del Lp().cursors[name]
 
+    def get_statements_cache():
+        """
+            Get statements cache size for new connections
+            @return int
+        """
+        try:
+            value = Lp().settings.get_value("sql-statements-cache")
+            return max(0, value.get_int32())
+        except Exception as e:
+            print("SqlCursor::get_statements_cache():", e)
+            return 128
+
+    def set_pragmas(connection, schema="main"):
+        """
+            Enable WAL and tune connection from settings
+            @param connection as sqlite3.Connection
+            @param schema as str
+        """
+        try:
+            mmap_size = Lp().settings.get_value("sql-mmap-size").get_int32()
+            cache_size = Lp().settings.get_value("sql-cache-size").get_int32()
+            synchronous = Lp().settings.get_value(
+                                            "sql-synchronous").get_string()
+        except Exception as e:
+            print("SqlCursor::set_pragmas():", e)
+            (mmap_size, cache_size, synchronous) = (64, 8192, "normal")
+        if synchronous.upper() not in ["OFF", "NORMAL", "FULL", "EXTRA"]:
+            synchronous = "normal"
+        try:
+            connection.execute("PRAGMA %s.journal_mode=WAL" % schema)
+            connection.execute("PRAGMA %s.synchronous=%s" % (schema,
+                                                             synchronous))
+            connection.execute("PRAGMA %s.mmap_size=%d" %
+                               (schema, max(0, mmap_size) * 1024 * 1024))
+            # Negative value is in KiB
+            connection.execute("PRAGMA %s.cache_size=%d" %
+                               (schema, -max(0, cache_size)))
+        except Exception as e:
+            print("SqlCursor::set_pragmas():", e)
+
+    def get_inserted_ids(connection, count):
+        """
+            Get rowids of rows inserted by last executemany()
+            Tables have no AUTOINCREMENT and connection holds the write
+            lock, so rowids are consecutive
+            @param connection as sqlite3.Connection
+            @param count as int, inserted rows
+            @return [int]
+        """
+        if count == 0:
+            return []
+        result = connection.execute("SELECT last_insert_rowid()")
+        last = result.fetchone()[0]
+        return list(range(last - count + 1, last + 1))
+
+    def reset_pool():
+        """
+            Invalidate pooled connections (database file changed)
+        """
+        SqlCursor.__generation += 1
+
+    def close_pool():
+        """
+            Close pooled connections for current thread
+        """
+        connections = getattr(SqlCursor.__pool, "connections", None)
+        if connections is not None:
+            connections.close()
+
     def __init__(self, obj):
         """
             Init object
         """
         self._obj = obj
-        self._creator = False
+        self._pooled = None
 
     def __enter__(self):
         """
-            Return cursor for thread, create a new one if needed
+            Return cursor for thread, use thread pool if not registered
         """
         name = current_thread().getName() + self._obj.__class__.__name__
-        if name not in Lp().cursors:
-            self._creator = True
-            Lp().cursors[name] = self._obj.get_cursor()
-        return Lp().cursors[name]
+        if name in Lp().cursors:
+            return Lp().cursors[name]
+        connections = getattr(SqlCursor.__pool, "connections", None)
+        if connections is None:
+            connections = SqlConnections()
+            SqlCursor.__pool.connections = connections
+        key = self._obj.__class__.__name__
+        pooled = connections.get(key)
+        if pooled is not None and pooled[1] == 0 and\
+                pooled[2] != SqlCursor.__generation:
+            pooled[0].close()
+            pooled = None
+        if pooled is None:
+            pooled = [self._obj.get_cursor(), 0, SqlCursor.__generation]
+            connections[key] = pooled
+        pooled[1] += 1
+        self._pooled = pooled
+        return pooled[0]
 
     def __exit__(self, type, value, traceback):
         """
-            If creator, close cursor and remove it
+            If outermost, rollback uncommitted changes
+            like closing the connection would
         """
-        if self._creator:
-            name = current_thread().getName() + self._obj.__class__.__name__
-            Lp().cursors[name].close()
-            del Lp().cursors[name]
+        if self._pooled is not None:
+            self._pooled[1] -= 1
+            if self._pooled[1] == 0 and self._pooled[0].in_transaction:
+                self._pooled[0].rollback()
+            self._pooled = None
@@ -60,6 +60,15 @@ class TagReader(Discoverer):
             Init tag reader
         """
         Discoverer.__init__(self)
+        self.reset_ids_cache()
+
+    def reset_ids_cache(self):
+        """
+            Reset artist/genre/album ids cache used by add_*()
+        """
+        self._artist_ids = {}
+        self._genre_ids = {}
+        self._album_ids = {}
 
     def get_title(self, tags, filepath):
         """
@@ -378,6 +387,30 @@ class TagReader(Discoverer):
             lyrics = get_ogg()
         return lyrics
 
+    def get_artwork_data(self, tags):
+        """
+            Return embedded artwork for tags
+            @param tags as Gst.TagList
+            @return bytes/None
+        """
+        if tags is None:
+            return None
+        data = None
+        try:
+            (exists, sample) = tags.get_sample_index("image", 0)
+            # Some file store it in a preview-image tag
+            if not exists:
+                (exists, sample) = tags.get_sample_index("preview-image", 0)
+            if exists:
+                buf = sample.get_buffer()
+                (exists, mapflags) = buf.map(Gst.MapFlags.READ)
+                if exists:
+                    data = bytes(mapflags.data)
+                    buf.unmap(mapflags)
+        except Exception as e:
+            print("TagReader::get_artwork_data():", e)
+        return data
+
     def add_artists(self, artists, album_artists, sortnames):
         """
             Add artists to db
@@ -395,7 +428,7 @@ class TagReader(Discoverer):
             artist = artist.strip()
             if artist != "":
                 # Get artist id, add it if missing
-                artist_id = Lp().artists.get_id(artist)
+                artist_id = self.__get_artist_id(artist)
                 if i >= sortlen or sortsplit[i] == "":
                     sortname = None
                 else:
@@ -404,6 +437,7 @@ class TagReader(Discoverer):
                     if sortname is None:
                         sortname = format_artist_name(artist)
                     artist_id = Lp().artists.add(artist, sortname)
+                    self._artist_ids[artist] = artist_id
                 elif sortname is not None:
                     Lp().artists.set_sortname(artist_id, sortname)
                 i += 1
@@ -426,7 +460,7 @@ class TagReader(Discoverer):
             artist = artist.strip()
             if artist != "":
                 # Get album artist id, add it if missing
-                artist_id = Lp().artists.get_id(artist)
+                artist_id = self.__get_artist_id(artist)
                 if i >= sortlen or sortsplit[i] == "":
                     sortname = None
                 else:
@@ -435,6 +469,7 @@ class TagReader(Discoverer):
                     if sortname is None:
                         sortname = format_artist_name(artist)
                     artist_id = Lp().artists.add(artist, sortname)
+                    self._artist_ids[artist] = artist_id
                 elif sortname is not None:
                     Lp().artists.set_sortname(artist_id, sortname)
                 i += 1
@@ -454,9 +489,12 @@ class TagReader(Discoverer):
             genre = genre.strip()
             if genre != "":
                 # Get genre id, add genre if missing
-                genre_id = Lp().genres.get_id(genre)
+                genre_id = self._genre_ids.get(genre)
+                if genre_id is None:
+                    genre_id = Lp().genres.get_id(genre)
                 if genre_id is None:
                     genre_id = Lp().genres.add(genre)
+                self._genre_ids[genre] = genre_id
                 genre_ids.append(genre_id)
         return genre_ids
 
@@ -482,17 +520,150 @@ class TagReader(Discoverer):
         else:
             parent_uri = ""
         new = False
-        album_id = Lp().albums.get_id(album_name, artist_ids, remote)
+        key = (album_name, tuple(artist_ids), remote)
+        (album_id, album_uri) = self._album_ids.get(key, (None, None))
+        if album_id is None:
+            album_id = Lp().albums.get_id(album_name, artist_ids, remote)
+            if album_id is not None:
+                album_uri = Lp().albums.get_uri(album_id)
         if album_id is None:
             new = True
             album_id = Lp().albums.add(album_name, artist_ids, parent_uri,
                                        loved, popularity, rate)
+            album_uri = parent_uri
         # Now we have our album id, check if path doesn"t change
-        if Lp().albums.get_uri(album_id) != parent_uri:
+        if album_uri != parent_uri:
             Lp().albums.set_uri(album_id, parent_uri)
-
+        self._album_ids[key] = (album_id, parent_uri)
         return (album_id, new)
 
+    def get_artists_sortnames(self, artists, sortnames):
+        """
+            Split artists and sortnames tags
+            @param artists as string
+            @param sortnames as string
+            @return [(artist as str, sortname as str/None)]
+        """
+        items = []
+        sortsplit = sortnames.split(";")
+        sortlen = len(sortsplit)
+        for artist in artists.split(";"):
+            artist = artist.strip()
+            if artist != "":
+                i = len(items)
+                if i >= sortlen or sortsplit[i] == "":
+                    sortname = None
+                else:
+                    sortname = sortsplit[i].strip()
+                items.append((artist, sortname))
+        return items
+
+    def add_artists_many(self, artists):
+        """
+            Add artists to db, one request for all missing artists
+            @param artists as [(artist as str, sortname as str/None)]
+            @return {artist as str: artist id as int}
+            @commit needed
+        """
+        sortnames = {}
+        missing = []
+        for (artist, sortname) in artists:
+            if sortname is not None:
+                sortnames[artist] = sortname
+            if artist not in self._artist_ids and artist not in missing:
+                missing.append(artist)
+        if missing:
+            self._artist_ids.update(Lp().artists.get_ids_by_names(missing))
+            new = [artist for artist in missing
+                   if artist not in self._artist_ids]
+            if new:
+                Lp().artists.add_many(
+                    [(artist, sortnames.get(artist,
+                                            format_artist_name(artist)))
+                     for artist in new])
+                self._artist_ids.update(Lp().artists.get_ids_by_names(new))
+        artist_ids = {}
+        for (artist, sortname) in artists:
+            artist_ids[artist] = self._artist_ids[artist]
+        if sortnames:
+            Lp().artists.set_sortnames(
+                dict([(artist_ids[artist], sortname)
+                      for (artist, sortname) in sortnames.items()]))
+        return artist_ids
+
+    def add_genres_many(self, genres):
+        """
+            Add genres to db, one request for all missing genres
+            @param genres as [str]
+            @return {genre as str: genre id as int}
+            @commit needed
+        """
+        missing = []
+        for genre in genres:
+            if genre not in self._genre_ids and genre not in missing:
+                missing.append(genre)
+        if missing:
+            self._genre_ids.update(Lp().genres.get_ids_by_names(missing))
+            new = [genre for genre in missing if genre not in self._genre_ids]
+            if new:
+                Lp().genres.add_many(new)
+                self._genre_ids.update(Lp().genres.get_ids_by_names(new))
+        return dict([(genre, self._genre_ids[genre]) for genre in genres])
+
+    def add_albums_many(self, albums):
+        """
+            Add local albums to db, one request for all new albums
+            Album uri is set from last track
+            @param albums as [(album name as str, album artist ids as [int],
+                               uri to an album track as str, loved as bool,
+                               popularity as int, rate as int)]
+            @return album ids as [int], one per item
+            @commit needed
+        """
+        keys = []
+        parent_uris = {}
+        # New albums: {NOCASE key: [name, artist ids, uri, loved,
+        #                           popularity, rate]}
+        new = {}
+        new_keys = {}
+        for (album_name, artist_ids, uri, loved, popularity, rate) in albums:
+            d = Lio.File.new_for_uri(uri).get_parent()
+            parent_uri = d.get_uri() if d is not None else ""
+            key = (album_name, tuple(artist_ids), False)
+            keys.append(key)
+            parent_uris[key] = parent_uri
+            if key in self._album_ids or key in new_keys:
+                continue
+            album_id = Lp().albums.get_id(album_name, artist_ids, False)
+            if album_id is not None:
+                self._album_ids[key] = (album_id,
+                                        Lp().albums.get_uri(album_id))
+                continue
+            # Same album as a new one, get_id() would find it
+            if artist_ids:
+                new_key = (self.__nocase(album_name), tuple(artist_ids))
+            else:
+                new_key = (album_name, ())
+            new_keys[key] = new_key
+            if new_key not in new:
+                new[new_key] = [album_name, artist_ids, parent_uri,
+                                loved, popularity, rate]
+        # Last track uri wins, as with add_album()
+        for (key, new_key) in new_keys.items():
+            new[new_key][2] = parent_uris[key]
+        new_keys_list = list(new.keys())
+        album_ids = Lp().albums.add_many([tuple(new[new_key])
+                                          for new_key in new_keys_list])
+        new_ids = dict(zip(new_keys_list, album_ids))
+        for (key, new_key) in new_keys.items():
+            self._album_ids[key] = (new_ids[new_key], new[new_key][2])
+        for (key, parent_uri) in parent_uris.items():
+            (album_id, album_uri) = self._album_ids[key]
+            if album_uri != parent_uri:
+                Lp().albums.set_uri(album_id, parent_uri)
+                self._album_ids[key] = (album_id, parent_uri)
+        return [self._album_ids[key][0] for key in keys]
+
     def update_album(self, album_id, artist_ids, genre_ids, mtime, year):
         """
             Set album artists
@@ -531,3 +702,27 @@ class TagReader(Discoverer):
             Lp().tracks.add_artist(track_id, artist_id)
         for genre_id in genre_ids:
             Lp().tracks.add_genre(track_id, genre_id, mtime)
+
+#######################
+# PRIVATE             #
+#######################
+    def __nocase(self, string):
+        """
+            Fold string as SQLite NOCASE collation, ASCII only
+            @param string as str
+            @return str
+        """
+        return "".join([c.lower() if "A" <= c <= "Z" else c for c in string])
+
+    def __get_artist_id(self, artist):
+        """
+            Get artist id, use cache if available
+            @param artist as str
+            @return artist id as int/None
+        """
+        artist_id = self._artist_ids.get(artist)
+        if artist_id is None:
+            artist_id = Lp().artists.get_id(artist)
+            if artist_id is not None:
+                self._artist_ids[artist] = artist_id
+        return artist_id
@@ -14,6 +14,7 @@ from gi.repository import Gio, GLib
 
 from gettext import gettext as _
 from threading import Thread
+from locale import strxfrm
 import unicodedata
 
 from lollypop.define import Lp, Type, ENCODING
@@ -53,6 +54,19 @@ def noaccents(string):
         return u"".join([c for c in nfkd_form if not unicodedata.combining(c)])
 
 
+def get_sort_key(string):
+    """
+        Return a key sorting like LOCALIZED collation with a binary compare
+        @param string as str
+        @return bytes
+    """
+    try:
+        return b"".join([ord(c).to_bytes(4, "big") for c in strxfrm(string)])
+    except Exception as e:
+        print("get_sort_key():", e)
+        return string.encode("utf-8")
+
+
 def escape(str, ignore=["_", "-", " ", "."]):
     """
         Escape string
@@ -87,10 +101,11 @@ def is_gnome():
     return GLib.getenv("XDG_CURRENT_DESKTOP") == "GNOME"
 
 
-def is_audio(f):
+def is_audio(f, info=None):
     """
         Return True if files is audio
         @param f as Gio.File
+        @param info as Gio.FileInfo with standard::content-type
     """
     audio = ["application/ogg", "application/x-ogg", "application/x-ogm-audio",
              "audio/aac", "audio/mp4", "audio/mpeg", "audio/mpegurl",
@@ -106,8 +121,9 @@ def is_audio(f):
              "audio/x-pn-windows-acm", "application/x-matroska",
              "audio/x-matroska", "video/mp4"]
     try:
-        info = f.query_info("standard::content-type",
-                            Gio.FileQueryInfoFlags.NONE)
+        if info is None:
+            info = f.query_info("standard::content-type",
+                                Gio.FileQueryInfoFlags.NONE)
         if info is not None:
             content_type = info.get_content_type()
             if content_type in audio:
@@ -117,14 +133,16 @@ def is_audio(f):
     return False
 
 
-def is_pls(f):
+def is_pls(f, info=None):
     """
         Return True if files is a playlist
         @param f as Gio.File
+        @param info as Gio.FileInfo with standard::content-type
     """
     try:
-        info = f.query_info("standard::content-type",
-                            Gio.FileQueryInfoFlags.NONE)
+        if info is None:
+            info = f.query_info("standard::content-type",
+                                Gio.FileQueryInfoFlags.NONE)
         if info is not None:
             if info.get_content_type() in ["audio/x-mpegurl",
                                            "application/xspf+xml"]:
@@ -202,6 +220,28 @@ def remove_static_genres(genre_ids):
     return [item for item in genre_ids if item >= 0 or item == Type.CHARTS]
 
 
+def cache_hit(name, filepath=None):
+    """
+        Count a cache hit if application tracks caches usage
+        Search provider does not, artwork must load anyway
+        @param name as str
+        @param filepath as str/None
+    """
+    caches = getattr(Lp(), "caches", None)
+    if caches is not None:
+        caches.hit(name, filepath)
+
+
+def cache_miss(name):
+    """
+        Count a cache miss if application tracks caches usage
+        @param name as str
+    """
+    caches = getattr(Lp(), "caches", None)
+    if caches is not None:
+        caches.miss(name)
+
+
 def set_loved(track_id, loved):
     """
         Add or remove track from loved playlist
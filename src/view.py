@@ -310,10 +310,11 @@ class LazyLoadingView(View):
             Update scroll value and check for lazy queue
             @param adj as Gtk.Adjustment
         """
-        if not self._lazy_queue:
-            return False
         scroll_value = adj.get_value()
         self.__prev_scroll_value = scroll_value
+        GLib.idle_add(self.__update_covers, scroll_value)
+        if not self._lazy_queue:
+            return False
         GLib.idle_add(self.__lazy_or_not, scroll_value)
 
 #######################
@@ -357,6 +358,18 @@ class LazyLoadingView(View):
         except:
             return True
 
+    def __update_covers(self, scroll_value):
+        """
+            Cancel cover loading for widgets scrolled out of screen,
+            restart it for widgets back on screen
+            @param scroll value as float
+        """
+        if self._stop or self.__prev_scroll_value != scroll_value:
+            return
+        for child in self._get_children():
+            if child.cover_waiting:
+                child.set_cover_on_screen(self.__is_visible(child))
+
     def __lazy_or_not(self, scroll_value):
         """
             Add visible widgets to lazy queue
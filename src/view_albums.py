@@ -18,7 +18,7 @@ from lollypop.view import LazyLoadingView
 from lollypop.widgets_album_simple import AlbumSimpleWidget
 from lollypop.pop_album import AlbumPopover
 from lollypop.view_artist_albums import ArtistAlbumsView
-from lollypop.define import ArtSize
+from lollypop.define import ArtSize, Lp
 
 
 class AlbumsView(LazyLoadingView):
@@ -55,12 +55,16 @@ class AlbumsView(LazyLoadingView):
 
         self.add(self._scrolled)
 
-    def populate(self, albums):
+    def populate(self, albums, rows=None):
         """
             Populate albums
-            @param is compilation as bool
+            @param albums as [int]
+            @param rows as {album id as int: {field as str: value}}/None
         """
-        GLib.idle_add(self.__add_albums, albums)
+        # Load all rows at once instead of one request per album
+        if rows is None:
+            rows = Lp().albums.get_many(albums)
+        GLib.idle_add(self.__add_albums, albums, rows)
 
 #######################
 # PROTECTED           #
@@ -78,24 +82,27 @@ class AlbumsView(LazyLoadingView):
 #######################
 # PRIVATE             #
 #######################
-    def __add_albums(self, albums):
+    def __add_albums(self, albums, rows):
         """
             Add albums to the view
             Start lazy loading
             @param [album ids as int]
+            @param rows as {album id as int: {field as str: value}}
         """
         if self._stop:
             self._stop = False
             return
         if albums:
-            widget = AlbumSimpleWidget(albums.pop(0),
+            album_id = albums.pop(0)
+            widget = AlbumSimpleWidget(album_id,
                                        self.__genre_ids,
-                                       self.__artist_ids)
+                                       self.__artist_ids,
+                                       rows.get(album_id))
             widget.connect("overlayed", self._on_overlayed)
             self._box.insert(widget, -1)
             widget.show()
             self._lazy_queue.append(widget)
-            GLib.idle_add(self.__add_albums, albums)
+            GLib.idle_add(self.__add_albums, albums, rows)
         else:
             GLib.idle_add(self.lazy_loading)
             if self._viewport.get_child() is None:
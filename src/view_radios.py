@@ -12,8 +12,6 @@
 
 from gi.repository import Gtk, GLib
 
-from threading import Thread
-
 from lollypop.view import LazyLoadingView
 from lollypop.widgets_radio import RadioWidget
 from lollypop.radios import Radios
@@ -78,9 +76,7 @@ class RadiosView(LazyLoadingView):
         if Lp().player.current_track.id == Type.RADIOS:
             Lp().player.set_next()  # We force next update
             Lp().player.set_prev()  # We force prev update
-        t = Thread(target=self.__populate)
-        t.daemon = True
-        t.start()
+        Lp().executor.submit(self.__populate)
 
 #######################
 # PROTECTED           #
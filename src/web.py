@@ -215,6 +215,7 @@ class Web(GObject.Object):
             t.update_track(track_id, artist_ids, genre_ids, item.mtime)
             t.update_album(album_id, album_artist_ids,
                            genre_ids, item.mtime, None)
+            Lp().db.update_search([track_id], [album_id])
             sql.commit()
 
         if persistent != DbPersistent.CHARTS:
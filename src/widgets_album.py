@@ -63,6 +63,21 @@ class BaseWidget:
         """
         self._loading = Loading.STOP
 
+    @property
+    def cover_waiting(self):
+        """
+            True if cover is loading or loading was cancelled
+            @return bool
+        """
+        return False
+
+    def set_cover_on_screen(self, on_screen):
+        """
+            Update cover loading for widget visibility
+            @param on_screen as bool
+        """
+        pass
+
     def set_filtered(self, b):
         """
             Set widget filtered
@@ -313,14 +328,21 @@ class AlbumWidget(BaseWidget):
         Album widget
     """
 
-    def __init__(self, album_id, genre_ids, artist_ids, art_size):
+    def __init__(self, album_id, genre_ids, artist_ids, art_size, row=None):
         """
             Init Album widget
+            @param album id as int
+            @param genre ids as [int]
+            @param artist_ids as [int]
+            @param art size as int
+            @param row as {field as str: value}/None
         """
         BaseWidget.__init__(self)
-        self._album = Album(album_id, genre_ids)
+        self._album = Album(album_id, genre_ids, row=row)
         self._filter_ids = artist_ids
         self._art_size = art_size
+        self.__cover_request = None
+        self.__cover_cancelled = False
         self.connect("destroy", self.__on_destroy)
         self._scan_signal = Lp().scanner.connect("album-updated",
                                                  self._on_album_updated)
@@ -353,39 +375,49 @@ class AlbumWidget(BaseWidget):
         """
         return self._cover
 
+    @property
+    def cover_waiting(self):
+        """
+            True if cover is loading or loading was cancelled
+            @return bool
+        """
+        return self.__cover_request is not None or self.__cover_cancelled
+
     def set_cover(self):
         """
             Set cover for album if state changed
         """
         if self._cover is None:
             return
-        surface = Lp().art.get_album_artwork(
+        if self.__cover_request is not None:
+            Lp().art.cancel_album_artwork(self.__cover_request)
+        self.__cover_cancelled = False
+        # None if cover was in memory
+        self.__cover_request = Lp().art.load_album_artwork(
                             self._album,
                             self._art_size,
-                            self._cover.get_scale_factor())
-        self._cover.set_from_surface(surface)
-        if surface.get_height() > surface.get_width():
-            self._overlay_orientation = Gtk.Orientation.VERTICAL
-        else:
-            self._overlay_orientation = Gtk.Orientation.HORIZONTAL
-        del surface
+                            self._cover.get_scale_factor(),
+                            self.__on_cover_loaded)
 
     def update_cover(self):
         """
             Update cover for album id id needed
         """
-        if self._cover is None:
-            return
-        surface = Lp().art.get_album_artwork(
-                            self._album,
-                            self._art_size,
-                            self._cover.get_scale_factor())
-        self._cover.set_from_surface(surface)
-        if surface.get_height() > surface.get_width():
-            self._overlay_orientation = Gtk.Orientation.VERTICAL
-        else:
-            self._overlay_orientation = Gtk.Orientation.HORIZONTAL
-        del surface
+        self.set_cover()
+
+    def set_cover_on_screen(self, on_screen):
+        """
+            Cancel cover loading if widget is not on screen anymore,
+            restart it when back on screen
+            @param on_screen as bool
+        """
+        if on_screen:
+            if self.__cover_cancelled:
+                self.set_cover()
+        elif self.__cover_request is not None:
+            Lp().art.cancel_album_artwork(self.__cover_request)
+            self.__cover_request = None
+            self.__cover_cancelled = True
 
     def update_state(self):
         """
@@ -416,5 +448,22 @@ class AlbumWidget(BaseWidget):
             Disconnect signal
             @param widget as Gtk.Widget
         """
+        if self.__cover_request is not None:
+            Lp().art.cancel_album_artwork(self.__cover_request)
+            self.__cover_request = None
         if self._scan_signal is not None:
             Lp().scanner.disconnect(self._scan_signal)
+
+    def __on_cover_loaded(self, surface):
+        """
+            Set cover surface
+            @param surface as cairo surface
+        """
+        self.__cover_request = None
+        if self._cover is None:
+            return
+        self._cover.set_from_surface(surface)
+        if surface.get_height() > surface.get_width():
+            self._overlay_orientation = Gtk.Orientation.VERTICAL
+        else:
+            self._overlay_orientation = Gtk.Orientation.HORIZONTAL
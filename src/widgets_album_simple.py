@@ -28,19 +28,20 @@ class AlbumSimpleWidget(Gtk.FlowBoxChild, AlbumWidget):
         "overlayed": (GObject.SignalFlags.RUN_FIRST, None, (bool,))
     }
 
-    def __init__(self, album_id, genre_ids, artist_ids):
+    def __init__(self, album_id, genre_ids, artist_ids, row=None):
         """
             Init simple album widget
             @param album id as int
             @param genre ids as [int]
             @param artist_ids as [int]
+            @param row as {field as str: value}/None
         """
         # We do not use Gtk.Builder for speed reasons
         Gtk.FlowBoxChild.__init__(self)
         self.set_size_request(ArtSize.BIG, ArtSize.BIG)
         self.get_style_context().add_class("loading")
         AlbumWidget.__init__(self, album_id, genre_ids,
-                             artist_ids, ArtSize.BIG)
+                             artist_ids, ArtSize.BIG, row)
 
     def populate(self):
         """
@@ -143,7 +143,8 @@ class PlaylistsWidget(Gtk.Grid):
         GLib.idle_add(self.__add_tracks,
                       tracks,
                       self.__tracks_widget_left,
-                      pos)
+                      pos,
+                      Lp().tracks.get_many(tracks))
 
     def populate_list_right(self, tracks, pos):
         """
@@ -163,7 +164,8 @@ class PlaylistsWidget(Gtk.Grid):
             GLib.idle_add(self.__add_tracks,
                           tracks,
                           self.__tracks_widget_right,
-                          pos)
+                          pos,
+                          Lp().tracks.get_many(tracks))
 
     def update_playing_indicator(self):
         """
@@ -233,13 +235,14 @@ class PlaylistsWidget(Gtk.Grid):
 #######################
 # PRIVATE             #
 #######################
-    def __add_tracks(self, tracks, widget, pos, previous_album_id=None):
+    def __add_tracks(self, tracks, widget, pos, rows={},
+                     previous_album_id=None):
         """
             Add tracks to list
             @param tracks id as array of [int]
             @param widget TracksWidget
-            @param track position as int
             @param pos as int
+            @param rows as {track id as int: {field as str: value}}
             @param previous album id as int
         """
         if self.__loading == Loading.STOP:
@@ -255,14 +258,16 @@ class PlaylistsWidget(Gtk.Grid):
             self.__locked_widget_right = False
             return
 
-        track = Track(tracks.pop(0))
+        track_id = tracks.pop(0)
+        track = Track(track_id, rows.get(track_id))
         row = PlaylistRow(track.id, pos,
-                          track.album.id != previous_album_id)
+                          track.album_id != previous_album_id,
+                          rows.get(track_id))
         row.connect("track-moved", self.__on_track_moved)
         row.show()
         widget.insert(row, pos)
         GLib.idle_add(self.__add_tracks, tracks, widget,
-                      pos + 1, track.album.id)
+                      pos + 1, rows, track.album_id)
 
     def __update_tracks(self):
         """
@@ -440,9 +445,7 @@ class PlaylistsWidget(Gtk.Grid):
         self.__update_headers()
         self.__tracks_widget_left.update_indexes(1)
         self.__tracks_widget_right.update_indexes(len(self.__tracks_left) + 1)
-        t = Thread(target=update_playlist)
-        t.daemon = True
-        t.start()
+        Lp().executor.submit(update_playlist)
 
     def __on_size_allocate(self, widget, allocation):
         """
@@ -753,9 +756,7 @@ class PlaylistsManagerWidget(Gtk.Bin):
                 Lp().playlists.add_tracks(playlist_id, tracks)
             else:
                 Lp().playlists.remove_tracks(playlist_id, tracks)
-        t = Thread(target=set, args=(playlist_id, add))
-        t.daemon = True
-        t.start()
+        Lp().executor.submit(set, playlist_id, add)
 
     def __on_playlist_edited(self, widget, path, name):
         """
@@ -863,9 +864,7 @@ class PlaylistEditWidget(Gtk.Bin):
             populate view if needed
         """
         if len(self.__model) == 0:
-            t = Thread(target=self.__append_tracks)
-            t.daemon = True
-            t.start()
+            Lp().executor.submit(self.__append_tracks)
 
 #######################
 # PROTECTED           #
@@ -962,15 +961,18 @@ class PlaylistEditWidget(Gtk.Bin):
             Append tracks
         """
         track_ids = Lp().playlists.get_track_ids(self.__playlist_id)
-        GLib.idle_add(self.__append_track, track_ids)
+        rows = Lp().tracks.get_many(track_ids)
+        GLib.idle_add(self.__append_track, track_ids, rows)
 
-    def __append_track(self, track_ids):
+    def __append_track(self, track_ids, rows):
         """
             Append track while tracks not empty
             @param track_ids as [track_id as int]
+            @param rows as {track id as int: {field as str: value}}
         """
         if track_ids:
-            track = Track(track_ids.pop(0))
+            track_id = track_ids.pop(0)
+            track = Track(track_id, rows.get(track_id))
             if track.album.artist_ids[0] == Type.COMPILATIONS:
                 artists = ", ".join(track.artists)
             else:
@@ -980,6 +982,6 @@ class PlaylistEditWidget(Gtk.Bin):
                                    GLib.markup_escape_text(artists),
                                    GLib.markup_escape_text(track.name)),
                                  "user-trash-symbolic", track.id])
-            GLib.idle_add(self.__append_track, track_ids)
+            GLib.idle_add(self.__append_track, track_ids, rows)
         else:
             self.__in_thread = False
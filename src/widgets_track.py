@@ -25,17 +25,17 @@ class Row(Gtk.ListBoxRow):
     """
         A row
     """
-    def __init__(self, rowid, num):
+    def __init__(self, rowid, num, row=None):
         """
             Init row widgets
             @param rowid as int
             @param num as int
-            @param show loved as bool
+            @param row as {field as str: value}/None
         """
         # We do not use Gtk.Builder for speed reasons
         Gtk.ListBoxRow.__init__(self)
         self._artists_label = None
-        self._track = Track(rowid)
+        self._track = Track(rowid, row)
         self.__number = num
         self.__preview_timeout_id = None
         self.__context_timeout_id = None
@@ -344,14 +344,15 @@ class PlaylistRow(Row):
         "track-moved": (GObject.SignalFlags.RUN_FIRST, None, (int, int, bool))
     }
 
-    def __init__(self, rowid, num, show_headers):
+    def __init__(self, rowid, num, show_headers, row=None):
         """
             Init row widget
             @param rowid as int
             @param num as int
             @param show headers as bool
+            @param row as {field as str: value}/None
         """
-        Row.__init__(self, rowid, num)
+        Row.__init__(self, rowid, num, row)
         self.__parent_filter = False
         self.__show_headers = show_headers
         self._indicator.set_margin_start(5)
@@ -0,0 +1,321 @@
+#!/usr/bin/python3
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Report files/s to add the same generated library to an empty
+    database, artists, genres, albums and tracks added per row as
+    TagReader.add_*() against per batch as CollectionScanner.__add_batch()
+
+    Tags are not read, both modes commit every scan-batch-size files
+
+    ./tools/bench_batch.py --files 20000
+"""
+
+from argparse import ArgumentParser
+from random import Random
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import os
+
+from benchlib import connect, get_queries, get_constants
+from benchlib import get_default, noaccents
+
+TYPE = get_constants("define", "Type")
+# {(module, class, method): [str]}, src/ is parsed once per method
+QUERIES = {}
+
+
+def get_sql(module, cls, method):
+    """
+        Get SQL strings executed by method, see benchlib.get_queries()
+        @param module as str
+        @param cls as str
+        @param method as str
+        @return [str]
+    """
+    key = (module, cls, method)
+    if key not in QUERIES:
+        QUERIES[key] = get_queries(module, cls, method)
+    return QUERIES[key]
+
+
+def get_records(count, seed=0):
+    """
+        Generate scanner records, 10 tracks per album
+        @param count as int
+        @param seed as int
+        @return [(uri as str, artists as [(str, str/None)], album name as str,
+                  album artists as [(str, str/None)], genres as [str])]
+    """
+    random = Random(seed)
+    artists = ["Artist %d" % i for i in range(max(1, count // 50))]
+    genres = ["Genre %d" % i for i in range(20)]
+    records = []
+    for i in range(count):
+        album = i // 10
+        album_artist = artists[album % len(artists)]
+        # One artist in three has a sortname tag
+        sortname = "%s, The" % album_artist\
+            if album % 3 == 0 else None
+        track_artists = [(album_artist, sortname)]
+        if random.random() < 0.2:
+            track_artists.append((random.choice(artists), None))
+        records.append(("file:///music/%d/%d.ogg" % (album, i % 10),
+                        track_artists, "Album %d" % album,
+                        [(album_artist, sortname)],
+                        [genres[album % len(genres)]]))
+    return records
+
+
+def get_album_query(artist_ids):
+    """
+        Get AlbumsDatabase.get_id() query for local albums
+        @param artist_ids as [int]
+        @return str
+    """
+    (request, compilation) = get_sql("database_albums",
+                                     "AlbumsDatabase", "get_id")
+    if artist_ids:
+        request += "OR artist_id=? " * len(artist_ids) + ")"
+    else:
+        request = compilation
+    return request + " AND synced!=%s" % TYPE["NONE"]
+
+
+def get_track(uri, album_id):
+    """
+        Get TracksDatabase.add() values
+        @param uri as str
+        @param album_id as int
+        @return tuple
+    """
+    name = uri.split("/")[-1]
+    return (name, uri, 180, 1, 1, "", album_id, 2000, 0, 0, 0, 0,
+            noaccents(name), name.encode("utf-8"), "")
+
+
+def add_album(sql, cache, name, artist_ids, uri):
+    """
+        Get album id, add it if missing, as TagReader.add_album()
+        @param sql as sqlite3.Connection
+        @param cache as {key as tuple: album id as int}
+        @param name as str
+        @param artist_ids as [int]
+        @param uri as str
+        @return album id as int
+    """
+    key = (name, tuple(artist_ids))
+    if key not in cache:
+        v = sql.execute(get_album_query(artist_ids),
+                        (name,) + tuple(artist_ids)).fetchone()
+        if v is None:
+            (album, album_artists) = get_sql("database_albums",
+                                             "AlbumsDatabase", "add")
+            album_id = sql.execute(album, (name, artist_ids == [], uri,
+                                           0, 0, 0, 0, noaccents(name),
+                                           name.encode("utf-8"))).lastrowid
+            for artist_id in artist_ids:
+                sql.execute(album_artists, (album_id, artist_id))
+            v = (album_id,)
+        cache[key] = v[0]
+    return cache[key]
+
+
+def get_names(sql, request, placeholder, names):
+    """
+        Run get_ids_by_names() request
+        @param sql as sqlite3.Connection
+        @param request as str
+        @param placeholder as str
+        @param names as [str]
+        @return [(name as str, id as int)]
+    """
+    if not names:
+        return []
+    return sql.execute(request % ",".join([placeholder] * len(names)),
+                       names).fetchall()
+
+
+def per_row(sql, records, caches):
+    """
+        Add records one by one
+        @param sql as sqlite3.Connection
+        @param records as [tuple]
+        @param caches as ({str: int}, {str: int}, {tuple: int})
+        @return track ids as [int]
+    """
+    (artist_cache, genre_cache, album_cache) = caches
+    get_artist = get_sql("database_artists", "ArtistsDatabase", "get_id")[0]
+    add_artist = get_sql("database_artists", "ArtistsDatabase", "add")[0]
+    set_sortname = get_sql("database_artists", "ArtistsDatabase",
+                           "set_sortname")[0]
+    get_genre = get_sql("database_genres", "GenresDatabase", "get_id")[0]
+    add_genre = get_sql("database_genres", "GenresDatabase", "add")[0]
+    add_track = get_sql("database_tracks", "TracksDatabase", "add")[0]
+    track_ids = []
+    for (uri, artists, album, album_artists, genres) in records:
+        ids = {}
+        for (artist, sortname) in artists + album_artists:
+            artist_id = artist_cache.get(artist)
+            if artist_id is None:
+                v = sql.execute(get_artist, (artist,)).fetchone()
+                artist_id = None if v is None else v[0]
+            if artist_id is None:
+                sortname = sortname or artist
+                artist_id = sql.execute(add_artist, (
+                    artist, sortname, noaccents(artist),
+                    sortname.encode("utf-8"))).lastrowid
+            elif sortname is not None:
+                sql.execute(set_sortname, (sortname,
+                                           sortname.encode("utf-8"),
+                                           artist_id))
+            artist_cache[artist] = ids[artist] = artist_id
+        for genre in genres:
+            if genre not in genre_cache:
+                v = sql.execute(get_genre, (genre,)).fetchone()
+                genre_cache[genre] = v[0] if v is not None else\
+                    sql.execute(add_genre, (genre,)).lastrowid
+        album_id = add_album(sql, album_cache, album,
+                             [ids[a] for (a, s) in album_artists], uri)
+        track_ids.append(sql.execute(add_track,
+                                     get_track(uri, album_id)).lastrowid)
+    return track_ids
+
+
+def batch(sql, records, caches):
+    """
+        Add records per table
+        @param sql as sqlite3.Connection
+        @param records as [tuple]
+        @param caches as ({str: int}, {str: int}, {tuple: int})
+        @return track ids as [int]
+    """
+    (artist_cache, genre_cache, album_cache) = caches
+    get_artists = get_sql("database_artists", "ArtistsDatabase",
+                          "get_ids_by_names")[0]
+    add_artists = get_sql("database_artists", "ArtistsDatabase",
+                          "add_many")[0]
+    set_sortnames = get_sql("database_artists", "ArtistsDatabase",
+                            "set_sortnames")[0]
+    get_genres = get_sql("database_genres", "GenresDatabase",
+                         "get_ids_by_names")[0]
+    add_genres = get_sql("database_genres", "GenresDatabase", "add_many")[0]
+    (add_albums, add_album_artists) = get_sql("database_albums",
+                                              "AlbumsDatabase",
+                                              "add_many")
+    add_tracks = get_sql("database_tracks", "TracksDatabase", "add_many")[0]
+    last_id = get_sql("sqlcursor", "SqlCursor", "get_inserted_ids")[0]
+
+    def get_ids(count):
+        last = sql.execute(last_id).fetchone()[0]
+        return list(range(last - count + 1, last + 1))
+    sortnames = {}
+    artists = []
+    genres = []
+    for (uri, track_artists, album, album_artists, track_genres) in records:
+        for (artist, sortname) in track_artists + album_artists:
+            if sortname is not None:
+                sortnames[artist] = sortname
+            if artist not in artist_cache and artist not in artists:
+                artists.append(artist)
+        genres += [g for g in track_genres
+                   if g not in genre_cache and g not in genres]
+    artist_cache.update(get_names(sql, get_artists, "(?)", artists))
+    artists = [a for a in artists if a not in artist_cache]
+    sql.executemany(add_artists, [
+        (a, sortnames.get(a, a), noaccents(a),
+         sortnames.get(a, a).encode("utf-8"), a) for a in artists])
+    artist_cache.update(get_names(sql, get_artists, "(?)", artists))
+    sql.executemany(set_sortnames, [(s, s.encode("utf-8"), artist_cache[a])
+                                    for (a, s) in sortnames.items()])
+    genre_cache.update(get_names(sql, get_genres, "?", genres))
+    genres = [g for g in genres if g not in genre_cache]
+    sql.executemany(add_genres, [(g,) for g in genres])
+    genre_cache.update(get_names(sql, get_genres, "?", genres))
+    # Albums: lookup per new album, insert per batch
+    keys = []
+    new = []
+    for (uri, track_artists, album, album_artists, track_genres) in records:
+        artist_ids = [artist_cache[a] for (a, s) in album_artists]
+        key = (album, tuple(artist_ids))
+        keys.append(key)
+        if key in album_cache or key in new:
+            continue
+        v = sql.execute(get_album_query(artist_ids),
+                        (album,) + key[1]).fetchone()
+        if v is None:
+            new.append(key)
+        else:
+            album_cache[key] = v[0]
+    sql.executemany(add_albums, [(name, artist_ids == (), "", 0, 0, 0, 0,
+                                  noaccents(name), name.encode("utf-8"))
+                                 for (name, artist_ids) in new])
+    album_cache.update(zip(new, get_ids(len(new)) if new else []))
+    sql.executemany(add_album_artists, [(album_cache[key], artist_id)
+                                        for key in new
+                                        for artist_id in key[1]])
+    sql.executemany(add_tracks, [get_track(record[0], album_cache[key])
+                                 for (record, key) in zip(records, keys)])
+    return get_ids(len(records))
+
+
+def run(path, records, add):
+    """
+        Add records to a new database
+        @param path as str
+        @param records as [tuple]
+        @param add as function
+        @return seconds as float
+    """
+    sql = connect(path, search=False)
+    track_artists = get_sql("database_tracks", "TracksDatabase",
+                            "add_artists_genres")[0]
+    size = get_default("scan-batch-size")
+    caches = ({}, {}, {})
+    start = perf_counter()
+    for i in range(0, len(records), size):
+        chunk = records[i:i + size]
+        track_ids = add(sql, chunk, caches)
+        sql.executemany(track_artists, [
+            (track_id, caches[0][artist])
+            for (track_id, record) in zip(track_ids, chunk)
+            for artist in set([a for (a, s) in record[1]])])
+        sql.commit()
+    elapsed = perf_counter() - start
+    counts = [sql.execute("SELECT COUNT(1) FROM %s" % table).fetchone()[0]
+              for table in ["artists", "genres", "albums", "tracks"]]
+    sql.close()
+    return (elapsed, counts)
+
+
+def main():
+    """
+        Run benchmark
+    """
+    parser = ArgumentParser(description="Batch inserts benchmark")
+    parser.add_argument("--files", type=int, default=20000)
+    args = parser.parse_args()
+    records = get_records(args.files)
+    print("%-10s %10s %10s %8s %8s %8s %8s" % ("", "ms", "files/s",
+                                               "artists", "genres",
+                                               "albums", "tracks"))
+    with TemporaryDirectory() as directory:
+        for (name, add) in [("per row", per_row), ("batch", batch)]:
+            path = os.path.join(directory, name.replace(" ", "_") + ".db")
+            (elapsed, counts) = run(path, records, add)
+            print("%-10s %10.1f %10.1f %8d %8d %8d %8d" % (
+                  name, elapsed * 1000, len(records) / elapsed, *counts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Time queries hiding charts with the is_chart flag against the
+    correlated NOT IN subquery they used before
+
+    ./tools/bench_charts.py --albums 10000
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+
+from benchlib import connect, populate, get_queries, get_constants
+
+# Queries before is_chart flag, ? is Type.CHARTS
+BEFORE = {
+    "get_ids": "SELECT DISTINCT albums.rowid\
+                FROM albums, artists,\
+                album_artists, album_genres as AG\
+                WHERE artists.rowid=album_artists.artist_id\
+                AND ? NOT IN (\
+                     SELECT album_genres.genre_id\
+                     FROM album_genres\
+                     WHERE AG.album_id=album_genres.album_id)\
+                AND AG.album_id=albums.rowid\
+                AND albums.rowid=album_artists.album_id",
+    "get": "SELECT DISTINCT artists.rowid,\
+            artists.name, artists.sortname\
+            FROM artists, albums,\
+            album_genres AS AG, album_artists\
+            WHERE album_artists.artist_id=artists.rowid\
+            AND album_artists.album_id=albums.rowid\
+            AND AG.album_id=albums.rowid\
+            AND ? NOT IN (\
+              SELECT album_genres.genre_id\
+              FROM album_genres\
+              WHERE AG.album_id=album_genres.album_id)",
+    "get_randoms": "SELECT tracks.rowid\
+                    FROM tracks, track_genres\
+                    WHERE track_genres.genre_id!=?\
+                    AND track_genres.track_id=tracks.rowid\
+                    ORDER BY random() LIMIT 100"
+}
+# (module, class, method, text in query to pick)
+AFTER = [("database_albums", "AlbumsDatabase", "get_ids",
+          "albums.is_chart=0"),
+         ("database_artists", "ArtistsDatabase", "get",
+          "ORDER BY artists.sort_key\""),
+         ("database_tracks", "TracksDatabase", "get_randoms",
+          "tracks.is_chart=0")]
+
+
+def find_query(module, cls, method, text):
+    """
+        Get query executed by method containing text
+        @param module as str
+        @param cls as str
+        @param method as str
+        @param text as str, a trailing " means end of query
+        @return str
+    """
+    for query in get_queries(module, cls, method):
+        query = " ".join(query.split())
+        if text.endswith("\"") and query.endswith(text[:-1]):
+            return query
+        elif not text.endswith("\"") and text in query:
+            return query
+    raise KeyError(text)
+
+
+def without_order(query):
+    """
+        Remove ORDER BY clause, sort keys are not compared here
+        @param query as str
+        @return str
+    """
+    if "random()" in query:
+        return query
+    return query.split(" ORDER BY")[0]
+
+
+def timed(sql, query, params, runs):
+    """
+        Get best time of runs
+        @param sql as sqlite3.Connection
+        @param query as str
+        @param params as tuple
+        @param runs as int
+        @return (ms as float, rows as int)
+    """
+    best = None
+    for x in range(runs):
+        start = perf_counter()
+        rows = sql.execute(query, params).fetchall()
+        elapsed = (perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return (best, len(rows))
+
+
+def main():
+    """
+        Run benchmark
+    """
+    parser = ArgumentParser(description="Charts filter benchmark")
+    parser.add_argument("--albums", type=int, default=10000)
+    parser.add_argument("--charts", type=float, default=0.1,
+                        help="ratio of charts albums")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    charts_id = get_constants("define", "Type")["CHARTS"]
+    sql = connect()
+    populate(sql, args.albums, artists=args.albums // 5,
+             charts=args.charts)
+    print("%-30s %10s %10s %8s" % ("", "before", "after", "rows"))
+    for (module, cls, method, text) in AFTER:
+        after = without_order(find_query(module, cls, method, text))
+        before = without_order(" ".join(BEFORE[method].split()))
+        (before_ms, before_rows) = timed(sql, before, (charts_id,),
+                                         args.runs)
+        (after_ms, after_rows) = timed(sql, after, (), args.runs)
+        # Both filters must hide the same rows
+        rows = "%d" % after_rows if before_rows == after_rows else\
+            "%d/%d" % (before_rows, after_rows)
+        print("%-30s %8.1fms %8.1fms %8s" % ("%s.%s()" % (cls, method),
+                                             before_ms, after_ms, rows))
+
+
+if __name__ == "__main__":
+    main()
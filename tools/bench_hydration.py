@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Count SQL statements and time to load albums and tracks fields,
+    one getter per field and object against get_many() in chunks
+
+    ./tools/bench_hydration.py --albums 2000
+"""
+
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+import sqlite3
+
+from benchlib import connect, populate, get_queries, get_query
+
+# Getters for fields returned by get_many()
+GETTERS = {
+    ("database_albums", "AlbumsDatabase"): [
+        "get_name", "get_year", "get_uri", "get_synced", "get_loved",
+        "get_artist_ids", "get_artists", "get_duration", "get_mtime"],
+    ("database_tracks", "TracksDatabase"): [
+        "get_name", "get_album_id", "get_album_name", "get_duration",
+        "get_number", "get_year", "get_persistent", "get_artist_ids",
+        "get_artists", "get_genre_ids", "get_genres", "get_mtime"]
+}
+
+
+def get_getter_query(sql, module, cls, method):
+    """
+        Get first complete query of getter
+        @param sql as sqlite3.Connection
+        @param module as str
+        @param cls as str
+        @param method as str
+        @return str
+    """
+    for query in get_queries(module, cls, method):
+        try:
+            sql.execute("EXPLAIN " + query, (1,))
+            return query
+        except sqlite3.Error:
+            # Query part completed at runtime
+            pass
+    raise KeyError(method)
+
+
+def per_object(sql, queries, object_ids):
+    """
+        Load fields with one query per field and object
+        @param sql as sqlite3.Connection
+        @param queries as [str]
+        @param object_ids as [int]
+    """
+    for object_id in object_ids:
+        for query in queries:
+            sql.execute(query, (object_id,)).fetchall()
+
+
+def many(sql, request, object_ids):
+    """
+        Load fields as get_many()
+        @param sql as sqlite3.Connection
+        @param request as str
+        @param object_ids as [int]
+    """
+    for i in range(0, len(object_ids), 500):
+        chunk = object_ids[i:i + 500]
+        sql.execute(request % ",".join("?" * len(chunk)), chunk).fetchall()
+
+
+def run(sql, load, *args):
+    """
+        Count statements and time of load
+        @param sql as sqlite3.Connection
+        @param load as function
+        @return (statements as int, ms as float)
+    """
+    statements = []
+    sql.set_trace_callback(statements.append)
+    start = perf_counter()
+    load(sql, *args)
+    elapsed = (perf_counter() - start) * 1000
+    sql.set_trace_callback(None)
+    return (len(statements), elapsed)
+
+
+def main():
+    """
+        Run benchmark
+    """
+    parser = ArgumentParser(description="Objects hydration benchmark")
+    parser.add_argument("--albums", type=int, default=2000,
+                        help="albums (and tracks) to load")
+    parser.add_argument("--library", type=int, default=10000,
+                        help="albums in library")
+    args = parser.parse_args()
+    sql = connect()
+    populate(sql, max(args.library, args.albums))
+    random = Random(0)
+    print("%-16s %8s %12s %10s %12s %10s" % ("", "objects", "per object",
+                                             "ms", "get_many()", "ms"))
+    for (module, cls), getters in sorted(GETTERS.items()):
+        table = "albums" if cls == "AlbumsDatabase" else "tracks"
+        count = sql.execute("SELECT COUNT(1) FROM %s" % table).fetchone()[0]
+        object_ids = random.sample(range(1, count + 1), args.albums)
+        queries = [get_getter_query(sql, module, cls, getter)
+                   for getter in getters]
+        request = get_query(module, cls, "get_many")
+        (before, before_ms) = run(sql, per_object, queries, object_ids)
+        (after, after_ms) = run(sql, many, request, object_ids)
+        print("%-16s %8d %12d %10.1f %12d %10.1f" % (
+              cls, len(object_ids), before, before_ms, after, after_ms))
+
+
+if __name__ == "__main__":
+    main()
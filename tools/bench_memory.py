@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Measure memory of track objects built from get_many() rows with
+    tracemalloc, slotted objects sharing rows against objects copying
+    fields in their __dict__, as before
+
+    lollypop.objects needs GTK, so both layouts are mirrored here with
+    FIELDS and __slots__ read from src/objects.py
+
+    ./tools/bench_memory.py --tracks 100000
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+import tracemalloc
+
+from benchlib import get_constants
+
+BASE = get_constants("objects", "Base")
+TRACK = get_constants("objects", "Track")
+
+
+class SlottedTrack:
+    """
+        Track as objects.Track: row is shared, not copied
+    """
+    __slots__ = BASE["__slots__"] + TRACK["__slots__"]
+
+    def __init__(self, db, track_id, row):
+        """
+            Init track
+            @param db as object
+            @param track_id as int
+            @param row as {field as str: value}
+        """
+        self.db = db
+        self._row = row
+        self._values = None
+        self.id = track_id
+        self._uri = None
+        self._non_album_artists = None
+
+
+class DictTrack:
+    """
+        Track as objects.Track before slots: row fields are copied
+    """
+
+    def __init__(self, db, track_id, row):
+        """
+            Init track
+            @param db as object
+            @param track_id as int
+            @param row as {field as str: value}
+        """
+        self.db = db
+        for field in TRACK["FIELDS"]:
+            if field in row:
+                setattr(self, "_" + field, row[field])
+        self.id = track_id
+        self._uri = None
+        self._non_album_artists = []
+
+
+def get_rows(count):
+    """
+        Get rows as TracksDatabase.get_many()
+        @param count as int
+        @return {track id as int: {field as str: value}}
+    """
+    rows = {}
+    for track_id in range(1, count + 1):
+        album_id = track_id // 10 + 1
+        rows[track_id] = {"name": "Track %d" % track_id,
+                          "album_id": album_id,
+                          "album_name": "Album %d" % album_id,
+                          "duration": 180 + track_id % 240,
+                          "number": track_id % 10 + 1,
+                          "year": str(1950 + album_id % 68),
+                          "persistent": 1,
+                          "artist_ids": [album_id % 2000 + 1],
+                          "artists": ["Artist %d" % (album_id % 2000)],
+                          "genre_ids": [album_id % 20 + 1],
+                          "genres": ["Genre %d" % (album_id % 20)],
+                          "mtime": 1500000000 + track_id}
+    return rows
+
+
+def measure(cls, rows):
+    """
+        Build one object per row
+        @param cls as class
+        @param rows as {track id as int: {field as str: value}}
+        @return (bytes as int, ms as float)
+    """
+    db = object()
+    tracemalloc.start()
+    start = perf_counter()
+    objects = [cls(db, track_id, row) for (track_id, row) in rows.items()]
+    elapsed = (perf_counter() - start) * 1000
+    (size, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return (size, elapsed)
+
+
+def main():
+    """
+        Run benchmark
+    """
+    parser = ArgumentParser(description="Track objects memory")
+    parser.add_argument("--tracks", type=int, default=100000)
+    args = parser.parse_args()
+    rows = get_rows(args.tracks)
+    print("%-16s %10s %10s %10s" % ("", "MiB", "bytes/obj", "ms"))
+    for (name, cls) in [("__dict__", DictTrack), ("__slots__", SlottedTrack)]:
+        (size, elapsed) = measure(cls, rows)
+        print("%-16s %10.1f %10d %10.1f" % (name, size / 1024 / 1024,
+                                            size // args.tracks, elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Time a rescan of an unchanged tree, as CollectionScanner walks it
+
+    - query: enumerate names, then query time::modified per file
+    - enumerate: get time::modified from enumerate_children()
+    - dirs: compare dir mtimes with known ones, do not list files
+    Needs Gio introspection data, not GTK.
+
+    ./tools/bench_rescan.py --files 100000
+"""
+
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import os
+
+import gi
+gi.require_version("Gio", "2.0")
+from gi.repository import Gio
+
+ATTRIBUTES = "standard::name,standard::type,standard::is-hidden,"\
+             "standard::content-type"
+
+
+def generate_tree(directory, count):
+    """
+        Create count empty files, 100 per directory
+        @param directory as str
+        @param count as int
+    """
+    for i in range(count):
+        album = os.path.join(directory, "artist%03d" % (i // 10000),
+                             "album%05d" % (i // 100))
+        if not os.path.isdir(album):
+            os.makedirs(album)
+        open(os.path.join(album, "track%02d.ogg" % (i % 100)), "w").close()
+
+
+def get_mtime(f):
+    """
+        Get modification time for file
+        @param f as Gio.File
+        @return int
+    """
+    info = f.query_info("time::modified", Gio.FileQueryInfoFlags.NONE, None)
+    return int(info.get_attribute_as_string("time::modified"))
+
+
+def walk(uri, attributes, on_file):
+    """
+        Walk tree, call on_file for each file
+        @param uri as str
+        @param attributes as str
+        @param on_file as function(Gio.File, Gio.FileInfo)
+        @return {dir uri as str: mtime as int}
+    """
+    dir_mtimes = {uri: get_mtime(Gio.File.new_for_uri(uri))}
+    walk_uris = [uri]
+    while walk_uris:
+        uri = walk_uris.pop(0)
+        d = Gio.File.new_for_uri(uri)
+        infos = d.enumerate_children(attributes,
+                                     Gio.FileQueryInfoFlags.NONE,
+                                     None)
+        for info in infos:
+            f = infos.get_child(info)
+            if info.get_file_type() == Gio.FileType.DIRECTORY:
+                walk_uris.append(f.get_uri())
+                dir_mtimes[f.get_uri()] = get_mtime(f)
+            else:
+                on_file(f, info)
+    return dir_mtimes
+
+
+def rescan_query(uri):
+    """
+        Query mtime of each file
+        @param uri as str
+        @return files as int
+    """
+    files = []
+    walk(uri, ATTRIBUTES,
+         lambda f, info: files.append(get_mtime(f)))
+    return len(files)
+
+
+def rescan_enumerate(uri):
+    """
+        Read mtime of each file from enumeration
+        @param uri as str
+        @return files as int
+    """
+    files = []
+    walk(uri, ATTRIBUTES + ",time::modified",
+         lambda f, info: files.append(
+            int(info.get_attribute_as_string("time::modified"))))
+    return len(files)
+
+
+def rescan_dirs(uri, db_dir_mtimes):
+    """
+        Only query dirs mtimes, known dirs are unchanged
+        @param uri as str
+        @param db_dir_mtimes as {str: int}
+        @return files as int
+    """
+    children = {}
+    for d in db_dir_mtimes.keys():
+        children.setdefault(d[:d.rfind("/")], []).append(d)
+    walk_uris = [uri]
+    changed = 0
+    while walk_uris:
+        uri = walk_uris.pop(0)
+        if get_mtime(Gio.File.new_for_uri(uri)) != db_dir_mtimes.get(uri):
+            changed += 1
+        walk_uris += children.get(uri, [])
+    return changed
+
+
+def main():
+    """
+        Run benchmark
+    """
+    parser = ArgumentParser(description="No-op rescan benchmark")
+    parser.add_argument("--tree", help="music directory to scan")
+    parser.add_argument("--files", type=int, default=100000,
+                        help="generated files count")
+    args = parser.parse_args()
+    with TemporaryDirectory() as directory:
+        if args.tree is None:
+            generate_tree(directory, args.files)
+            root = directory
+        else:
+            root = args.tree
+        uri = Gio.File.new_for_path(root).get_uri()
+        db_dir_mtimes = walk(uri, ATTRIBUTES, lambda f, info: None)
+        for (name, scan) in [("query", lambda: rescan_query(uri)),
+                             ("enumerate", lambda: rescan_enumerate(uri)),
+                             ("dirs", lambda: rescan_dirs(uri,
+                                                          db_dir_mtimes))]:
+            start = perf_counter()
+            count = scan()
+            print("%10s %8.2f s  (%d %s)" % (
+                name, perf_counter() - start, count,
+                "changed dirs" if name == "dirs" else "files"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Report tag reading speed in files/s for 1..N scanner workers
+
+    Workers share a queue of uris and each one owns a Discoverer, like
+    CollectionScanner tag readers. A corpus of short WAV files is
+    generated unless --corpus points to a music directory.
+    Needs GStreamer introspection data, not GTK.
+
+    ./tools/bench_scanner.py --files 2000 --workers 8
+"""
+
+from argparse import ArgumentParser
+from queue import Queue, Empty
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter
+import os
+import struct
+import wave
+
+import gi
+gi.require_version("Gst", "1.0")
+gi.require_version("GstPbutils", "1.0")
+from gi.repository import Gst, GstPbutils, GLib
+
+
+def generate_corpus(directory, count):
+    """
+        Write count one second WAV files, 10 per album directory
+        @param directory as str
+        @param count as int
+    """
+    frames = struct.pack("<h", 0) * 8000
+    for i in range(count):
+        album = os.path.join(directory, "album%05d" % (i // 10))
+        if not os.path.isdir(album):
+            os.makedirs(album)
+        f = wave.open(os.path.join(album, "track%02d.wav" % (i % 10)), "wb")
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(8000)
+        f.writeframes(frames)
+        f.close()
+
+
+def get_uris(directory):
+    """
+        Get file uris under directory
+        @param directory as str
+        @return [str]
+    """
+    uris = []
+    for (root, dirs, files) in os.walk(directory):
+        for name in files:
+            uris.append(GLib.filename_to_uri(os.path.join(root, name)))
+    return uris
+
+
+def warm_up(uris):
+    """
+        Read files once so all runs use page cache
+        @param uris as [str]
+    """
+    for uri in uris:
+        try:
+            with open(GLib.filename_from_uri(uri)[0], "rb") as f:
+                while f.read(1024 * 1024):
+                    pass
+        except OSError as e:
+            print("warm_up():", e)
+
+
+def read_tags(uris, records):
+    """
+        Read tags for uris with a discoverer owned by thread
+        @param uris as Queue of str
+        @param records as Queue of (str, bool)
+    """
+    discoverer = GstPbutils.Discoverer.new(10 * Gst.SECOND)
+    while True:
+        try:
+            uri = uris.get_nowait()
+        except Empty:
+            return
+        try:
+            info = discoverer.discover_uri(uri)
+            info.get_tags()
+            records.put((uri, True))
+        except Exception:
+            records.put((uri, False))
+
+
+def run(uris, workers):
+    """
+        Read tags for all uris
+        @param uris as [str]
+        @param workers as int
+        @return (files/s as float, failures as int)
+    """
+    uris_queue = Queue()
+    records = Queue()
+    for uri in uris:
+        uris_queue.put(uri)
+    start = perf_counter()
+    threads = []
+    for x in range(workers):
+        t = Thread(target=read_tags, args=(uris_queue, records))
+        t.daemon = True
+        t.start()
+        threads.append(t)
+    failures = 0
+    # Single consumer, like scanner database writer
+    for x in range(len(uris)):
+        (uri, ok) = records.get()
+        if not ok:
+            failures += 1
+    elapsed = perf_counter() - start
+    for t in threads:
+        t.join()
+    return (len(uris) / max(elapsed, 0.001), failures)
+
+
+def main():
+    """
+        Run benchmark
+    """
+    parser = ArgumentParser(description="Scanner tag reading benchmark")
+    parser.add_argument("--corpus", help="music directory to read")
+    parser.add_argument("--files", type=int, default=1000,
+                        help="generated files count")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="benchmark 1 to WORKERS workers")
+    args = parser.parse_args()
+    Gst.init(None)
+    with TemporaryDirectory() as directory:
+        if args.corpus is None:
+            generate_corpus(directory, args.files)
+            uris = get_uris(directory)
+        else:
+            uris = get_uris(args.corpus)
+        print("%d files" % len(uris))
+        warm_up(uris)
+        print("%8s %10s %8s" % ("workers", "files/s", "failed"))
+        for workers in range(1, args.workers + 1):
+            (speed, failures) = run(uris, workers)
+            print("%8d %10.1f %8d" % (workers, speed, failures))
+
+
+if __name__ == "__main__":
+    main()
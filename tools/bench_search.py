@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Report search latency per keystroke while typing "track artist",
+    with full text search index and with LIKE fallback queries
+
+    ./tools/bench_search.py --albums 20000
+"""
+
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+
+from benchlib import connect, populate, get_queries, noaccents, percentile
+
+# Searches run by LocalSearch.do() for each search item
+SEARCHES = [("database_artists", "ArtistsDatabase"),
+            ("database_albums", "AlbumsDatabase"),
+            ("database_tracks", "TracksDatabase")]
+
+
+def index(sql):
+    """
+        Fill full text search index, as Database.update_search()
+        @param sql as sqlite3.Connection
+    """
+    for (table, relation) in [("albums", "album"), ("tracks", "track")]:
+        sql.execute("INSERT INTO %s_search (rowid, name, artists)\
+                     SELECT %s.rowid, %s.name_folded,\
+                     IFNULL((SELECT group_concat(artists.name_folded, ' ')\
+                             FROM artists, %s_artists\
+                             WHERE %s_artists.%s_id=%s.rowid\
+                             AND artists.rowid=%s_artists.artist_id), '')\
+                     FROM %s" % (table, table, table, relation, relation,
+                                 relation, table, relation, table))
+    sql.execute("INSERT INTO artists_search (rowid, name)\
+                 SELECT rowid, name_folded FROM artists")
+    sql.commit()
+
+
+def get_search_query(string, any_word):
+    """
+        Get full text search query, as Database.get_search_query()
+        @param string as str
+        @param any_word as bool
+        @return str/None
+    """
+    words = ['"%s"*' % word.replace('"', '""')
+             for word in noaccents(string).split()]
+    if words:
+        return (" OR " if any_word else " ").join(words)
+    return None
+
+
+def get_search_items(text, fts):
+    """
+        Get search items for entry text, as SearchPopover and LocalSearch
+        @param text as str
+        @param fts as bool
+        @return [(str, bool)]
+    """
+    items = [text] + [word for word in text.split() if len(word) >= 3]
+    if fts and len(items) > 1:
+        return [(items[0], False), (" ".join(items[1:]), True)]
+    return [(item, False) for item in items]
+
+
+def get_search_queries(fts):
+    """
+        Get search queries
+        @param fts as bool
+        @return [str]
+    """
+    queries = []
+    for (module, cls) in SEARCHES:
+        for query in get_queries(module, cls, "search"):
+            if ("MATCH" in query) == fts:
+                # AlbumsDatabase.search() default limit
+                if "LIMIT" not in query:
+                    query += " LIMIT 25"
+                queries.append(query)
+    return queries
+
+
+def keystroke(sql, queries, text, fts):
+    """
+        Run searches for entry text
+        @param sql as sqlite3.Connection
+        @param queries as [str]
+        @param text as str
+        @param fts as bool
+        @return ms as float
+    """
+    start = perf_counter()
+    for (item, any_word) in get_search_items(text, fts):
+        if fts:
+            param = get_search_query(item, any_word)
+        else:
+            param = "%" + noaccents(item) + "%"
+        if param is None:
+            continue
+        for query in queries:
+            sql.execute(query, (param,)).fetchall()
+    return (perf_counter() - start) * 1000
+
+
+def main():
+    """
+        Run benchmark
+    """
+    parser = ArgumentParser(description="Search per keystroke latency")
+    parser.add_argument("--albums", type=int, default=20000,
+                        help="albums of 10 tracks")
+    parser.add_argument("--searches", type=int, default=20,
+                        help="typed searches")
+    parser.add_argument("--target", type=float, default=20.0,
+                        help="keystroke budget in ms")
+    args = parser.parse_args()
+    sql = connect()
+    populate(sql, args.albums, artists=args.albums // 5)
+    index(sql)
+    random = Random(0)
+    track_ids = [random.randint(1, args.albums * 10)
+                 for x in range(args.searches)]
+    texts = []
+    for track_id in track_ids:
+        result = sql.execute("SELECT tracks.name, artists.name\
+                              FROM tracks, track_artists, artists\
+                              WHERE tracks.rowid=?\
+                              AND track_artists.track_id=tracks.rowid\
+                              AND artists.rowid=track_artists.artist_id",
+                             (track_id,))
+        texts.append(" ".join(result.fetchone()))
+    print("%-8s %10s %9s %9s %9s %9s" % ("search", "keystrokes", "p50",
+                                         "p95", "max", "> target"))
+    for fts in [False, True]:
+        queries = get_search_queries(fts)
+        latencies = [keystroke(sql, queries, text[:length].strip(), fts)
+                     for text in texts
+                     for length in range(1, len(text) + 1)]
+        print("%-8s %10d %7.1fms %7.1fms %7.1fms %9d" % (
+            "fts" if fts else "like", len(latencies),
+            percentile(latencies, 0.5), percentile(latencies, 0.95),
+            max(latencies),
+            len([ms for ms in latencies if ms > args.target])))
+
+
+if __name__ == "__main__":
+    main()
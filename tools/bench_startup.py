@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Start lollypop --profile-startup several times and report time to
+    first frame, process is stopped once StartupProfiler printed it
+
+    Needs a display, no other lollypop instance must be running
+
+    ./tools/bench_startup.py --runs 5 --command "lollypop"
+"""
+
+from argparse import ArgumentParser
+from queue import Queue, Empty
+from statistics import median
+from threading import Thread
+from time import monotonic
+import os
+import re
+import shlex
+import subprocess
+import sys
+
+# StartupProfiler.report() row: total, phase, name
+ROW = re.compile(r"^\s*([0-9.]+)\s+([0-9.]+)  (.+)$")
+
+
+def read(stream, lines):
+    """
+        Put stream lines in queue, None at end of stream
+        @param stream as file
+        @param lines as Queue
+    """
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+def run(command, timeout):
+    """
+        Start lollypop and read its startup timeline
+        @param command as [str]
+        @param timeout as float, seconds
+        @return {phase as str: total in ms as float}
+    """
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    process = subprocess.Popen(command + ["--profile-startup"],
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL,
+                               universal_newlines=True, env=env)
+    # Read in a thread, readline() blocks until lollypop prints
+    lines = Queue()
+    reader = Thread(target=read, args=(process.stdout, lines))
+    reader.daemon = True
+    reader.start()
+    phases = {}
+    deadline = monotonic() + timeout
+    try:
+        while "first frame" not in phases and monotonic() < deadline:
+            try:
+                line = lines.get(timeout=max(0, deadline - monotonic()))
+            except Empty:
+                break
+            if line is None:
+                break
+            m = ROW.match(line.rstrip("\n"))
+            if m is not None:
+                phases[m.group(3)] = float(m.group(1))
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    return phases
+
+
+def main():
+    """
+        Run benchmark
+    """
+    parser = ArgumentParser(description="Time to first frame")
+    parser.add_argument("--command", default="lollypop",
+                        help="command starting lollypop")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="seconds to wait for first frame")
+    args = parser.parse_args()
+    command = shlex.split(args.command)
+    first_frames = []
+    for i in range(args.runs):
+        phases = run(command, args.timeout)
+        if "first frame" in phases:
+            first_frames.append(phases["first frame"])
+            print("run %d: %.1fms" % (i + 1, phases["first frame"]))
+        else:
+            print("run %d: no first frame" % (i + 1))
+    if not first_frames:
+        sys.exit(1)
+    print("first frame: min %.1fms, median %.1fms, max %.1fms" % (
+          min(first_frames), median(first_frames), max(first_frames)))
+
+
+if __name__ == "__main__":
+    main()
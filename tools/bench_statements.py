@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Time AlbumsDatabase.get_name()/get_year() queries with a connection
+    per call, as SqlCursor did, and with a pooled connection with and
+    without prepared statements cache
+
+    ./tools/bench_statements.py --calls 20000
+"""
+
+from argparse import ArgumentParser
+from random import Random
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import os
+
+from benchlib import connect, populate, get_query
+
+
+def run(get_cursor, queries, album_ids, pooled):
+    """
+        Run queries for album ids
+        @param get_cursor as function
+        @param queries as [str]
+        @param album_ids as [int]
+        @param pooled as bool, keep connection between calls
+        @return time per call in µs as float
+    """
+    sql = get_cursor() if pooled else None
+    start = perf_counter()
+    for album_id in album_ids:
+        for query in queries:
+            if not pooled:
+                sql = get_cursor()
+            sql.execute(query, (album_id,)).fetchone()
+            if not pooled:
+                sql.close()
+    elapsed = perf_counter() - start
+    if pooled:
+        sql.close()
+    return elapsed * 1000000 / (len(album_ids) * len(queries))
+
+
+def main():
+    """
+        Run benchmark
+    """
+    parser = ArgumentParser(description="SQL statements benchmark")
+    parser.add_argument("--albums", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=10000,
+                        help="calls per getter")
+    parser.add_argument("--cache", type=int, default=128,
+                        help="statements cache size")
+    args = parser.parse_args()
+    queries = [get_query("database_albums", "AlbumsDatabase", "get_name"),
+               get_query("database_albums", "AlbumsDatabase", "get_year")]
+    random = Random(0)
+    album_ids = [random.randint(1, args.albums) for x in range(args.calls)]
+    with TemporaryDirectory() as directory:
+        path = os.path.join(directory, "lollypop.db")
+        sql = connect(path)
+        populate(sql, args.albums, 1)
+        sql.close()
+        print("%-32s %10s" % ("", "µs/call"))
+        for (name, cache, pooled) in [
+                ("connection per call", args.cache, False),
+                ("pooled, no statements cache", 0, True),
+                ("pooled, %d statements cache" % args.cache,
+                 args.cache, True)]:
+            elapsed = run(lambda: connect(path, cache), queries,
+                          album_ids, pooled)
+            print("%-32s %10.1f" % (name, elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Report AlbumsDatabase.get_ids() latency percentiles while a scan
+    adds albums from another thread, with SQLite default rollback
+    journal and with pragmas set by SqlCursor.set_pragmas()
+
+    ./tools/bench_wal.py --albums 5000 --scan 5000
+"""
+
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter
+import os
+
+from benchlib import connect, populate, get_queries, get_default, percentile
+
+
+def set_pragmas(sql):
+    """
+        Tune connection as SqlCursor.set_pragmas() with default settings
+        @param sql as sqlite3.Connection
+    """
+    sql.execute("PRAGMA journal_mode=WAL")
+    sql.execute("PRAGMA synchronous=%s" % get_default("sql-synchronous"))
+    sql.execute("PRAGMA mmap_size=%d" %
+                (get_default("sql-mmap-size") * 1024 * 1024))
+    sql.execute("PRAGMA cache_size=%d" % -get_default("sql-cache-size"))
+
+
+def scan(path, albums, wal, done):
+    """
+        Add albums in batches, as scanner does
+        @param path as str
+        @param albums as int
+        @param wal as bool
+        @param done as [float], scan duration is appended
+    """
+    sql = connect(path)
+    if wal:
+        set_pragmas(sql)
+    start = perf_counter()
+    # Scanner commits every scan-batch-size files, 10 per album
+    populate(sql, albums, seed=1,
+             batch=max(1, get_default("scan-batch-size") // 10))
+    done.append(perf_counter() - start)
+    sql.close()
+
+
+def run(path, albums, wal):
+    """
+        Read albums ids while scanning
+        @param path as str
+        @param albums as int, albums added by scan
+        @param wal as bool
+        @return (latencies in ms as [float], scan duration as float)
+    """
+    query = get_queries("database_albums", "AlbumsDatabase", "get_ids")[0]
+    query += " ORDER BY albums.sort_key"
+    sql = connect(path)
+    if wal:
+        set_pragmas(sql)
+    done = []
+    t = Thread(target=scan, args=(path, albums, wal, done))
+    t.start()
+    latencies = []
+    while not done:
+        start = perf_counter()
+        sql.execute(query).fetchall()
+        latencies.append((perf_counter() - start) * 1000)
+    t.join()
+    sql.close()
+    return (latencies, done[0])
+
+
+def main():
+    """
+        Run benchmark
+    """
+    parser = ArgumentParser(description="Concurrent read latency")
+    parser.add_argument("--albums", type=int, default=5000,
+                        help="albums in library")
+    parser.add_argument("--scan", type=int, default=5000,
+                        help="albums added while reading")
+    args = parser.parse_args()
+    print("%-10s %8s %9s %9s %9s %9s %8s" % ("journal", "reads", "p50",
+                                             "p95", "p99", "max", "scan"))
+    for wal in [False, True]:
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "lollypop.db")
+            sql = connect(path)
+            populate(sql, args.albums)
+            sql.close()
+            (latencies, duration) = run(path, args.scan, wal)
+            print("%-10s %8d %7.1fms %7.1fms %7.1fms %7.1fms %7.1fs" % (
+                "wal" if wal else "delete", len(latencies),
+                percentile(latencies, 0.5), percentile(latencies, 0.95),
+                percentile(latencies, 0.99), max(latencies), duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Helpers for database tools: SQL is read from src/ so tools follow
+    the schema and queries of the tree without importing lollypop (GTK)
+"""
+
+from locale import strcoll
+from random import Random
+import ast
+import os
+import sqlite3
+import sys
+import unicodedata
+import xml.etree.ElementTree as etree
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                   os.pardir, "src")
+SCHEMA = os.path.join(SRC, os.pardir, "data", "org.gnome.Lollypop.gschema.xml")
+
+
+def noaccents(string):
+    """
+        Return string without accents, as lollypop.utils.noaccents()
+        @param string as str
+        @return str
+    """
+    nfkd_form = unicodedata.normalize("NFKD", string)
+    return "".join([c for c in nfkd_form if not unicodedata.combining(c)])
+
+
+def get_default(key):
+    """
+        Get setting default value from gschema
+        @param key as str
+        @return int/str/bool
+    """
+    for node in etree.parse(SCHEMA).getroot().iter("key"):
+        if node.get("name") == key:
+            default = node.find("default").text
+            if default in ["true", "false"]:
+                return default == "true"
+            return ast.literal_eval(default)
+    raise KeyError(key)
+
+
+def parse(module):
+    """
+        Parse module from src/
+        @param module as str, like "database_albums"
+        @return ast.Module
+    """
+    with open(os.path.join(SRC, module + ".py")) as f:
+        return ast.parse(f.read())
+
+
+def get_constants(module, cls):
+    """
+        Get class constants
+        @param module as str
+        @param cls as str
+        @return {name as str: value}
+    """
+    constants = {}
+    for node in _get_class(parse(module), cls).body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and\
+                isinstance(node.targets[0], ast.Name):
+            try:
+                constants[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                pass
+    return constants
+
+
+def get_queries(module, cls, method):
+    """
+        Get SQL strings executed by method, "%s" parts are left as is
+        @param module as str
+        @param cls as str
+        @param method as str
+        @return [str]
+    """
+    queries = []
+    for node in ast.walk(_get_method(parse(module), cls, method)):
+        arg = None
+        # sql.execute("...", ...) or sql.execute("..." % ..., ...)
+        if isinstance(node, ast.Call) and\
+                isinstance(node.func, ast.Attribute) and\
+                node.func.attr in ["execute", "executemany"] and node.args:
+            arg = node.args[0]
+        # request = "..." then sql.execute(request)
+        elif isinstance(node, ast.Assign) and\
+                isinstance(node.targets[0], ast.Name) and\
+                node.targets[0].id == "request":
+            arg = node.value
+        if isinstance(arg, ast.BinOp) and isinstance(arg.op, ast.Mod):
+            arg = arg.left
+        string = None if arg is None else _get_string(arg)
+        if string is not None:
+            queries.append(string)
+    return queries
+
+
+def get_query(module, cls, method):
+    """
+        Get first SQL string executed by method
+        @param module as str
+        @param cls as str
+        @param method as str
+        @return str
+    """
+    return get_queries(module, cls, method)[0]
+
+
+def get_schema(module="database", cls="Database"):
+    """
+        Get statements run by cls constructor to create a new database
+        @param module as str
+        @param cls as str
+        @return [str]
+    """
+    tree = parse(module)
+    types = get_constants("define", "Type")
+    strings = {}
+    for node in _get_class(tree, cls).body:
+        if isinstance(node, ast.Assign) and\
+                isinstance(node.targets[0], ast.Name) and\
+                node.targets[0].id.startswith("__create_"):
+            value = node.value
+            # """...""" % (Type.CHARTS, ...)
+            if isinstance(value, ast.BinOp) and\
+                    isinstance(value.op, ast.Mod):
+                args = value.right.elts\
+                    if isinstance(value.right, ast.Tuple) else [value.right]
+                args = tuple(types[arg.attr] for arg in args)
+                strings[node.targets[0].id] = _get_string(value.left) % args
+            elif _get_string(value) is not None:
+                strings[node.targets[0].id] = _get_string(value)
+    schema = []
+    for node in ast.walk(_get_method(tree, cls, "__init__")):
+        if isinstance(node, ast.Call) and\
+                isinstance(node.func, ast.Attribute) and\
+                node.func.attr == "execute" and\
+                isinstance(node.args[0], ast.Attribute):
+            schema.append(strings[node.args[0].attr])
+    return schema
+
+
+def connect(path=":memory:", cached_statements=128, search=True):
+    """
+        Open a database with schema and functions used by lollypop
+        @param path as str
+        @param cached_statements as int
+        @param search as bool, create full text search tables
+        @return sqlite3.Connection
+    """
+    exists = path != ":memory:" and os.path.exists(path)
+    sql = sqlite3.connect(path, 600.0, cached_statements=cached_statements)
+    sql.create_collation("LOCALIZED", strcoll)
+    sql.create_function("noaccents", 1, noaccents)
+    if not exists:
+        for statement in get_schema():
+            sql.execute(statement)
+        if search:
+            # As Database.create_search()
+            try:
+                for table in ["albums_search", "tracks_search"]:
+                    sql.execute("CREATE VIRTUAL TABLE %s\
+                                 USING fts5(name, artists)" % table)
+                sql.execute("CREATE VIRTUAL TABLE artists_search\
+                             USING fts5(name)")
+            except sqlite3.OperationalError as e:
+                print("connect(): no full text search,", e)
+        sql.commit()
+    return sql
+
+
+def populate(sql, albums=1000, tracks=10, artists=200, genres=20,
+             charts=0.0, seed=0, batch=0):
+    """
+        Fill database with a generated library, add to existing one
+        @param sql as sqlite3.Connection
+        @param albums as int
+        @param tracks as int, tracks per album
+        @param artists as int
+        @param genres as int
+        @param charts as float, ratio of albums in charts genre
+        @param seed as int
+        @param batch as int, commit every batch albums if not 0
+    """
+    random = Random(seed)
+    charts_id = get_constants("define", "Type")["CHARTS"]
+    syllables = ["ba", "lo", "ri", "ne", "ka", "mu", "so", "te", "vi",
+                 "da", "ré", "zo", "pi", "lu", "ma", "ko", "yé", "ta"]
+
+    def word():
+        return "".join(random.choice(syllables)
+                       for x in range(random.randint(2, 4)))
+
+    def name():
+        return " ".join(word().capitalize()
+                        for x in range(random.randint(1, 3)))
+    for artist_id in range(1, artists + 1):
+        artist = name()
+        sql.execute("INSERT OR IGNORE INTO artists (rowid, name, sortname,\
+                     name_folded) VALUES (?, ?, ?, ?)",
+                    (artist_id, artist, artist, noaccents(artist)))
+    for genre_id in range(1, genres + 1):
+        sql.execute("INSERT OR IGNORE INTO genres (rowid, name) VALUES (?, ?)",
+                    (genre_id, name()))
+    first = sql.execute("SELECT IFNULL(MAX(rowid), 0) + 1\
+                         FROM albums").fetchone()[0]
+    track_id = sql.execute("SELECT IFNULL(MAX(rowid), 0)\
+                            FROM tracks").fetchone()[0]
+    for album_id in range(first, first + albums):
+        album = name()
+        artist_id = random.randint(1, artists)
+        genre_id = charts_id if random.random() < charts else\
+            random.randint(1, genres)
+        year = random.randint(1950, 2017)
+        sql.execute("INSERT INTO albums (rowid, name, no_album_artist,\
+                     year, uri, popularity, rate, loved, synced,\
+                     name_folded) VALUES (?, ?, 0, ?, ?, ?, 0, 0, 0, ?)",
+                    (album_id, album, year,
+                     "file:///music/%d" % album_id,
+                     random.randint(0, 100), noaccents(album)))
+        sql.execute("INSERT INTO album_artists (album_id, artist_id)\
+                     VALUES (?, ?)", (album_id, artist_id))
+        sql.execute("INSERT INTO album_genres (album_id, mtime, genre_id)\
+                     VALUES (?, 0, ?)", (album_id, genre_id))
+        for number in range(1, tracks + 1):
+            track_id += 1
+            track = name()
+            sql.execute("INSERT INTO tracks (rowid, name, uri, duration,\
+                         tracknumber, discnumber, discname, album_id, year,\
+                         popularity, rate, ltime, name_folded)\
+                         VALUES (?, ?, ?, ?, ?, 1, '', ?, ?, ?, 0, 0, ?)",
+                        (track_id, track,
+                         "file:///music/%d/%d.ogg" % (album_id, number),
+                         random.randint(60, 600), number, album_id, year,
+                         random.randint(0, 100), noaccents(track)))
+            sql.execute("INSERT INTO track_artists (track_id, artist_id)\
+                         VALUES (?, ?)", (track_id, artist_id))
+            sql.execute("INSERT INTO track_genres (track_id, mtime,\
+                         genre_id) VALUES (?, 0, ?)", (track_id, genre_id))
+        if batch and (album_id - first + 1) % batch == 0:
+            sql.commit()
+    sql.commit()
+
+
+def percentile(values, ratio):
+    """
+        Get percentile of values
+        @param values as [float]
+        @param ratio as float between 0 and 1
+        @return float
+    """
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def _get_string(node):
+    """
+        Get string literal value
+        @param node as ast.AST
+        @return str/None
+    """
+    # Python < 3.8 has ast.Str for string literals
+    if sys.version_info < (3, 8):
+        return node.s if isinstance(node, ast.Str) else None
+    elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+def _get_class(tree, cls):
+    """
+        Get class definition
+        @param tree as ast.Module
+        @param cls as str
+        @return ast.ClassDef
+    """
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == cls:
+            return node
+    raise KeyError(cls)
+
+
+def _get_method(tree, cls, method):
+    """
+        Get method definition
+        @param tree as ast.Module
+        @param cls as str
+        @param method as str
+        @return ast.FunctionDef
+    """
+    for node in _get_class(tree, cls).body:
+        if isinstance(node, ast.FunctionDef) and node.name == method:
+            return node
+    raise KeyError(method)
@@ -0,0 +1,236 @@
+#!/usr/bin/python3
+# Copyright (c) 2014-2017 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Check query plans on a schema only database, exit with 1 if a hot
+    query misses its index or if any complete SQL string in database*.py
+    does a full table scan not listed in ALLOWED_SCANS
+
+    ./tools/check_query_plans.py
+"""
+
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+import ast
+import os
+import re
+import sqlite3
+import sys
+
+from benchlib import connect, get_queries, get_schema, parse
+
+# (module, class, method, expected index, tables allowed to be scanned)
+HOT_QUERIES = [
+    ("database_tracks", "TracksDatabase", "get_id_by_uri", "idx_tu", []),
+    ("database_tracks", "TracksDatabase", "get_ids_by_uris", "idx_tu", []),
+    ("playlists", "Playlists", "get_track_ids", "idx_tu", ["tracks"]),
+    ("database_albums", "AlbumsDatabase", "get_year_from_tracks", "idx_tal",
+     []),
+    ("database_albums", "AlbumsDatabase", "get_duration", "idx_tal", []),
+    ("database_artists", "ArtistsDatabase", "get_id", "idx_an", []),
+    ("database_albums", "AlbumsDatabase", "get_compilation_ids", "idx_aaa",
+     []),
+    ("database_tracks", "TracksDatabase", "get_as_non_album_artist",
+     "idx_taa", []),
+    ("database_genres", "GenresDatabase", "get_albums", "idx_agg", []),
+    ("database_tracks", "TracksDatabase", "get_old_charts_track_ids",
+     "idx_tgg", []),
+    ("database_albums", "AlbumsDatabase", "get_id_by_uri", "idx_au", []),
+    ("database_albums", "AlbumsDatabase", "get_uri_count", "idx_au", []),
+    # Only compilations query is complete, artists one uses idx_aln
+    ("database_albums", "AlbumsDatabase", "get_id", "idx_alc", []),
+    ("database_genres", "GenresDatabase", "get_id", "idx_gn", []),
+]
+# (class, method, tables): reason, full scans accepted by design
+ALLOWED_SCANS = {
+    ("Database", "has_search", ("sqlite_master",)): "schema lookup",
+    ("Database", "update_sort_keys", ("artists",)): "rewrites all rows",
+    ("Database", "get_dir_mtimes", ("dirs",)): "loads whole table",
+    ("Database", "update_dir_mtimes", ("dirs",)): "rewrites whole table",
+    ("AlbumsDatabase", "get_ids", ("albums",)): "whole library list",
+    ("AlbumsDatabase", "get_ids", ("album_artists",)): "whole library list",
+    ("AlbumsDatabase", "get_rated", ("albums",)): "sorts whole library",
+    ("AlbumsDatabase", "get_populars", ("albums",)): "sorts whole library",
+    ("AlbumsDatabase", "get_loves", ("albums",)): "whole library filter",
+    ("AlbumsDatabase", "get_recents", ("albums",)): "sorts whole library",
+    ("AlbumsDatabase", "get_randoms", ("albums",)): "sorts whole library",
+    ("AlbumsDatabase", "get_avg_popularity", ("albums", "(subquery-1)")):
+        "aggregate over library",
+    ("AlbumsDatabase", "update_max_count", ("albums",)):
+        "aggregate over library",
+    ("AlbumsDatabase", "has_loves", ("albums",)): "stops at first row",
+    ("AlbumsDatabase", "get_by_year", ("albums",)):
+        "search by year typed by user, albums table is small",
+    ("AlbumsDatabase", "search", ("albums",)):
+        "LIKE fallback without full text search",
+    ("ArtistsDatabase", "get", ("album_artists",)): "whole library list",
+    ("ArtistsDatabase", "get_local", ("album_artists",)):
+        "whole library list",
+    ("ArtistsDatabase", "get_ids", ("album_artists",)): "whole library list",
+    ("ArtistsDatabase", "count", ("album_artists",)):
+        "aggregate over library",
+    ("ArtistsDatabase", "search", ("album_artists",)):
+        "LIKE fallback without full text search",
+    ("GenresDatabase", "get_names", ("genres",)): "whole table list",
+    ("TracksDatabase", "get_ids", ("tracks",)): "tracks by persistence",
+    ("TracksDatabase", "get_uris", ("tracks",)): "tracks by persistence",
+    ("TracksDatabase", "get_non_persistent", ("tracks",)):
+        "tracks by persistence",
+    ("TracksDatabase", "get_rated", ("tracks",)): "sorts whole library",
+    ("TracksDatabase", "get_populars", ("tracks",)): "sorts whole library",
+    ("TracksDatabase", "get_randoms", ("tracks",)): "sorts whole library",
+    ("TracksDatabase", "get_avg_popularity", ("tracks", "(subquery-1)")):
+        "aggregate over library",
+    ("TracksDatabase", "get_ids_for_name", ("tracks",)):
+        "LOCALIZED collation, only for charts and web tracks",
+    ("TracksDatabase", "search", ("tracks",)):
+        "LIKE fallback without full text search",
+}
+MODULES = ["database", "database_albums", "database_artists",
+           "database_genres", "database_tracks"]
+
+
+def get_plan(sql, query):
+    """
+        Get query plan, "%s" are replaced by parameters
+        @param sql as sqlite3.Connection
+        @param query as str
+        @return [str]/None if query is not complete
+    """
+    query = " ".join(query.replace("%s", "?").split())
+    if not re.match(r"(SELECT|UPDATE|DELETE)\b", query, re.IGNORECASE):
+        return None
+    try:
+        result = sql.execute("EXPLAIN QUERY PLAN " + query,
+                             [1] * query.count("?"))
+        return [row[3] for row in result]
+    except sqlite3.OperationalError:
+        # Query part completed at runtime
+        return None
+
+
+def get_scans(plan):
+    """
+        Get tables fully scanned by plan
+        @param plan as [str]
+        @return [str]
+    """
+    scans = []
+    for detail in plan:
+        # SQLite < 3.36 says "SCAN TABLE name"
+        m = re.match(r"SCAN (?:TABLE )?(\S+)", detail)
+        # Full text search tables are looked up by MATCH or rowid
+        if m is not None and "USING" not in detail and\
+                "VIRTUAL TABLE" not in detail:
+            scans.append(m.group(1))
+    return scans
+
+
+def check_hot_queries(connections):
+    """
+        Check hot queries plans
+        @param connections as {module as str: sqlite3.Connection}
+        @return errors count as int
+    """
+    errors = 0
+    for (module, cls, method, index, allowed) in HOT_QUERIES:
+        sql = connections.get(module, connections["database"])
+        plans = [plan for plan in [get_plan(sql, query)
+                                   for query in get_queries(module, cls,
+                                                            method)]
+                 if plan is not None]
+        details = [detail for plan in plans for detail in plan]
+        scans = [table for plan in plans for table in get_scans(plan)
+                 if table not in allowed]
+        uses_index = [detail for detail in details
+                      if re.search(r"INDEX %s\b" % index, detail)]
+        if not plans:
+            error = "no complete query found"
+        elif scans:
+            error = "full scan of %s" % ", ".join(scans)
+        elif not uses_index:
+            error = "%s not used" % index
+        else:
+            error = None
+        print("%-4s %s.%s()%s" % ("ok" if error is None else "FAIL",
+                                  cls, method,
+                                  "" if error is None else ": " + error))
+        if error is not None:
+            errors += 1
+            for detail in details:
+                print("       %s" % detail)
+    return errors
+
+
+def check_scans(sql):
+    """
+        Check full table scans of all complete queries
+        @param sql as sqlite3.Connection
+        @return errors count as int
+    """
+    errors = 0
+    allowed = set()
+    for module in MODULES:
+        for cls in parse(module).body:
+            if not isinstance(cls, ast.ClassDef):
+                continue
+            for method in cls.body:
+                if not isinstance(method, ast.FunctionDef):
+                    continue
+                for query in get_queries(module, cls.name, method.name):
+                    plan = get_plan(sql, query)
+                    scans = [] if plan is None else get_scans(plan)
+                    if not scans:
+                        continue
+                    key = (cls.name, method.name, tuple(scans))
+                    if key in ALLOWED_SCANS:
+                        allowed.add(key)
+                        continue
+                    errors += 1
+                    print("FAIL %s.%s(): full scan of %s" % (
+                          cls.name, method.name, ", ".join(scans)))
+                    for detail in plan:
+                        print("       %s" % detail)
+    # Keep allowlist in sync with queries
+    for key in sorted(set(ALLOWED_SCANS) - allowed):
+        print("warn %s.%s(): %s no longer scanned, remove from"
+              " ALLOWED_SCANS" % (key[0], key[1], ", ".join(key[2])))
+    print("%-4s full scans: %d allowed by design, %d unexpected" % (
+          "ok" if errors == 0 else "FAIL", len(allowed), errors))
+    return errors
+
+
+def main():
+    """
+        Run checks
+    """
+    parser = ArgumentParser(description="Check SQL query plans")
+    parser.parse_args()
+    with TemporaryDirectory() as directory:
+        path = os.path.join(directory, "lollypop.db")
+        sql = connect(path)
+        # Playlists database with collection attached, as Playlists does
+        playlists = sqlite3.connect(":memory:")
+        for statement in get_schema("playlists", "Playlists"):
+            playlists.execute(statement)
+        playlists.execute('ATTACH DATABASE "%s" AS music' % path)
+        errors = check_hot_queries({"database": sql,
+                                    "playlists": playlists})
+        errors += check_scans(sql)
+        playlists.close()
+        sql.close()
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()